@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare packing and unpacking Artifact data in memory with the streaming
+``Artifact.pack_from()`` and ``Artifact.unpack_to()``.
+
+Usage: artifact_packing.py [size_mib]
+
+Writes `size_mib` MiB (default 64) of partly compressible data to a temporary
+file, and packs it with zlib compression, XOR encryption and Base64 encoding,
+then unpacks it back to a file. Reports the wall-clock time and the peak
+memory allocated (from ``tracemalloc``), which includes the packed data.
+"""
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cybox.objects.artifact_object import (Artifact, Base64Encoding,
+                                           Packaging, XOREncryption,
+                                           ZlibCompression)
+
+
+def make_packaging():
+    p = Packaging()
+    p.compression.append(ZlibCompression())
+    p.encryption.append(XOREncryption(0x4a))
+    p.encoding.append(Base64Encoding())
+    return p
+
+
+def pack_in_memory(path):
+    with open(path, "rb") as f:
+        a = Artifact(f.read())
+    a.packaging = make_packaging()
+    return a.packed_data
+
+
+def pack_streaming(path):
+    a = Artifact()
+    a.packaging = make_packaging()
+    with open(path, "rb") as f:
+        a.pack_from(f)
+    return a.packed_data
+
+
+def unpack_in_memory(packed, path):
+    a = Artifact()
+    a.packaging = make_packaging()
+    a.packed_data = packed
+    with open(path, "wb") as f:
+        f.write(a.data)
+
+
+def unpack_streaming(packed, path):
+    a = Artifact()
+    a.packaging = make_packaging()
+    a.packed_data = packed
+    with open(path, "wb") as f:
+        a.unpack_to(f)
+
+
+def measure(func, *args):
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    result = func(*args)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, "dump.bin")
+        with open(path, "wb") as f:
+            for _ in range(size * 4):
+                f.write(os.urandom(128 * 1024) + b"\0" * (128 * 1024))
+
+        print("%d MiB" % size)
+
+        packed = None
+        for name, func in (("pack (memory)", pack_in_memory),
+                           ("pack_from", pack_streaming)):
+            packed, elapsed, peak = measure(func, path)
+            print("  %-16s %.2fs  peak %.0f MiB" %
+                  (name, elapsed, peak / 1048576.0))
+
+        out = os.path.join(tmpdir, "out.bin")
+        for name, func in (("unpack (memory)", unpack_in_memory),
+                           ("unpack_to", unpack_streaming)):
+            _, elapsed, peak = measure(func, packed, out)
+            print("  %-16s %.2fs  peak %.0f MiB" %
+                  (name, elapsed, peak / 1048576.0))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare matching URIs against many Contains patterns with
+``cybox.matching.BatchMatcher`` and with one compiled matcher per pattern.
+
+Usage: batch_matching.py [patterns] [events]
+
+Builds `patterns` (default 20000) URI patterns with Contains, StartsWith and
+EndsWith conditions, and matches `events` (default 1000) URIs against them,
+a tenth of which contain one of the pattern values.
+"""
+
+import sys
+import time
+
+from cybox.core import Observable
+from cybox.matching import BatchMatcher, compile_pattern
+from cybox.objects.uri_object import URI
+
+CONDITIONS = ("Contains", "Contains", "StartsWith", "EndsWith")
+
+
+def make_patterns(count):
+    patterns = []
+    for i in range(count):
+        condition = CONDITIONS[i % len(CONDITIONS)]
+        if condition == "StartsWith":
+            value = "http://host%d.example/" % i
+        elif condition == "EndsWith":
+            value = "/payload%d.bin" % i
+        else:
+            value = "bad%d.example" % i
+        u = URI(value)
+        u.value.condition = condition
+        patterns.append(Observable(u, id_="example:Observable-%d" % i))
+    return patterns
+
+
+def make_events(count, patterns):
+    events = []
+    for i in range(count):
+        if i % 10 == 0:
+            value = "http://www.bad%d.example/index.html" % (i * 4 % patterns)
+        else:
+            value = "http://www.site%d.example/path/to/page%d.html" % (i, i)
+        events.append(URI(value))
+    return events
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    patterns = make_patterns(count)
+    uris = make_events(events, count)
+
+    start = time.time()
+    batch = BatchMatcher(patterns)
+    built = time.time() - start
+
+    start = time.time()
+    found = sum(len(batch.match(u)) for u in uris)
+    elapsed = time.time() - start
+    print("%d patterns, %d events: batch  %.2fs (built in %.2fs, %d found)" %
+          (count, events, elapsed, built, found))
+
+    matchers = [(p.id_, compile_pattern(p)) for p in patterns]
+
+    # Matching every pattern separately is slow, so only time a sample.
+    sample = uris[:max(events // 20, 1)]
+    start = time.time()
+    for u in sample:
+        set(id_ for id_, m in matchers if m.match(u))
+    elapsed = (time.time() - start) * events / len(sample)
+    print("%d patterns, %d events: single %.2fs (estimated)" %
+          (count, events, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare evaluating an ObservableComposition with
+``cybox.matching.compile_observable`` and with a plain recursive evaluation.
+
+Usage: composition_matching.py [count] [depth]
+
+Builds `count` (default 20000) File and Address instances, and a rule of
+`depth` (default 9) nested ANDs and ORs. Each level has regular expression
+patterns and an idref to a shared Observable, and each AND ends with an
+exact hash pattern which no instance matches. The plain evaluation takes the
+children in document order and evaluates every idref again.
+"""
+
+import sys
+import time
+
+from cybox.core import Observable, ObservableComposition, Observables
+from cybox.matching import compile_observable, compile_pattern
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+
+
+def make_instances(count):
+    instances = Observables()
+    for i in range(count):
+        if i % 2:
+            props = Address("10.0.%d.%d" % (i >> 8 & 255, i & 255), Address.CAT_IPV4)
+        else:
+            props = File()
+            props.file_name = "setup%d.exe" % i
+            props.md5 = "%032x" % i
+        instances.add(Observable(props))
+    return instances
+
+
+def regex(expression):
+    f = File()
+    f.file_name = expression
+    f.file_name.condition = "FitsPattern"
+    return Observable(f)
+
+
+def make_rule(depth, count):
+    # The regular expressions only match the last File, or nothing, so they
+    # search every File.
+    last = r"^setup%d\.exe$" % (count - 2)
+
+    shared = regex(last)
+    shared.id_ = "example:Observable-shared"
+
+    missing = File()
+    missing.md5 = "f" * 32
+    missing.md5.condition = "Equals"
+
+    rule = Observable(missing)
+    for level in range(depth):
+        if level % 2:
+            operator = "OR"
+            children = [regex(r"^mal%d_\d+\.exe$" % level),
+                        regex(r"(trojan|worm)%d" % level)]
+        else:
+            # An AND which fails only on its last, cheapest child.
+            operator = "AND"
+            children = [regex(last), regex(r"setup\d*%d\.exe" % (count - 2))]
+        children += [Observable(idref=shared.id_), rule]
+        if operator == "AND":
+            children.append(Observable(missing))
+        rule = Observable(ObservableComposition(operator, children))
+
+    return rule, Observables([shared])
+
+
+def plain_evaluate(observable, definitions, instances):
+    if observable.idref and not observable.object_ and not observable.observable_composition:
+        observable = definitions[observable.idref]
+    if observable.object_:
+        matcher = compile_pattern(observable.object_)
+        return any(matcher.match(x) for x in instances)
+
+    composition = observable.observable_composition
+    results = (plain_evaluate(x, definitions, instances) for x in composition.observables)
+    if composition.operator == "OR":
+        return any(results)
+    return all(results)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 9
+    instances = make_instances(count)
+    rule, shared = make_rule(depth, count)
+
+    start = time.time()
+    matcher = compile_observable(rule, observables=shared)
+    result = matcher.match(instances)
+    print("%d instances, depth %d: compiled  %.2fs (%s)" %
+          (count, depth, time.time() - start, result))
+
+    definitions = dict((o.id_, o) for o in shared)
+    objects = [o.object_.properties for o in instances]
+    start = time.time()
+    result = plain_evaluate(rule, definitions, objects)
+    print("%d instances, depth %d: plain     %.2fs (%s)" %
+          (count, depth, time.time() - start, result))
+
+
+if __name__ == "__main__":
+    main()
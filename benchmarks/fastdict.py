@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare the generic and compiled ``to_dict()``/``from_dict()``.
+
+Usage: fastdict.py [count]
+
+Builds an Observables package of `count` File, Address and URI observables
+(default 2000 of each) and converts it to a dictionary and back, first with
+the generic methods and then with ``cybox.utils.fastdict`` enabled, reporting
+the best wall-clock time of several runs.
+"""
+
+import gc
+import sys
+import time
+
+import cybox.utils
+from cybox.core import Observable, Observables
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+from cybox.utils import fastdict
+
+RUNS = 5
+
+
+def make_observables(count):
+    observables = Observables()
+
+    for i in range(count):
+        f = File()
+        f.file_name = "file%d.exe" % i
+        f.file_path = "C:\\Windows\\Temp\\file%d.exe" % i
+        f.size_in_bytes = i * 1024
+        f.add_hash("%032x" % i)
+        observables.add(Observable(f))
+        observables.add(Observable(Address("10.0.%d.%d" % (i // 256 % 256, i % 256), Address.CAT_IPV4)))
+        observables.add(Observable(URI("http://example.com/%d" % i)))
+
+    return observables
+
+
+def best(func, *args):
+    result = None
+    for _ in range(RUNS):
+        gc.collect()
+        start = time.time()
+        func(*args)
+        elapsed = time.time() - start
+        cybox.utils.cache_clear()
+        result = elapsed if result is None else min(result, elapsed)
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    observables = make_observables(count)
+    d = observables.to_dict()
+
+    print("%d observables" % len(observables))
+    for name, enabled in (("generic", False), ("compiled", True)):
+        if enabled:
+            fastdict.enable()
+        else:
+            fastdict.disable()
+
+        to_dict = best(observables.to_dict)
+        from_dict = best(Observables.from_dict, d)
+        print("  %-9s to_dict %.3fs  from_dict %.3fs" % (name, to_dict, from_dict))
+
+    fastdict.disable()
+
+
+if __name__ == "__main__":
+    main()
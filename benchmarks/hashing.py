@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare hashing files one algorithm at a time with ``File.from_path()`` and
+``File.walk()``.
+
+Usage: hashing.py [size_mib] [count]
+
+Writes `count` (default 8) files of `size_mib` MiB (default 64) of random data
+to a temporary directory, and hashes them with MD5, SHA1, SHA256 and SHA512:
+
+* "by hand": reading each file once per algorithm, and building the File
+* ``File.from_path()`` for each file
+* ``File.walk()`` over the directory
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from cybox.objects.file_object import File
+
+HASHES = ("md5", "sha1", "sha256", "sha512")
+
+
+def by_hand(paths):
+    for path in paths:
+        f = File()
+        f.file_name = os.path.basename(path)
+        f.size_in_bytes = os.path.getsize(path)
+        for name in HASHES:
+            h = hashlib.new(name)
+            with open(path, "rb") as data:
+                h.update(data.read())
+            setattr(f, name, h.hexdigest())
+
+
+def from_path(paths):
+    for path in paths:
+        File.from_path(path, HASHES)
+
+
+def walk(root):
+    return list(File.walk(root, HASHES))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    root = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(count):
+            path = os.path.join(root, "sample%d.bin" % i)
+            with open(path, "wb") as f:
+                f.write(os.urandom(size * 1024 * 1024))
+            paths.append(path)
+
+        print("%d files of %d MiB" % (count, size))
+        for name, func, arg in (("by hand", by_hand, paths),
+                                ("from_path", from_path, paths),
+                                ("walk", walk, root)):
+            start = time.time()
+            func(arg)
+            print("  %-10s %.2fs" % (name, time.time() - start))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Measure the cold-start cost of importing python-cybox.
+
+Usage: import_time.py [example.xml]
+
+Each measurement runs in a fresh interpreter. The time taken to import
+``cybox.core`` is reported along with the number of binding modules that were
+loaded. If an XML document is given, the time (and module count) to import
+``cybox.core`` and parse that document is reported as well, showing that only
+the bindings the document actually uses get imported.
+"""
+
+import subprocess
+import sys
+
+RUNS = 5
+
+IMPORT_ONLY = """
+import sys, time
+start = time.time()
+import cybox.core
+elapsed = time.time() - start
+mods = [m for m in sys.modules if m.startswith("cybox.bindings.")]
+print("%f %d" % (elapsed, len(mods)))
+"""
+
+IMPORT_AND_PARSE = """
+import sys, time
+start = time.time()
+import cybox.bindings.cybox_core as core_binding
+from cybox.core import Observables
+Observables.from_obj(core_binding.parse(sys.argv[1]))
+elapsed = time.time() - start
+mods = [m for m in sys.modules if m.startswith("cybox.bindings.")]
+print("%f %d" % (elapsed, len(mods)))
+"""
+
+
+def measure(code, *args):
+    times = []
+    for _ in range(RUNS):
+        cmd = [sys.executable, "-c", code] + list(args)
+        out = subprocess.check_output(cmd).decode("ascii").split()
+        times.append(float(out[0]))
+    return min(times), int(out[1])
+
+
+def main():
+    elapsed, count = measure(IMPORT_ONLY)
+    print("import cybox.core:  %.3fs (%d binding modules)" % (elapsed, count))
+
+    if len(sys.argv) > 1:
+        elapsed, count = measure(IMPORT_AND_PARSE, sys.argv[1])
+        print("import and parse:   %.3fs (%d binding modules)" % (elapsed, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare ``Observables.to_json()``/``from_json()`` with NDJSON streaming.
+
+Usage: ndjson.py [count]
+
+Builds an Observables package of `count` File observables (default 5000),
+writes it to a temporary file and reads it back with each method, reporting
+the wall-clock time and the peak memory allocated (from ``tracemalloc``).
+Reading with ``iter_observables_ndjson()`` only visits each observable, as a
+streaming consumer would, rather than keeping them all, and uses a
+``WeakValueCache`` so the id cache does not keep them either.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cybox.core import Observable, Observables
+from cybox.objects.file_object import File
+from cybox.utils import WeakValueCache, cache_clear, cache_scope, ndjson
+
+
+def make_observables(count):
+    observables = Observables()
+
+    for i in range(count):
+        f = File()
+        f.file_name = "file%d.exe" % i
+        f.file_path = "C:\\Windows\\Temp\\file%d.exe" % i
+        f.size_in_bytes = i * 1024
+        f.add_hash("%032x" % i)
+        observables.add(Observable(f))
+
+    return observables
+
+
+def write_json(observables, path):
+    with open(path, "w") as outfile:
+        outfile.write(observables.to_json())
+
+
+def read_json(path):
+    with open(path) as infile:
+        return len(Observables.from_json(infile))
+
+
+def write_ndjson(observables, path):
+    ndjson.write_ndjson(observables, path)
+
+
+def read_ndjson(path):
+    with cache_scope(WeakValueCache()):
+        return sum(1 for _ in ndjson.iter_observables_ndjson(path))
+
+
+def measure(func, *args):
+    cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    func(*args)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    observables = make_observables(count)
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+
+    try:
+        print("%d observables" % count)
+        for name, write, read in (("json", write_json, read_json),
+                                  ("ndjson", write_ndjson, read_ndjson)):
+            elapsed, peak = measure(write, observables, path)
+            print("  %-7s write %.3fs  peak %.1f MiB" % (name, elapsed, peak / 1048576.0))
+            elapsed, peak = measure(read, path)
+            print("  %-7s read  %.3fs  peak %.1f MiB" % (name, elapsed, peak / 1048576.0))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
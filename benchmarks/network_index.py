@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare finding the networks that contain IP addresses with
+``cybox.index.NetworkIndex`` and with a scan of every Address.
+
+Usage: network_index.py [count] [lookups]
+
+Builds `count` (default 20000) IPv4 and IPv6 network Address observables of
+several prefix lengths, and looks up `lookups` (default 1000) addresses,
+both ways.
+"""
+
+import random
+import sys
+import time
+
+from cybox.core import Observable
+from cybox.index import NetworkIndex, parse_ip, parse_network
+from cybox.objects.address_object import Address
+
+
+def make_observables(count, rng):
+    observables = []
+    for i in range(count):
+        if i % 4 == 3:
+            value = "2001:db8:%x::/%d" % (rng.getrandbits(16), rng.choice((48, 56, 64)))
+            category = Address.CAT_IPV6_NET
+        else:
+            value = "10.%d.%d.0/%d" % (rng.randint(0, 255), rng.randint(0, 255),
+                                       rng.choice((16, 20, 24)))
+            category = Address.CAT_CIDR
+        o = Observable(Address(value, category))
+        o.id_ = "example:Observable-%d" % i
+        observables.append(o)
+    return observables
+
+
+def scan(observables, address):
+    version, value = parse_ip(address)
+    found = []
+    for o in observables:
+        network = parse_network(o.object_.properties.address_value.value)
+        if network and network[0] == version and network[1] <= value <= network[2]:
+            found.append(o.id_)
+    return found
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(1)
+    observables = make_observables(count, rng)
+
+    addresses = []
+    for i in range(lookups):
+        if i % 4 == 3:
+            addresses.append("2001:db8:%x::1" % rng.getrandbits(16))
+        else:
+            addresses.append("10.%d.%d.%d" % (rng.randint(0, 255), rng.randint(0, 255),
+                                              rng.randint(0, 255)))
+
+    start = time.time()
+    index = NetworkIndex(observables)
+    index.contains("10.0.0.1")
+    print("%d networks: index built in %.2fs" % (len(index), time.time() - start))
+
+    start = time.time()
+    found = sum(len(index.lookup(a)) for a in addresses)
+    elapsed = time.time() - start
+    print("  index  %d lookups in %.4fs (%d found)" % (lookups, elapsed, found))
+
+    # The scan is slow, so only time a few lookups and extrapolate.
+    sample = addresses[:20]
+    start = time.time()
+    for a in sample:
+        scan(observables, a)
+    elapsed = (time.time() - start) * lookups / len(sample)
+    print("  scan   %d lookups in %.1fs (estimated)" % (lookups, elapsed))
+
+
+if __name__ == "__main__":
+    main()
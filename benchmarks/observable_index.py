@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare looking up indicator values with ``cybox.index.ObservableIndex`` and
+with a walk over every Observable.
+
+Usage: observable_index.py [count] [lookups]
+
+Builds `count` (default 100000) Address and File observables, indexes them,
+and looks up `lookups` (default 1000) addresses and hashes, half of which are
+present, both ways.
+"""
+
+import sys
+import time
+
+from cybox.core import Observable, Observables
+from cybox.index import ObservableIndex
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+
+
+def make_observables(count):
+    observables = Observables()
+
+    for i in range(count):
+        if i % 2:
+            props = Address("10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255),
+                            Address.CAT_IPV4)
+        else:
+            props = File()
+            props.file_name = "file%d.exe" % i
+            props.md5 = "%032x" % i
+        o = Observable(props)
+        o.id_ = "example:Observable-%d" % i
+        observables.add(o)
+
+    return observables
+
+
+def scan(observables, kind, value):
+    found = set()
+    for o in observables:
+        props = o.object_.properties
+        if kind == ObservableIndex.ADDRESS and isinstance(props, Address):
+            if props.address_value.value == value:
+                found.add(o.id_)
+        elif kind == ObservableIndex.HASH and isinstance(props, File):
+            if props.md5 == value:
+                found.add(o.id_)
+    return found
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    observables = make_observables(count)
+
+    queries = []
+    for i in range(lookups):
+        n = i * 2 if i % 2 else count + i
+        queries.append((ObservableIndex.ADDRESS, "10.%d.%d.%d" % (n >> 16 & 255, n >> 8 & 255, (n + 1) & 255)))
+        queries.append((ObservableIndex.HASH, "%032x" % n))
+
+    start = time.time()
+    index = ObservableIndex(observables)
+    print("%d observables: index built in %.2fs (%d values)" %
+          (count, time.time() - start, len(index)))
+
+    start = time.time()
+    found = sum(len(index.lookup(k, v)) for k, v in queries)
+    elapsed = time.time() - start
+    print("  index  %d lookups in %.4fs (%d found)" % (len(queries), elapsed, found))
+
+    # The scan is slow, so only time a few lookups and extrapolate.
+    sample = queries[:20]
+    start = time.time()
+    for k, v in sample:
+        scan(observables, k, v)
+    elapsed = (time.time() - start) * len(queries) / len(sample)
+    print("  scan   %d lookups in %.1fs (estimated)" % (len(queries), elapsed))
+
+
+if __name__ == "__main__":
+    main()
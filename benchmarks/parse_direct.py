@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare parsing through the generateDS bindings with the direct builder.
+
+Usage: parse_direct.py [example.xml ...]
+
+Each document is parsed into ``cybox.core.Observables`` twice: once with
+``Observables.from_obj(cybox_core.parse(doc))`` and once with
+``cybox.utils.builder.parse(doc)``. The best wall-clock time and the peak
+memory allocated during a parse (from ``tracemalloc``) are reported for each.
+
+If no documents are given, a synthetic document containing a mix of File,
+Address and URI observables is generated and used instead.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cybox.bindings.cybox_core as core_binding
+import cybox.utils
+from cybox.core import Observable, Observables
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+from cybox.utils import builder
+
+RUNS = 5
+SYNTHETIC_COUNT = 2000
+
+
+def two_step(path):
+    return Observables.from_obj(core_binding.parse(path))
+
+
+def direct(path):
+    return builder.parse(path)
+
+
+def make_corpus():
+    observables = Observables()
+
+    for i in range(SYNTHETIC_COUNT):
+        f = File()
+        f.file_name = "file%d.exe" % i
+        f.file_path = "C:\\Windows\\Temp\\file%d.exe" % i
+        f.size_in_bytes = i * 1024
+        f.add_hash("%032x" % i)
+        observables.add(Observable(f))
+        observables.add(Observable(Address("10.0.%d.%d" % (i // 256 % 256, i % 256), Address.CAT_IPV4)))
+        observables.add(Observable(URI("http://example.com/%d" % i)))
+
+    fd, path = tempfile.mkstemp(suffix=".xml")
+    with os.fdopen(fd, "wb") as outfile:
+        outfile.write(observables.to_xml())
+
+    cybox.utils.cache_clear()
+    return path
+
+
+def measure(func, path):
+    best = None
+    for _ in range(RUNS):
+        gc.collect()
+        start = time.time()
+        func(path)
+        elapsed = time.time() - start
+        cybox.utils.cache_clear()
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    cybox.utils.cache_clear()
+
+    return best, peak
+
+
+def main():
+    paths = sys.argv[1:]
+    synthetic = None
+
+    if not paths:
+        synthetic = make_corpus()
+        paths = [synthetic]
+
+    try:
+        for path in paths:
+            print(path)
+            for name, func in (("two-step", two_step), ("direct", direct)):
+                elapsed, peak = measure(func, path)
+                print("  %-9s %.3fs  peak %.1f MiB" % (name, elapsed, peak / 1048576.0))
+    finally:
+        if synthetic:
+            os.remove(synthetic)
+
+
+if __name__ == "__main__":
+    main()
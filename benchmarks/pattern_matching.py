@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Measure the throughput of ``cybox.matching`` pattern matchers.
+
+Usage: pattern_matching.py [count]
+
+Builds `count` (default 100000) File objects and matches a File pattern with
+string, range and hash conditions against them, as entities and as
+dictionaries, with a matcher compiled once and with one compiled for every
+instance.
+"""
+
+import sys
+import time
+
+from cybox.matching import compile_pattern
+from cybox.objects.file_object import File
+
+
+def make_pattern():
+    pattern = File()
+    pattern.file_name = ["evil", "bad", "malware"]
+    pattern.file_name.condition = "Contains"
+    pattern.file_name.is_case_sensitive = False
+    pattern.size_in_bytes = [1024, 65536]
+    pattern.size_in_bytes.condition = "InclusiveBetween"
+    pattern.md5 = ["%032x" % i for i in range(0, 1000, 7)]
+    pattern.md5.condition = "Equals"
+    return pattern
+
+
+def make_files(count):
+    files = []
+    for i in range(count):
+        f = File()
+        f.file_name = "%s%d.exe" % ("Malware" if i % 3 == 0 else "setup", i)
+        f.size_in_bytes = (i * 37) % 100000
+        f.md5 = "%032x" % (i % 1000)
+        files.append(f)
+    return files
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pattern = make_pattern()
+    files = make_files(count)
+    dicts = [f.to_dict() for f in files]
+
+    start = time.time()
+    matcher = compile_pattern(pattern)
+    found = sum(1 for f in files if matcher.match(f))
+    elapsed = time.time() - start
+    print("%d entities: compiled once    %.2fs (%d/s, %d found)" %
+          (count, elapsed, count / elapsed, found))
+
+    start = time.time()
+    found = sum(1 for d in dicts if matcher.match(d))
+    elapsed = time.time() - start
+    print("%d dicts:    compiled once    %.2fs (%d/s, %d found)" %
+          (count, elapsed, count / elapsed, found))
+
+    # Compiling for every instance is slow, so only time a sample.
+    sample = files[:count // 20 or 1]
+    start = time.time()
+    for f in sample:
+        compile_pattern(pattern).match(f)
+    elapsed = (time.time() - start) * count / len(sample)
+    print("%d entities: compiled each    %.2fs (estimated)" % (count, elapsed))
+
+
+if __name__ == "__main__":
+    main()
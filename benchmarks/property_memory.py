@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Measure the memory used by BaseProperty instances.
+
+Usage: property_memory.py [count]
+
+Creates `count` (default 100000) properties in several ways and reports the
+memory allocated per property (from ``tracemalloc``), excluding the memory of
+the values themselves:
+
+* ``String(value)``
+* ``String.from_dict(value)``, as for the plain values in a JSON document
+* ``String.from_obj(binding)``, as for the properties in a parsed XML
+  document, which sets every field
+* ``String.from_obj(binding)`` with a ``condition``, as in a pattern
+"""
+
+import gc
+import sys
+import tracemalloc
+
+import cybox.bindings.cybox_common as common_binding
+from cybox.common import String
+
+
+def make_bindings(count, condition=None):
+    return [
+        common_binding.StringObjectPropertyType(valueOf_=x, condition=condition)
+        for x in make_values(count)
+    ]
+
+
+def make_values(count):
+    return ["value%d" % i for i in range(count)]
+
+
+def measure(func, inputs):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = [func(x) for x in inputs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Don't count the list holding the results.
+    size = after - before - sys.getsizeof(result)
+    del result
+    return float(size) / len(inputs)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    cases = (
+        ("String(value)", String, make_values(count)),
+        ("from_dict(value)", String.from_dict, make_values(count)),
+        ("from_obj(binding)", String.from_obj, make_bindings(count)),
+        ("from_obj(condition)", String.from_obj, make_bindings(count, "Equals")),
+    )
+
+    print("%d properties" % count)
+    for name, func, inputs in cases:
+        print("  %-20s %6.0f bytes each" % (name, measure(func, inputs)))
+
+
+if __name__ == "__main__":
+    main()
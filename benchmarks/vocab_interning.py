@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Measure the effect of vocab interning on parsing.
+
+Usage: vocab_interning.py [count]
+
+Parses `count` (default 20000) File objects, each with an MD5 and a SHA256
+hash, from dictionaries and from binding objects, with and without
+``cybox.common.vocabs.enable_interning()``. Reports the wall-clock time and
+the memory still allocated by the parsed objects (from ``tracemalloc``).
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from cybox.common import vocabs
+from cybox.objects.file_object import File
+
+
+def make_files(count):
+    files = []
+
+    for i in range(count):
+        f = File()
+        f.file_name = "file%d.exe" % i
+        f.add_hash("%032x" % i)
+        f.add_hash("%064x" % i)
+        files.append(f)
+
+    return files
+
+
+def measure(func, inputs):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.time()
+    result = [func(x) for x in inputs]
+    elapsed = time.time() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, after - before
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    files = make_files(count)
+
+    cases = (
+        ("from_dict", File.from_dict, [f.to_dict() for f in files]),
+        ("from_obj", File.from_obj, [f.to_obj() for f in files]),
+    )
+
+    print("%d files" % count)
+    for name, func, inputs in cases:
+        for interning in (False, True):
+            if interning:
+                vocabs.enable_interning()
+            else:
+                vocabs.disable_interning()
+
+            elapsed, size = measure(func, inputs)
+            print("  %-10s interning=%-5s %.3fs  %.1f MiB" %
+                  (name, interning, elapsed, size / 1048576.0))
+
+    vocabs.disable_interning()
+
+
+if __name__ == "__main__":
+    main()
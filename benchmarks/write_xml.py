@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compare ``Observables.to_xml()`` with the streaming ``write_xml()`` and
+``ObservablesWriter``.
+
+Usage: write_xml.py [count]
+
+Builds an Observables package of `count` File observables (default 5000) and
+writes it to a temporary file with each method, reporting the wall-clock
+time and the peak memory allocated during the write (from ``tracemalloc``).
+The memory used by the entities themselves is excluded.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cybox.core import Observable, Observables
+from cybox.objects.file_object import File
+from cybox.utils import writer
+
+
+def make_observables(count):
+    observables = Observables()
+
+    for i in range(count):
+        f = File()
+        f.file_name = "file%d.exe" % i
+        f.file_path = "C:\\Windows\\Temp\\file%d.exe" % i
+        f.size_in_bytes = i * 1024
+        f.add_hash("%032x" % i)
+        observables.add(Observable(f))
+
+    return observables
+
+
+def to_xml(observables, path):
+    with open(path, "wb") as outfile:
+        outfile.write(observables.to_xml())
+
+
+def streaming(observables, path):
+    writer.write_xml(observables, path)
+
+
+def incremental(observables, path):
+    with writer.ObservablesWriter(path) as w:
+        for observable in observables:
+            w.write(observable)
+
+
+def measure(func, observables, path):
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    func(observables, path)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, os.path.getsize(path)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    observables = make_observables(count)
+
+    fd, path = tempfile.mkstemp(suffix=".xml")
+    os.close(fd)
+
+    try:
+        print("%d observables" % count)
+        for name, func in (("to_xml", to_xml), ("write_xml", streaming),
+                           ("writer", incremental)):
+            elapsed, peak, size = measure(func, observables, path)
+            print("  %-10s %.3fs  peak %.1f MiB  (%.1f MiB written)" %
+                  (name, elapsed, peak / 1048576.0, size / 1048576.0))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
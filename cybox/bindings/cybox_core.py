@@ -2,99 +2,104 @@
 # See LICENSE.txt for complete terms.
 
 from __future__ import absolute_import
+import importlib
 import sys
 
 from mixbox.binding_utils import *
 from . import cybox_common
 
-#Object Imports
-from .account_object import AccountObjectType
-from .address_object import AddressObjectType
-from .api_object import APIObjectType
-from .archive_file_object import ArchiveFileObjectType
-from .arp_cache_object import ARPCacheObjectType
-from .artifact_object import ArtifactObjectType
-from .as_object import ASObjectType
-from .code_object import CodeObjectType
-from .custom_object import CustomObjectType
-from .device_object import DeviceObjectType
-from .disk_object import DiskObjectType
-from .disk_partition_object import DiskPartitionObjectType
-from .dns_cache_object import DNSCacheObjectType
-from .dns_query_object import DNSQueryObjectType
-from .dns_record_object import DNSRecordObjectType
-from .domain_name_object import DomainNameObjectType
-from .email_message_object import EmailMessageObjectType
-from .file_object import FileObjectType
-from .gui_dialogbox_object import GUIDialogboxObjectType
-from .gui_object import GUIObjectType
-from .gui_window_object import GUIWindowObjectType
-from .hostname_object import HostnameObjectType
-from .http_session_object import HTTPSessionObjectType
-from .image_file_object import ImageFileObjectType
-from .library_object import LibraryObjectType
-from .link_object import LinkObjectType
-from .linux_package_object import LinuxPackageObjectType
-from .memory_object import MemoryObjectType
-from .mutex_object import MutexObjectType
-from .network_connection_object import NetworkConnectionObjectType
-from .network_flow_object import NetworkFlowObjectType
-from .network_packet_object import NetworkPacketObjectType
-from .network_route_entry_object import NetworkRouteEntryObjectType
-from .network_route_object import NetRouteObjectType
-from .network_socket_object import NetworkSocketObjectType
-from .network_subnet_object import NetworkSubnetObjectType
-from .pdf_file_object import PDFFileObjectType
-from .pipe_object import PipeObjectType
-from .port_object import PortObjectType
-from .product_object import ProductObjectType
-from .process_object import ProcessObjectType
-from .semaphore_object import SemaphoreObjectType
-from .sms_message_object import SMSMessageObjectType
-from .socket_address_object import SocketAddressObjectType
-from .system_object import SystemObjectType
-from .unix_file_object import UnixFileObjectType
-from .unix_network_route_entry_object import UnixNetworkRouteEntryObjectType
-from .unix_pipe_object import UnixPipeObjectType
-from .unix_process_object import UnixProcessObjectType
-from .unix_user_account_object import UnixUserAccountObjectType
-from .unix_volume_object import UnixVolumeObjectType
-from .uri_object import URIObjectType
-from .url_history_object import URLHistoryObjectType
-from .user_account_object import UserAccountObjectType
-from .volume_object import VolumeObjectType
-from .whois_object import WhoisObjectType
-from .win_computer_account_object import WindowsComputerAccountObjectType
-from .win_critical_section_object import WindowsCriticalSectionObjectType
-from .win_driver_object import WindowsDriverObjectType
-from .win_event_log_object import WindowsEventLogObjectType
-from .win_event_object import WindowsEventObjectType
-from .win_executable_file_object import WindowsExecutableFileObjectType
-from .win_file_object import WindowsFileObjectType
-from .win_filemapping_object import WindowsFilemappingObjectType
-from .win_handle_object import WindowsHandleObjectType
-from .win_hook_object import WindowsHookObjectType
-from .win_kernel_hook_object import WindowsKernelHookObjectType
-from .win_kernel_object import WindowsKernelObjectType
-from .win_mailslot_object import WindowsMailslotObjectType
-from .win_memory_page_region_object import WindowsMemoryPageRegionObjectType
-from .win_mutex_object import WindowsMutexObjectType
-from .win_network_route_entry_object import WindowsNetworkRouteEntryObjectType
-from .win_network_share_object import WindowsNetworkShareObjectType
-from .win_pipe_object import WindowsPipeObjectType
-from .win_prefetch_object import WindowsPrefetchObjectType
-from .win_process_object import WindowsProcessObjectType
-from .win_registry_key_object import WindowsRegistryKeyObjectType
-from .win_semaphore_object import WindowsSemaphoreObjectType
-from .win_service_object import WindowsServiceObjectType
-from .win_system_object import WindowsSystemObjectType
-from .win_system_restore_object import WindowsSystemRestoreObjectType
-from .win_task_object import WindowsTaskObjectType
-from .win_thread_object import WindowsThreadObjectType
-from .win_user_account_object import WindowsUserAccountObjectType
-from .win_volume_object import WindowsVolumeObjectType
-from .win_waitable_timer_object import WindowsWaitableTimerObjectType
-from .x509_certificate_object import X509CertificateObjectType
+#: Maps the name of each Object binding class to the binding module it is
+#: defined in. These modules are large, so they are only imported when a
+#: document (or the API) actually needs one. See :func:`_lookup_class`.
+_OBJECT_BINDINGS = {
+    'AccountObjectType': 'account_object',
+    'AddressObjectType': 'address_object',
+    'APIObjectType': 'api_object',
+    'ArchiveFileObjectType': 'archive_file_object',
+    'ARPCacheObjectType': 'arp_cache_object',
+    'ArtifactObjectType': 'artifact_object',
+    'ASObjectType': 'as_object',
+    'CodeObjectType': 'code_object',
+    'CustomObjectType': 'custom_object',
+    'DeviceObjectType': 'device_object',
+    'DiskObjectType': 'disk_object',
+    'DiskPartitionObjectType': 'disk_partition_object',
+    'DNSCacheObjectType': 'dns_cache_object',
+    'DNSQueryObjectType': 'dns_query_object',
+    'DNSRecordObjectType': 'dns_record_object',
+    'DomainNameObjectType': 'domain_name_object',
+    'EmailMessageObjectType': 'email_message_object',
+    'FileObjectType': 'file_object',
+    'GUIDialogboxObjectType': 'gui_dialogbox_object',
+    'GUIObjectType': 'gui_object',
+    'GUIWindowObjectType': 'gui_window_object',
+    'HostnameObjectType': 'hostname_object',
+    'HTTPSessionObjectType': 'http_session_object',
+    'ImageFileObjectType': 'image_file_object',
+    'LibraryObjectType': 'library_object',
+    'LinkObjectType': 'link_object',
+    'LinuxPackageObjectType': 'linux_package_object',
+    'MemoryObjectType': 'memory_object',
+    'MutexObjectType': 'mutex_object',
+    'NetworkConnectionObjectType': 'network_connection_object',
+    'NetworkFlowObjectType': 'network_flow_object',
+    'NetworkPacketObjectType': 'network_packet_object',
+    'NetworkRouteEntryObjectType': 'network_route_entry_object',
+    'NetRouteObjectType': 'network_route_object',
+    'NetworkSocketObjectType': 'network_socket_object',
+    'NetworkSubnetObjectType': 'network_subnet_object',
+    'PDFFileObjectType': 'pdf_file_object',
+    'PipeObjectType': 'pipe_object',
+    'PortObjectType': 'port_object',
+    'ProductObjectType': 'product_object',
+    'ProcessObjectType': 'process_object',
+    'SemaphoreObjectType': 'semaphore_object',
+    'SMSMessageObjectType': 'sms_message_object',
+    'SocketAddressObjectType': 'socket_address_object',
+    'SystemObjectType': 'system_object',
+    'UnixFileObjectType': 'unix_file_object',
+    'UnixNetworkRouteEntryObjectType': 'unix_network_route_entry_object',
+    'UnixPipeObjectType': 'unix_pipe_object',
+    'UnixProcessObjectType': 'unix_process_object',
+    'UnixUserAccountObjectType': 'unix_user_account_object',
+    'UnixVolumeObjectType': 'unix_volume_object',
+    'URIObjectType': 'uri_object',
+    'URLHistoryObjectType': 'url_history_object',
+    'UserAccountObjectType': 'user_account_object',
+    'VolumeObjectType': 'volume_object',
+    'WhoisObjectType': 'whois_object',
+    'WindowsComputerAccountObjectType': 'win_computer_account_object',
+    'WindowsCriticalSectionObjectType': 'win_critical_section_object',
+    'WindowsDriverObjectType': 'win_driver_object',
+    'WindowsEventLogObjectType': 'win_event_log_object',
+    'WindowsEventObjectType': 'win_event_object',
+    'WindowsExecutableFileObjectType': 'win_executable_file_object',
+    'WindowsFileObjectType': 'win_file_object',
+    'WindowsFilemappingObjectType': 'win_filemapping_object',
+    'WindowsHandleObjectType': 'win_handle_object',
+    'WindowsHookObjectType': 'win_hook_object',
+    'WindowsKernelHookObjectType': 'win_kernel_hook_object',
+    'WindowsKernelObjectType': 'win_kernel_object',
+    'WindowsMailslotObjectType': 'win_mailslot_object',
+    'WindowsMemoryPageRegionObjectType': 'win_memory_page_region_object',
+    'WindowsMutexObjectType': 'win_mutex_object',
+    'WindowsNetworkRouteEntryObjectType': 'win_network_route_entry_object',
+    'WindowsNetworkShareObjectType': 'win_network_share_object',
+    'WindowsPipeObjectType': 'win_pipe_object',
+    'WindowsPrefetchObjectType': 'win_prefetch_object',
+    'WindowsProcessObjectType': 'win_process_object',
+    'WindowsRegistryKeyObjectType': 'win_registry_key_object',
+    'WindowsSemaphoreObjectType': 'win_semaphore_object',
+    'WindowsServiceObjectType': 'win_service_object',
+    'WindowsSystemObjectType': 'win_system_object',
+    'WindowsSystemRestoreObjectType': 'win_system_restore_object',
+    'WindowsTaskObjectType': 'win_task_object',
+    'WindowsThreadObjectType': 'win_thread_object',
+    'WindowsUserAccountObjectType': 'win_user_account_object',
+    'WindowsVolumeObjectType': 'win_volume_object',
+    'WindowsWaitableTimerObjectType': 'win_waitable_timer_object',
+    'X509CertificateObjectType': 'x509_certificate_object',
+}
 
 
 class ObservablesType(GeneratedsSuper):
@@ -1806,7 +1811,7 @@ class ObjectType(GeneratedsSuper):
                     type_name_ = type_names_[0]
                 else:
                     type_name_ = type_names_[1]
-                class_ = globals()[type_name_]
+                class_ = _lookup_class(type_name_)
                 obj_ = class_.factory()
                 obj_.build(child_)
             else:
@@ -1824,7 +1829,7 @@ class ObjectType(GeneratedsSuper):
                     type_name_ = type_names_[0]
                 else:
                     type_name_ = type_names_[1]
-                class_ = globals()[type_name_]
+                class_ = _lookup_class(type_name_)
                 obj_ = class_.factory()
                 obj_.build(child_)
             else:
@@ -1865,7 +1870,7 @@ class ObjectType(GeneratedsSuper):
                     type_name_ = type_names_[0]
                 else:
                     type_name_ = type_names_[1]
-                class_ = globals()[type_name_]
+                class_ = _lookup_class(type_name_)
                 obj_ = class_.factory()
                 obj_.build(child_)
             else:
@@ -3941,7 +3946,10 @@ def get_root_tag(node):
     tag = Tag_pattern_.match(node.tag).groups()[-1]
     rootClass = GDSClassesMapping.get(tag)
     if rootClass is None:
-        rootClass = globals().get(tag)
+        try:
+            rootClass = _lookup_class(tag)
+        except KeyError:
+            rootClass = None
     return tag, rootClass
 
 def parse(inFileName):
@@ -4070,3 +4078,75 @@ def add_external_class(klass, name=None):
 
     module = sys.modules[__name__]
     setattr(module, name, klass)
+
+
+def _lookup_class(name):
+    """Return the binding class called `name`.
+
+    Classes defined in (or added to) this module are returned directly.
+    Object binding classes listed in ``_OBJECT_BINDINGS`` are imported from
+    their module on first use and then stored in this module's globals, so
+    later lookups are a plain dict access.
+
+    Raises:
+        KeyError: if `name` is not a known binding class.
+    """
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+
+    module_name = _OBJECT_BINDINGS[name]
+    module = importlib.import_module("." + module_name, __package__)
+    klass = getattr(module, name)
+    globals()[name] = klass
+    return klass
+
+
+def __getattr__(name):
+    # Keep ``cybox_core.FileObjectType``-style attribute access working for
+    # Object binding classes that have not been imported yet (Python 3.7+).
+    try:
+        return _lookup_class(name)
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ is only supported by Python 3.7+. Older versions
+    # get the same lookup from the module's class instead, so that Object
+    # binding classes are still only imported when they are first used.
+    import types
+
+    class _LazyModule(types.ModuleType):
+        def __getattr__(self, name):
+            return __getattr__(name)
+
+    class _ModuleProxy(types.ModuleType):
+        """Stands in for this module where its class cannot be changed
+        (Python < 3.5).
+        """
+
+        def __init__(self, module):
+            types.ModuleType.__init__(self, module.__name__, module.__doc__)
+            self.__dict__["_module"] = module
+
+        def __getattr__(self, name):
+            try:
+                return getattr(self._module, name)
+            except AttributeError:
+                return __getattr__(name)
+
+        def __setattr__(self, name, value):
+            setattr(self._module, name, value)
+
+        def __delattr__(self, name):
+            delattr(self._module, name)
+
+        def __dir__(self):
+            return dir(self._module)
+
+    if sys.version_info >= (3, 5):
+        sys.modules[__name__].__class__ = _LazyModule
+    else:
+        sys.modules[__name__] = _ModuleProxy(sys.modules[__name__])
@@ -1,8 +1,12 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import functools
+import weakref
+
 from mixbox import entities
 from mixbox import fields
+from mixbox import typedlist
 from mixbox.vendor import six
 from mixbox.vendor.six import u
 
@@ -20,8 +24,9 @@ def _set_hash_type(entity, value):
         entity (Hash): The Hash object being modified.
         value (str): The hash value
     """
-    # If the Hash already has a defined type_, exit early:
-    if entity.type_:
+    # If the Hash already has a defined type_, exit early. The stored value
+    # is checked so that an interned type_ is not copied.
+    if entity._fields.get(Hash.type_):
         return
     if not value or not value.value:
         return
@@ -44,16 +49,30 @@ def _set_hash_type(entity, value):
         entity.type_ = Hash.TYPE_OTHER
 
 
+def _type_changed(entity, value):
+    """Callback hook to invalidate the index of every HashList that has
+    indexed the Hash whose type has been set.
+    """
+    for ref in entity._hash_lists:
+        hashes = ref()
+        if hashes is not None:
+            hashes._index = None
+
+
 class Hash(entities.Entity):
     _binding = common_binding
     _binding_class = common_binding.HashType
     _namespace = 'http://cybox.mitre.org/common-2'
 
-    type_ = VocabField("Type", HashName)
+    type_ = VocabField("Type", HashName, postset_hook=_type_changed)
     simple_hash_value = fields.TypedField("Simple_Hash_Value", HexBinary,
                                           postset_hook=_set_hash_type)
     fuzzy_hash_value = fields.TypedField("Fuzzy_Hash_Value", String)
 
+    # Weak references to the HashList hash lists which have indexed this
+    # Hash. They are not copied or pickled.
+    _hash_lists = ()
+
     TYPE_MD5 = u("MD5")
     TYPE_MD6 = u("MD6")
     TYPE_SHA1 = u("SHA1")
@@ -90,6 +109,11 @@ class Hash(entities.Entity):
         else:
             return str(self.simple_hash_value)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_hash_lists", None)
+        return state
+
     # Other_Type and FuzzyHashes not yet supported.
 
 #    @classmethod
@@ -141,12 +165,98 @@ class Hash(entities.Entity):
 #        return hash
 
 
+def _type_value(hash_):
+    """Return the value of the type of `hash_`, without copying an interned
+    type_.
+    """
+    type_ = hash_._fields.get(Hash.type_)
+    return getattr(type_, "value", type_)
+
+
+class _IndexedHashes(typedlist.TypedList):
+    """The list of hashes of a HashList, with an index of the hashes by the
+    value of their type.
+
+    The index is rebuilt after the list is changed, or the type_ of one of its
+    hashes is set. Changing the value of a type in place (``hash.type_.value =
+    ...``) is only noticed for the hash that the index returns.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._index = None
+        super(_IndexedHashes, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        self._index = None
+        super(_IndexedHashes, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._index = None
+        super(_IndexedHashes, self).__delitem__(key)
+
+    def insert(self, idx, value):
+        self._index = None
+        super(_IndexedHashes, self).insert(idx, value)
+
+    def __getstate__(self):
+        # A copy builds its own index, which also has its copies of the
+        # hashes invalidate it.
+        state = self.__dict__.copy()
+        state["_index"] = None
+        return state
+
+    def _watch(self, hash_):
+        """Have setting the type_ of `hash_` invalidate the index."""
+        refs = hash_._hash_lists
+        if any(ref() is self for ref in refs):
+            return
+        refs = [ref for ref in refs if ref() is not None]
+        refs.append(weakref.ref(self))
+        hash_._hash_lists = refs
+
+    def _build_index(self):
+        self._index = index = {}
+
+        for h in self._inner:
+            self._watch(h)
+            try:
+                # The first hash of each type is the one returned.
+                index.setdefault(_type_value(h), h)
+            except TypeError:
+                pass  # A list of values
+
+        return index
+
+    def find(self, type_):
+        """Return the first hash with the type `type_`, or None."""
+        index = self._index
+        if index is None:
+            index = self._build_index()
+
+        h = index.get(type_)
+        if h is not None and _type_value(h) != type_:
+            h = self._build_index().get(type_)
+        return h
+
+
 class HashList(entities.EntityList):
     _binding = common_binding
     _binding_class = common_binding.HashListType
     _namespace = 'http://cybox.mitre.org/common-2'
 
-    hashes = fields.TypedField("Hash", Hash, multiple=True)
+    hashes = fields.TypedField("Hash", Hash, multiple=True,
+                               listfunc=functools.partial(_IndexedHashes, type=Hash))
+
+    #: The hash types of the hash properties, by property name.
+    HASH_TYPES = {
+        "md5": Hash.TYPE_MD5,
+        "sha1": Hash.TYPE_SHA1,
+        "sha224": Hash.TYPE_SHA224,
+        "sha256": Hash.TYPE_SHA256,
+        "sha384": Hash.TYPE_SHA384,
+        "sha512": Hash.TYPE_SHA512,
+        "ssdeep": Hash.TYPE_SSDEEP,
+    }
 
     @property
     def md5(self):
@@ -205,10 +315,46 @@ class HashList(entities.EntityList):
         self._set_hash(Hash.TYPE_SSDEEP, value)
 
     def _hash_lookup(self, type_):
-        for h in self:
-            if h.type_ == type_:
-                return h
-        return None
+        if isinstance(type_, VocabString):
+            type_ = type_.value
+        return self.hashes.find(type_)
+
+    def set_hashes(self, hashes):
+        """Set several hash values at once.
+
+        Args:
+            hashes: A dictionary of hash values by hash property name
+                (``"md5"``, ``"sha256"``, ``"ssdeep"``, ...), as produced by
+                hashing a file with several algorithms. The names are not
+                case-sensitive. Values that are None are skipped.
+
+        Raises:
+            ValueError: If a name is not one of the hash properties.
+        """
+        # Check every name before changing anything.
+        values = []
+        for name, value in six.iteritems(hashes):
+            try:
+                type_ = self.HASH_TYPES[name.lower()]
+            except KeyError:
+                raise ValueError("Unknown hash type: %r" % (name,))
+            if value is not None:
+                values.append((type_, value))
+
+        added = {}
+
+        for type_, value in values:
+            h = self._hash_lookup(type_)
+            if h is None:
+                added[type_] = value
+            elif type_ == Hash.TYPE_SSDEEP:
+                h.fuzzy_hash_value = value
+            else:
+                h.simple_hash_value = value
+
+        # Create the new hashes last, since setting their type_ makes the
+        # next lookup rebuild the index.
+        self.extend([Hash(v, t) for t, v in six.iteritems(added)])
 
     def _set_hash(self, type_, value):
         h = self._hash_lookup(type_)
@@ -5,7 +5,8 @@ from mixbox import fields
 from mixbox.vendor import six
 
 import cybox.bindings.cybox_common as common_binding
-from cybox.common.attribute_groups import PatternFieldGroup
+from cybox.common.attribute_groups import (DEFAULT_APPLY_CONDITION,
+    DEFAULT_DELIM, PatternFieldGroup)
 from cybox.common.datetimewithprecision import (validate_date_precision,
     validate_time_precision, validate_datetime_precision)
 from cybox.utils import normalize_to_xml, denormalize_from_xml
@@ -66,6 +67,159 @@ class ListIntegerField(ListFieldMixin, fields.IntegerField): pass
 class ListLongField(ListFieldMixin, fields.LongField): pass
 
 
+# PatternFieldGroup fields which BaseProperty.__init__() sets to a default.
+_PATTERN_DEFAULTS = {
+    "is_case_sensitive": True,
+    "delimiter": DEFAULT_DELIM,
+    "apply_condition": DEFAULT_APPLY_CONDITION,
+}
+
+
+class _PropertyFields(object):
+    """The ``_fields`` mapping of a BaseProperty.
+
+    Entities normally keep their TypedField values in a dict, but nearly
+    every property only has a value and a datatype, with the twenty or so
+    other fields unset or at their defaults. This keeps the value and the
+    datatype in slots, and only allocates a dict for the other fields once
+    one of them is set to something other than None or its default.
+
+    Setting one of the other fields to None removes it, and the
+    PatternFieldGroup defaults are always present, so the ``in`` test used by
+    TypedField gives the same values as a dict would. Only the parts of the
+    dict interface used by TypedField and Entity are implemented.
+    """
+
+    __slots__ = ("_value_field", "_value", "_datatype_field", "_datatype",
+                 "_extra")
+
+    def __init__(self):
+        self._value_field = None
+        self._value = None
+        self._datatype_field = None
+        self._datatype = None
+        self._extra = None
+
+    def has_extra(self):
+        """Whether any field other than the value and datatype is set to
+        something other than None or its default.
+        """
+        return bool(self._extra)
+
+    def __contains__(self, field):
+        if field is self._value_field or field is self._datatype_field:
+            return True
+        elif field.name in _PATTERN_DEFAULTS:
+            return True
+        return self._extra is not None and field in self._extra
+
+    def __getitem__(self, field):
+        if field is self._value_field:
+            return self._value
+        elif field is self._datatype_field:
+            return self._datatype
+
+        extra = self._extra
+        if extra is not None and field in extra:
+            return extra[field]
+
+        default = _PATTERN_DEFAULTS.get(field.name)
+        if default is None:
+            raise KeyError(field)
+        return default
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __setitem__(self, field, value):
+        name = field.name
+
+        if name == "valueOf_":
+            self._value_field = field
+            self._value = value
+            return
+        elif name == "datatype":
+            self._datatype_field = field
+            self._datatype = value
+            return
+
+        default = _PATTERN_DEFAULTS.get(name)
+        if default is not None:
+            unset = (value == default and type(value) is type(default))
+        else:
+            unset = value is None
+
+        if unset:
+            if self._extra is not None:
+                self._extra.pop(field, None)
+            return
+
+        if self._extra is None:
+            self._extra = {}
+        self._extra[field] = value
+
+    def __delitem__(self, field):
+        if field is self._value_field:
+            self._value_field = self._value = None
+        elif field is self._datatype_field:
+            self._datatype_field = self._datatype = None
+        elif field.name in _PATTERN_DEFAULTS:
+            # Deleting it from a dict would make it read as None.
+            self._extra = self._extra or {}
+            self._extra[field] = None
+        elif self._extra is None:
+            raise KeyError(field)
+        else:
+            del self._extra[field]
+
+    def setdefault(self, field, value=None):
+        if field not in self:
+            self[field] = value
+        return self.get(field)
+
+    def items(self):
+        items = []
+        if self._value_field is not None:
+            items.append((self._value_field, self._value))
+        if self._datatype_field is not None:
+            items.append((self._datatype_field, self._datatype))
+        if self._extra:
+            items.extend(six.iteritems(self._extra))
+        return items
+
+    def keys(self):
+        return [k for k, _ in self.items()]
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    iteritems = items
+    iterkeys = keys
+    itervalues = values
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    def copy(self):
+        other = _PropertyFields()
+        other._value_field = self._value_field
+        other._value = self._value
+        other._datatype_field = self._datatype_field
+        other._datatype = self._datatype
+        if self._extra:
+            other._extra = dict(self._extra)
+        return other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 @six.python_2_unicode_compatible
 class BaseProperty(PatternFieldGroup, entities.Entity):
     __hash__ = entities.Entity.__hash__
@@ -76,9 +230,12 @@ class BaseProperty(PatternFieldGroup, entities.Entity):
     _binding_class = _binding.BaseObjectPropertyType
     _namespace = 'http://cybox.mitre.org/common-2'
 
-    # If `True`, force the "datatype" attribute to be output. This is
-    # necessary in some cases
-    _force_datatype = False
+    # Properties are by far the most numerous entities, so their state is
+    # kept in slots and a _PropertyFields rather than in dicts.
+    # `_force_datatype`: if `True`, force the "datatype" attribute to be
+    # output. This is necessary in some cases.
+    __slots__ = ("_fields", "_force_datatype")
+
     default_datatype = 'string'
 
     # BaseObjectProperty Group
@@ -97,6 +254,9 @@ class BaseProperty(PatternFieldGroup, entities.Entity):
 
     def __init__(self, value=None):
         super(BaseProperty, self).__init__()
+        # Replaces the dict from Entity.__init__(); the PatternFieldGroup
+        # defaults set in it are implied by _PropertyFields.
+        self._fields = _PropertyFields()
         self._force_datatype = False
 
         self.value = value
@@ -183,6 +343,9 @@ class BaseProperty(PatternFieldGroup, entities.Entity):
         dictionary. This makes the JSON representation simpler without losing
         any data fidelity.
         """
+        if not self._fields.has_extra():
+            return True
+
         return (
             # ignore value
             self.id_ is None and
@@ -37,11 +37,48 @@ class VocabFactory(entities.EntityFactory):
         if not key:
             return VocabString
 
-        for xsitype, klass in six.iteritems(_VOCAB_MAP):
-            if key in xsitype:
-                return klass
+        klass = _VOCAB_INDEX.get(key) or _VOCAB_LOOKUPS.get(key)
+        if klass is not None:
+            return klass
 
-        return VocabString
+        if len(_VOCAB_LOOKUPS) >= _MAX_VOCAB_LOOKUPS:
+            _VOCAB_LOOKUPS.clear()
+
+        klass = _VOCAB_LOOKUPS[key] = _search_vocab_map(key)
+        return klass
+
+    @classmethod
+    def from_obj(cls, cls_obj):
+        vocab = super(VocabFactory, cls).from_obj(cls_obj)
+        if _interned is None:
+            return vocab
+        return _intern(vocab)
+
+    @classmethod
+    def from_dict(cls, cls_dict, fallback_xsi_type=None):
+        if _interned is None:
+            return super(VocabFactory, cls).from_dict(cls_dict, fallback_xsi_type)
+
+        # Look up the common forms ("MD5", or {"value": "MD5", "xsi:type":
+        # ...}) before building a new instance.
+        if isinstance(cls_dict, six.string_types):
+            xsi_type, value = fallback_xsi_type, cls_dict
+            klass = cls.entity_class(xsi_type)
+            xsi_type = klass._XSI_TYPE
+        elif isinstance(cls_dict, dict) and _PLAIN_KEYS.issuperset(cls_dict):
+            xsi_type, value = cls_dict.get("xsi:type"), cls_dict.get("value")
+            klass = cls.entity_class(xsi_type)
+        else:
+            klass = None
+
+        if klass is not None and xsi_type == klass._XSI_TYPE:
+            try:
+                return _interned[(klass, value)]
+            except (KeyError, TypeError):
+                pass
+
+        vocab = super(VocabFactory, cls).from_dict(cls_dict, fallback_xsi_type)
+        return _intern(vocab)
 
 
 class VocabList(typedlist.TypedList):
@@ -84,6 +121,21 @@ class VocabField(fields.TypedField):
         return isinstance(value, VocabString)
 
 
+class _SharedFields(dict):
+    """The read-only ``_fields`` of an interned VocabString."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Interned VocabString instances cannot be modified. "
+                        "Assign a new VocabString to the field instead.")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # Copies of an interned VocabString are not shared.
+        return (dict, (dict(self),))
+
+
 class VocabString(PatternFieldGroup, entities.Entity):
     __hash__ = entities.Entity.__hash__
 
@@ -99,6 +151,9 @@ class VocabString(PatternFieldGroup, entities.Entity):
     vocab_reference = fields.TypedField("vocab_reference")
     xsi_type = fields.TypedField("xsi_type", key_name="xsi:type")
 
+    # Set on the instances shared by vocab interning.
+    _interned = False
+
     def __init__(self, value=None):
         super(VocabString, self).__init__()
         self.value = value
@@ -145,10 +200,145 @@ class VocabString(PatternFieldGroup, entities.Entity):
         obj.value = denormalize_from_xml(value=cls_obj.valueOf_, delimiter=obj.delimiter)
         return obj
 
+    def _is_internable(self):
+        """Whether this instance holds nothing but a single value and the
+        defaults of its class, so it can be shared by vocab interning.
+        """
+        fields = self._fields
+        return (
+            isinstance(fields.get(VocabString.value), six.string_types) and
+            fields.get(VocabString.xsi_type) == self._XSI_TYPE and
+            fields.get(VocabString.vocab_name) is None and
+            fields.get(VocabString.vocab_reference) is None and
+            PatternFieldGroup.is_plain(self)
+        )
+
+
+#: The interned VocabString instances, by class and value, or None if vocab
+#: interning is disabled.
+_interned = None
+
+#: The keys of a dictionary that may describe an internable VocabString.
+_PLAIN_KEYS = frozenset(("value", "xsi:type"))
+
+
+def _intern(vocab):
+    """Return the shared instance equal to `vocab`, making `vocab` the shared
+    instance if there is none yet.
+    """
+    interned = _interned
+    if interned is None or vocab is None or vocab._interned:
+        return vocab
+    if type(vocab) is not VocabString and type(vocab) not in _INTERNABLE:
+        return vocab
+    if not vocab._is_internable():
+        return vocab
+
+    key = (type(vocab), vocab._fields[VocabString.value])
+    shared = interned.get(key)
+    if shared is None:
+        vocab._fields = _SharedFields(vocab._fields)
+        vocab._interned = True
+        shared = interned.setdefault(key, vocab)
+    return shared
+
+
+def enable_interning():
+    """Share parsed VocabString instances across the process.
+
+    While enabled, every VocabString that ``from_obj()`` or ``from_dict()``
+    parses for a :class:`VocabField` is replaced by a shared instance if it
+    holds only a value, such as the ``HashName`` "MD5" or the
+    ``ObjectRelationship`` "Contains". Parsing a feed where the same values
+    repeat then keeps one instance per distinct value instead of one per
+    occurrence.
+
+    Shared instances are read-only, and are returned as they are by reads
+    such as ``hash.type_``, so reading a parsed document does not copy them.
+    Modifying one in place (``hash.type_.condition = "Equals"``) raises a
+    TypeError. To change the vocab of one owner, assign it a new instance
+    (``hash.type_ = HashName("MD5")``), which leaves the shared instance and
+    its other owners alone.
+    """
+    global _interned
+    if _interned is None:
+        _interned = {}
+
+
+def disable_interning():
+    """Stop sharing parsed VocabString instances and forget the shared
+    instances. Instances that are already shared stay read-only.
+    """
+    global _interned
+    _interned = None
+
+
+def is_interning():
+    """Return True if vocab interning is enabled."""
+    return _interned is not None
+
+
+def clear_interned():
+    """Forget the shared instances, keeping interning enabled."""
+    if _interned is not None:
+        _interned.clear()
+
 
 #: Mapping of Controlled Vocabulary xsi:type's to their class implementations.
 _VOCAB_MAP = {}
 
+#: The registered VocabString classes, which vocab interning may share.
+_INTERNABLE = set()
+
+#: The class VocabFactory.entity_class() returns for each registered xsi:type,
+#: with and without its prefix and version.
+_VOCAB_INDEX = {}
+
+#: The classes VocabFactory.entity_class() has found for other keys, which
+#: includes unknown xsi:types (VocabString).
+_VOCAB_LOOKUPS = {}
+
+#: The number of keys in _VOCAB_LOOKUPS above which it is cleared, so that a
+#: document full of unknown types does not grow it without limit.
+_MAX_VOCAB_LOOKUPS = 1024
+
+
+def _search_vocab_map(key):
+    """Return the class of the first registered xsi:type that contains
+    `key`, or VocabString.
+    """
+    for xsitype, klass in six.iteritems(_VOCAB_MAP):
+        if key in xsitype:
+            return klass
+
+    return VocabString
+
+
+def _vocab_aliases(xsi_type):
+    """Return the forms of `xsi_type` with and without its prefix and its
+    version, e.g. ``cyboxVocabs:HashNameVocab-1.0``, ``HashNameVocab-1.0``,
+    ``cyboxVocabs:HashNameVocab`` and ``HashNameVocab``.
+    """
+    prefix, _, typename = xsi_type.rpartition(":")
+    name = typename.rsplit("-", 1)[0]
+    aliases = [xsi_type, typename, name]
+    if prefix:
+        aliases.append("%s:%s" % (prefix, name))
+    return aliases
+
+
+def _index_vocabs():
+    """Rebuild the lookup tables of VocabFactory.entity_class()."""
+    _VOCAB_INDEX.clear()
+    _VOCAB_LOOKUPS.clear()
+
+    for xsitype in _VOCAB_MAP:
+        for alias in _vocab_aliases(xsitype):
+            if alias not in _VOCAB_INDEX:
+                # An alias may also be part of an xsi:type registered before,
+                # which takes precedence.
+                _VOCAB_INDEX[alias] = _search_vocab_map(alias)
+
 
 def _get_terms(vocab_class):
     """Helper function used by register_vocab."""
@@ -165,6 +355,8 @@ def register_vocab(cls):
     beginning with ``TERM_``.
     """
     _VOCAB_MAP[cls._XSI_TYPE] = cls  # noqa
+    _INTERNABLE.add(cls)
+    _index_vocabs()
 
     cls._ALLOWED_VALUES = tuple(_get_terms(cls))
     return cls
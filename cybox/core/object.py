@@ -67,7 +67,11 @@ class Object(entities.Entity):
         environment, we encourage the use of ``cybox.utils.caches.cache_clear()``
         in your script to prevent an Out of Memory error. Depending on your
         use case, it can be after serialization or if a certain threshold is
-        met (e.g. %30 of memory consumed by cache mechanism).
+        met (e.g. %30 of memory consumed by cache mechanism). Alternatively,
+        ``cybox.utils.caches.set_global_cache()`` can be used to install a
+        bounded ``cybox.utils.caches.LRUCache``, or a
+        ``cybox.utils.caches.WeakValueCache`` which only keeps Objects that
+        are still referenced elsewhere.
 
     """
     _binding = core_binding
@@ -0,0 +1,545 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+In-memory index of the indicator values of Observables.
+
+An :class:`ObservableIndex` is built once from a collection of Observables,
+and then answers questions such as "which observables mention this IP
+address?" with a dictionary lookup, instead of a walk over every object::
+
+    index = ObservableIndex(observables)
+    index.lookup(ObservableIndex.ADDRESS, "10.0.0.1")   # {"example:Observable-1"}
+    index.lookup(ObservableIndex.HASH, "D41D8CD98F00B204E9800998ECF8427E")
+
+The indexed values are:
+
+=================  ========================================================
+Kind               Values
+=================  ========================================================
+``address``        ``Address.address_value``
+``uri``            ``URI.value``
+``domain``         ``DomainName.value``
+``hash``           The hash values in the ``hashes`` of a ``File`` or an
+                   ``Artifact``
+``file_name``      ``File.file_name``
+``mutex``          ``Mutex.name``
+``registry_key``   ``WinRegistryKey.key``
+=================  ========================================================
+
+Values are normalized the same way when they are indexed and when they are
+looked up (see :data:`NORMALIZERS`), so that, for example, hash values and
+domain names are not case-sensitive. A property with a list of values is
+indexed under each value. Properties with a ``condition`` other than
+``Equals``, such as ``Contains``, describe patterns rather than values and
+are not indexed.
+
+A :class:`NetworkIndex` answers "which observables have a network containing
+this IP address?" for networks such as ``10.0.0.0/8`` and address ranges::
+
+    networks = NetworkIndex(observables)
+    networks.lookup("10.1.2.3")          # most specific network first
+    networks.longest_match("10.1.2.3")
+"""
+
+import binascii
+import socket
+
+from mixbox.vendor import six
+
+from cybox.core import Observable, Observables
+from cybox.objects.address_object import Address
+from cybox.objects.artifact_object import Artifact
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.mutex_object import Mutex
+from cybox.objects.uri_object import URI
+from cybox.objects.win_registry_key_object import WinRegistryKey
+
+ADDRESS = "address"
+URI_VALUE = "uri"
+DOMAIN = "domain"
+HASH = "hash"
+FILE_NAME = "file_name"
+MUTEX = "mutex"
+REGISTRY_KEY = "registry_key"
+KINDS = (ADDRESS, URI_VALUE, DOMAIN, HASH, FILE_NAME, MUTEX, REGISTRY_KEY)
+
+
+def _normalize_text(value):
+    return six.text_type(value).strip()
+
+
+def _normalize_lower(value):
+    return _normalize_text(value).lower()
+
+
+def _normalize_address(value):
+    value = _normalize_lower(value)
+
+    # Use the canonical form of IPv6 addresses, so that "::1" and "0::1"
+    # are the same.
+    if ":" in value and "@" not in value:
+        try:
+            packed = socket.inet_pton(socket.AF_INET6, value)
+            value = six.text_type(socket.inet_ntop(socket.AF_INET6, packed))
+        except (AttributeError, ValueError, socket.error):
+            pass
+
+    return value
+
+
+def _normalize_domain(value):
+    return _normalize_lower(value).rstrip(".")
+
+
+#: The function used to normalize the values of each kind.
+NORMALIZERS = {
+    ADDRESS: _normalize_address,
+    URI_VALUE: _normalize_text,
+    DOMAIN: _normalize_domain,
+    HASH: _normalize_lower,
+    FILE_NAME: _normalize_text,
+    MUTEX: _normalize_text,
+    REGISTRY_KEY: _normalize_lower,
+}
+
+
+def _hash_values(hashes):
+    for h in hashes or ():
+        yield h.simple_hash_value
+        yield h.fuzzy_hash_value
+
+
+def _file_values(properties):
+    yield FILE_NAME, properties.file_name
+    for value in _hash_values(properties.hashes):
+        yield HASH, value
+
+
+def _artifact_values(properties):
+    for value in _hash_values(properties.hashes):
+        yield HASH, value
+
+
+#: The functions which yield the (kind, property) pairs to index for each
+#: ObjectProperties class. Subclasses, such as WinFile, use the function of
+#: their closest base class in this mapping.
+EXTRACTORS = {
+    Address: lambda p: [(ADDRESS, p.address_value)],
+    URI: lambda p: [(URI_VALUE, p.value)],
+    DomainName: lambda p: [(DOMAIN, p.value)],
+    File: _file_values,
+    Artifact: _artifact_values,
+    Mutex: lambda p: [(MUTEX, p.name)],
+    WinRegistryKey: lambda p: [(REGISTRY_KEY, p.key)],
+}
+
+
+def _is_exact(prop):
+    condition = getattr(prop, "condition", None)
+    return condition is None or condition == "Equals"
+
+
+def _property_values(prop):
+    """Yield the values of a property, or of a plain value."""
+    value = getattr(prop, "value", prop)
+    if isinstance(value, list):
+        for x in value:
+            if x is not None:
+                yield x
+    elif value is not None:
+        yield value
+
+
+def _iter_objects(obj, owner):
+    if obj.properties is not None:
+        yield obj.properties, owner
+    for related in obj.related_objects or ():
+        for item in _iter_objects(related, owner):
+            yield item
+
+
+def _iter_observable(observable, owner):
+    owner = observable.id_ or observable.idref or owner
+
+    if owner is not None and observable.object_ is not None:
+        for item in _iter_objects(observable.object_, owner):
+            yield item
+
+    composition = observable.observable_composition
+    if composition is not None:
+        for child in composition.observables:
+            for item in _iter_observable(child, owner):
+                yield item
+
+
+def _iter_properties(observables):
+    """Yield an (ObjectProperties, owner id) tuple for each object of
+    `observables`, including related objects and the objects of
+    compositions.
+    """
+    if isinstance(observables, Observable):
+        observables = [observables]
+    elif isinstance(observables, Observables):
+        observables = observables.observables
+
+    for observable in observables:
+        for item in _iter_observable(observable, None):
+            yield item
+
+
+class ObservableIndex(object):
+    """An index of the indicator values of Observables, by kind and
+    normalized value, to the ids of the Observables that contain them.
+
+    Args:
+        observables: Observables to :meth:`add`, if any.
+    """
+
+    ADDRESS = ADDRESS
+    URI = URI_VALUE
+    DOMAIN = DOMAIN
+    HASH = HASH
+    FILE_NAME = FILE_NAME
+    MUTEX = MUTEX
+    REGISTRY_KEY = REGISTRY_KEY
+
+    def __init__(self, observables=None):
+        # kind -> normalized value -> id, or set of ids if there are more
+        # than one. Most values belong to a single observable.
+        self._index = dict((kind, {}) for kind in KINDS)
+        self._extractors = {}
+
+        if observables is not None:
+            self.add(observables)
+
+    def add(self, observables):
+        """Index the values of `observables`.
+
+        Args:
+            observables: A :class:`cybox.core.Observables`, a single
+                :class:`cybox.core.Observable`, or any iterable of
+                Observables.
+
+        The values of an Observable are indexed under its ``id_`` (or its
+        ``idref``). The objects of an ``observable_composition`` are indexed
+        under the id of their own Observable, or the id of the enclosing
+        Observable if they have none. Observables with no id at all are not
+        indexed.
+        """
+        for properties, owner in _iter_properties(observables):
+            extract = self._extractor(type(properties))
+            if extract is not None:
+                for kind, prop in extract(properties):
+                    if prop is not None and _is_exact(prop):
+                        for value in _property_values(prop):
+                            self._add_value(kind, value, owner)
+
+    def _extractor(self, klass):
+        try:
+            return self._extractors[klass]
+        except KeyError:
+            pass
+
+        for base in klass.__mro__:
+            if base in EXTRACTORS:
+                extract = EXTRACTORS[base]
+                break
+        else:
+            extract = None
+
+        self._extractors[klass] = extract
+        return extract
+
+    def _add_value(self, kind, value, owner):
+        values = self._index[kind]
+        value = NORMALIZERS[kind](value)
+
+        ids = values.get(value)
+        if ids is None:
+            values[value] = owner
+        elif isinstance(ids, set):
+            ids.add(owner)
+        elif ids != owner:
+            values[value] = set([ids, owner])
+
+    def _get(self, kind, value):
+        try:
+            values = self._index[kind]
+        except KeyError:
+            raise ValueError("Unknown kind of value: %r" % (kind,))
+        return values.get(NORMALIZERS[kind](value))
+
+    def lookup(self, kind, value):
+        """Return the set of ids of the Observables that contain `value`.
+
+        Args:
+            kind: One of :data:`KINDS`, such as ``ObservableIndex.ADDRESS``.
+            value: The value to look up. It is normalized like the indexed
+                values.
+
+        Raises:
+            ValueError: If `kind` is not one of :data:`KINDS`.
+        """
+        ids = self._get(kind, value)
+        if ids is None:
+            return set()
+        elif isinstance(ids, set):
+            return set(ids)
+        return set([ids])
+
+    def contains(self, kind, value):
+        """Return True if any Observable contains `value`."""
+        return self._get(kind, value) is not None
+
+    def values(self, kind):
+        """Return the normalized values of `kind` in the index."""
+        return list(self._index[kind])
+
+    def __len__(self):
+        """The number of distinct (kind, value) pairs in the index."""
+        return sum(len(x) for x in six.itervalues(self._index))
+
+
+#: The Address categories whose values are networks, such as
+#: ``10.0.0.0/8``.
+NETWORK_CATEGORIES = (Address.CAT_CIDR, Address.CAT_IPV4_NET, Address.CAT_IPV6_NET)
+
+_FAMILIES = ((4, socket.AF_INET), (6, socket.AF_INET6))
+_BITS = {4: 32, 6: 128}
+
+
+def parse_ip(value):
+    """Return an ``(IP version, integer)`` tuple for an IPv4 or IPv6 address,
+    or None if `value` is not one.
+    """
+    value = _normalize_text(value)
+
+    for version, family in _FAMILIES:
+        try:
+            packed = socket.inet_pton(family, value)
+        except (AttributeError, ValueError, socket.error):
+            continue
+        return version, int(binascii.hexlify(packed), 16)
+
+    return None
+
+
+def _prefix_length(mask, version):
+    """Return the prefix length of a netmask such as ``255.255.0.0``."""
+    parsed = parse_ip(mask)
+    if parsed is None or parsed[0] != version:
+        return None
+
+    bits = _BITS[version]
+    inverted = ~parsed[1] & ((1 << bits) - 1)
+    if inverted & (inverted + 1):
+        # Not a contiguous mask.
+        return None
+    return bits - inverted.bit_length()
+
+
+def parse_network(value):
+    """Return an ``(IP version, first, last)`` tuple of the integer
+    addresses of a network such as ``10.0.0.0/8``, ``10.0.0.0/255.0.0.0`` or
+    ``2001:db8::/32``, or None if `value` is not a network. A single address
+    is a network of one address.
+    """
+    value = _normalize_text(value)
+    address, slash, prefix = value.partition("/")
+
+    parsed = parse_ip(address)
+    if parsed is None:
+        return None
+
+    version, first = parsed
+    bits = _BITS[version]
+
+    if not slash:
+        length = bits
+    elif prefix.isdigit():
+        length = int(prefix)
+    else:
+        length = _prefix_length(prefix, version)
+
+    if length is None or length > bits:
+        return None
+
+    host_mask = (1 << (bits - length)) - 1
+    first &= ~host_mask
+    return version, first, first | host_mask
+
+
+def _address_networks(properties):
+    """Yield the (version, first, last) networks of an Address pattern."""
+    prop = properties.address_value
+    if prop is None:
+        return
+
+    if getattr(prop, "condition", None) == "InclusiveBetween":
+        values = list(_property_values(prop))
+        if len(values) != 2:
+            return
+        low, high = parse_ip(values[0]), parse_ip(values[1])
+        if low and high and low[0] == high[0] and low[1] <= high[1]:
+            yield low[0], low[1], high[1]
+    elif properties.category in NETWORK_CATEGORIES and _is_exact(prop):
+        for value in _property_values(prop):
+            network = parse_network(value)
+            if network is not None:
+                yield network
+
+
+class _NetworkTable(object):
+    """The networks of one IP version as an interval tree.
+
+    The networks are sorted by their first address. The middle network of
+    the list is the root of the tree, and the middle networks of the halves
+    on either side of it are its children, and so on. Each network also
+    records the largest last address in its subtree, so that a lookup can
+    skip the subtrees which end before the address.
+    """
+
+    def __init__(self, networks):
+        entries = sorted(
+            (first, last, (last - first, order, owner))
+            for order, (first, last, owner) in enumerate(networks)
+        )
+        self.firsts = [x[0] for x in entries]
+        self.lasts = [x[1] for x in entries]
+        self.entries = [x[2] for x in entries]
+        self.max_lasts = list(self.lasts)
+        if entries:
+            self._set_max_lasts(0, len(entries))
+
+    def _set_max_lasts(self, lo, hi):
+        """Set the largest last address of the subtree over ``[lo, hi)``,
+        and return it.
+        """
+        mid = (lo + hi) // 2
+        max_last = self.max_lasts[mid]
+        if lo < mid:
+            max_last = max(max_last, self._set_max_lasts(lo, mid))
+        if mid + 1 < hi:
+            max_last = max(max_last, self._set_max_lasts(mid + 1, hi))
+        self.max_lasts[mid] = max_last
+        return max_last
+
+    def lookup(self, address):
+        """Return the (size, order, id) entries of the networks which cover
+        `address`, smallest first.
+        """
+        firsts = self.firsts
+        found = []
+        stack = [(0, len(firsts))] if firsts else []
+
+        while stack:
+            lo, hi = stack.pop()
+            mid = (lo + hi) // 2
+            if self.max_lasts[mid] < address:
+                continue
+            if lo < mid:
+                stack.append((lo, mid))
+            if firsts[mid] <= address:
+                if address <= self.lasts[mid]:
+                    found.append(self.entries[mid])
+                if mid + 1 < hi:
+                    stack.append((mid + 1, hi))
+
+        found.sort()
+        return found
+
+
+class NetworkIndex(object):
+    """An index of the networks of Address patterns, which finds the
+    networks that contain an IP address without checking every network.
+
+    The networks are the values of Addresses with a category in
+    :data:`NETWORK_CATEGORIES`, such as ``10.0.0.0/8``, and the ranges of
+    IPv4 and IPv6 Addresses with an ``InclusiveBetween`` condition. Networks
+    are indexed under the ids of their Observables like in
+    :class:`ObservableIndex`.
+
+    The networks of each IP version are kept in an interval tree, so the
+    index grows linearly with the number of networks, and a lookup takes
+    time logarithmic in their number for each network it finds.
+
+    Args:
+        observables: Observables to :meth:`add`, if any.
+    """
+
+    def __init__(self, observables=None):
+        # IP version -> [(first, last, id), ...]
+        self._networks = {4: [], 6: []}
+        self._tables = None
+
+        if observables is not None:
+            self.add(observables)
+
+    def add(self, observables):
+        """Index the networks of `observables`, which can be an
+        :class:`cybox.core.Observables`, a single
+        :class:`cybox.core.Observable`, or any iterable of Observables.
+        """
+        for properties, owner in _iter_properties(observables):
+            if isinstance(properties, Address):
+                self.add_network(properties, owner)
+
+    def add_network(self, address, id_):
+        """Index the networks of the Address `address` under `id_`."""
+        for version, first, last in _address_networks(address):
+            self._networks[version].append((first, last, id_))
+            self._tables = None
+
+    def __len__(self):
+        """The number of networks in the index."""
+        return sum(len(x) for x in six.itervalues(self._networks))
+
+    def _covers(self, address):
+        if self._tables is None:
+            self._tables = dict(
+                (version, _NetworkTable(networks))
+                for version, networks in six.iteritems(self._networks)
+            )
+
+        parsed = parse_ip(address)
+        if parsed is None:
+            raise ValueError("Not an IPv4 or IPv6 address: %r" % (address,))
+
+        version, value = parsed
+        return self._tables[version].lookup(value)
+
+    def lookup(self, address):
+        """Return the ids of the Observables with a network that contains
+        `address`, from the most specific network to the least, without
+        duplicates.
+
+        Raises:
+            ValueError: If `address` is not an IPv4 or IPv6 address.
+        """
+        ids = []
+        seen = set()
+        for _, _, owner in self._covers(address):
+            if owner not in seen:
+                seen.add(owner)
+                ids.append(owner)
+        return ids
+
+    def longest_match(self, address):
+        """Return the set of the ids of the Observables with the smallest
+        network that contains `address`, such as the one with the longest
+        prefix. The set is empty if no network contains it.
+
+        Raises:
+            ValueError: If `address` is not an IPv4 or IPv6 address.
+        """
+        covers = self._covers(address)
+        if not covers:
+            return set()
+        size = covers[0][0]
+        return set(owner for s, _, owner in covers if s == size)
+
+    def contains(self, address):
+        """Return True if any network contains `address`."""
+        return bool(self._covers(address))
@@ -0,0 +1,143 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Parallel parsing of many CybOX XML documents.
+
+:func:`parse_many` parses a batch of files across a pool of worker processes
+and yields one :class:`ParseResult` per file. A file which fails to parse is
+reported in its result and does not stop the rest of the batch.
+"""
+
+import multiprocessing
+import traceback
+
+import cybox.bindings.cybox_core as core_binding
+from cybox.core import Observables
+from cybox.utils import cache_scope
+
+OUTPUT_DICT = "dict"
+OUTPUT_ENTITY = "entity"
+OUTPUTS = (OUTPUT_DICT, OUTPUT_ENTITY)
+
+
+class ParseResult(object):
+    """The outcome of parsing a single file.
+
+    Attributes:
+        path: The path of the file that was parsed.
+        observables: The parsed document, as a dictionary or a
+            :class:`cybox.core.Observables` instance depending on the
+            requested output. ``None`` if parsing failed.
+        error: ``None`` on success, otherwise the formatted traceback of the
+            exception raised while parsing the file.
+    """
+
+    def __init__(self, path, observables=None, error=None):
+        self.path = path
+        self.observables = observables
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else "error"
+        return "<ParseResult %s (%s)>" % (self.path, status)
+
+
+def _parse_file(path, output=OUTPUT_DICT):
+    """Parse `path` into an Observables dictionary, or into an Observables
+    entity if `output` is ``"entity"``.
+
+    Each document gets its own cache so that ids from different documents
+    never collide, and the cache is dropped along with the document.
+
+    Entities cannot be pickled, so the worker processes always produce the
+    dictionary representation to send back to the parent process.
+    """
+    try:
+        with cache_scope():
+            observables = Observables.from_obj(core_binding.parse(path))
+            if output == OUTPUT_ENTITY:
+                return ParseResult(path, observables)
+            return ParseResult(path, observables.to_dict())
+    except Exception:
+        return ParseResult(path, error=traceback.format_exc())
+
+
+def _finish(result, output):
+    """Convert a worker result into the requested output type.
+
+    Like the parsing in :func:`_parse_file`, each document is rebuilt in its
+    own cache, so that its ids do not collide with those of other documents
+    or end up in the global cache.
+    """
+    if result.ok and output == OUTPUT_ENTITY:
+        try:
+            with cache_scope():
+                result.observables = Observables.from_dict(result.observables)
+        except Exception:
+            result.observables = None
+            result.error = traceback.format_exc()
+    return result
+
+
+def parse_many(paths, workers=None, output=OUTPUT_DICT, ordered=True,
+               chunksize=1):
+    """Parse many CybOX XML documents in parallel.
+
+    Parsing (the XML parsing and the conversion into entities) happens in a
+    pool of worker processes. Results are yielded as soon as they are
+    available, so the whole batch never needs to be held in memory.
+
+    Args:
+        paths: An iterable of filenames.
+        workers: The number of worker processes. Defaults to the number of
+            CPUs. If ``1``, files are parsed in the current process.
+        output: ``"dict"`` to return each document as a dictionary (as from
+            ``Observables.to_dict()``), or ``"entity"`` to return
+            :class:`cybox.core.Observables` instances. Entities parsed by
+            worker processes are rebuilt from the dictionary in the calling
+            process.
+        ordered: If ``True``, results are yielded in the same order as
+            `paths`. Otherwise they are yielded as they complete.
+        chunksize: The number of files handed to a worker at a time. Larger
+            values reduce overhead when parsing many small files.
+
+    Returns:
+        An iterator of :class:`ParseResult`, one for every path.
+
+    Raises:
+        ValueError: If `output` is not one of ``"dict"`` or ``"entity"``.
+    """
+    if output not in OUTPUTS:
+        raise ValueError("output must be one of %s. Received '%s'." %
+                         (OUTPUTS, output))
+
+    return _iter_results(paths, workers, output, ordered, chunksize)
+
+
+def _iter_results(paths, workers, output, ordered, chunksize):
+    """Yield the :class:`ParseResult` for every path. See :func:`parse_many`.
+    """
+    if workers == 1:
+        for path in paths:
+            yield _parse_file(path, output)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        if ordered:
+            results = pool.imap(_parse_file, paths, chunksize)
+        else:
+            results = pool.imap_unordered(_parse_file, paths, chunksize)
+
+        for result in results:
+            yield _finish(result, output)
+
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
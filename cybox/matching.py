@@ -0,0 +1,1095 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Evaluation of CybOX patterns against instance data.
+
+A pattern is an Object whose properties have a ``condition``, such as
+``Contains`` or ``GreaterThan``. :func:`compile_pattern` turns a pattern into
+a :class:`PatternMatcher` once, and the matcher can then be applied to any
+number of instances::
+
+    pattern = File()
+    pattern.file_name = "bad"
+    pattern.file_name.condition = "Contains"
+    pattern.size_in_bytes = [1024, 4096]
+    pattern.size_in_bytes.condition = "InclusiveBetween"
+
+    matcher = compile_pattern(pattern)
+    matcher.match(observable)               # an Observable, Object or File
+    matcher.match(observable.to_dict())     # or their dictionaries
+
+An instance matches if it is of the class of the pattern (or a subclass), and
+every property set on the pattern matches the same property of the instance.
+A pattern property matches if its ``condition`` is true for the instance
+value. A property without a ``condition`` is compared with ``Equals``, and a
+property that is not set on the instance never matches.
+
+A pattern property with a list of values, such as ``["a", "b"]``, is true if
+the condition is true for any of the values (``apply_condition="ANY"``, the
+default), for all of them (``"ALL"``), or for none of them (``"NONE"``). The
+values of ``InclusiveBetween`` and ``ExclusiveBetween`` are the low and high
+bounds instead.
+
+Values are compared as numbers if the pattern value is a number, as dates if
+it is a date, and as text otherwise. Text comparisons follow
+``is_case_sensitive``, except that ``HexBinary`` values, such as hashes, are
+never case-sensitive. ``FitsPattern`` values are Python regular expressions,
+which are searched for in the instance value. ``BitwiseAnd`` is true if all
+the bits of the pattern value are set in the instance value, and
+``BitwiseOr`` if any of them are.
+
+A list of entities in a pattern, such as the hashes of a ``File``, matches if
+each of its items matches an item of the instance list. The ``bit_mask``,
+``has_changed`` and ``trend`` of pattern properties are not evaluated.
+
+:func:`compile_observable` compiles a pattern Observable, which may be an
+``ObservableComposition`` of other pattern Observables, into an
+:class:`ObservableMatcher`, which evaluates a whole collection of instance
+data, such as the Observables seen on a host::
+
+    matcher = compile_observable(rule, observables=package.observables)
+    matcher.match(host_observables)
+
+:class:`BatchMatcher` matches instances against many pattern Objects at once,
+and returns the ids of those which match. It finds all the ``Contains``,
+``StartsWith`` and ``EndsWith`` values of a property with a single scan of
+the instance value.
+"""
+
+import datetime
+import numbers
+import operator
+import re
+
+from mixbox import entities
+from mixbox.dates import parse_date, parse_datetime
+from mixbox.vendor import six
+
+import cybox.objects
+from cybox.common import BaseProperty, HexBinary, ObjectProperties, PatternFieldGroup
+from cybox.common.vocabs import VocabString
+from cybox.utils.ahocorasick import Automaton
+
+EQUALS = "Equals"
+DOES_NOT_EQUAL = "DoesNotEqual"
+CONTAINS = "Contains"
+DOES_NOT_CONTAIN = "DoesNotContain"
+STARTS_WITH = "StartsWith"
+ENDS_WITH = "EndsWith"
+GREATER_THAN = "GreaterThan"
+GREATER_THAN_OR_EQUAL = "GreaterThanOrEqual"
+LESS_THAN = "LessThan"
+LESS_THAN_OR_EQUAL = "LessThanOrEqual"
+INCLUSIVE_BETWEEN = "InclusiveBetween"
+EXCLUSIVE_BETWEEN = "ExclusiveBetween"
+FITS_PATTERN = "FitsPattern"
+BITWISE_AND = "BitwiseAnd"
+BITWISE_OR = "BitwiseOr"
+
+APPLY_ANY = "ANY"
+APPLY_ALL = "ALL"
+APPLY_NONE = "NONE"
+
+OPERATOR_AND = "AND"
+OPERATOR_OR = "OR"
+
+_TESTS = {
+    EQUALS: operator.eq,
+    DOES_NOT_EQUAL: operator.ne,
+    CONTAINS: lambda v, p: p in v,
+    DOES_NOT_CONTAIN: lambda v, p: p not in v,
+    STARTS_WITH: lambda v, p: v.startswith(p),
+    ENDS_WITH: lambda v, p: v.endswith(p),
+    GREATER_THAN: operator.gt,
+    GREATER_THAN_OR_EQUAL: operator.ge,
+    LESS_THAN: operator.lt,
+    LESS_THAN_OR_EQUAL: operator.le,
+    FITS_PATTERN: lambda v, p: p.search(v) is not None,
+    BITWISE_AND: lambda v, p: v & p == p,
+    BITWISE_OR: lambda v, p: v & p != 0,
+}
+
+_BETWEEN = {
+    INCLUSIVE_BETWEEN: lambda v, low, high: low <= v <= high,
+    EXCLUSIVE_BETWEEN: lambda v, low, high: low < v < high,
+}
+
+#: The supported values of ``condition``.
+CONDITIONS = tuple(sorted(set(_TESTS) | set(_BETWEEN)))
+
+# The relative cost of evaluating a condition for one pattern value. Other
+# conditions cost 1.
+_CONDITION_COSTS = {
+    STARTS_WITH: 2,
+    ENDS_WITH: 2,
+    CONTAINS: 3,
+    DOES_NOT_CONTAIN: 3,
+    FITS_PATTERN: 20,
+}
+
+# Conditions which always compare text.
+_TEXT_CONDITIONS = (CONTAINS, DOES_NOT_CONTAIN, STARTS_WITH, ENDS_WITH,
+                    FITS_PATTERN)
+
+# The fields of every BaseProperty and VocabString, and the precision of
+# dates and times. Any other field set on a pattern property, such as the
+# name of a custom Property, must be equal on the instance.
+_PROPERTY_ATTRS = frozenset(
+    [name for klass in (BaseProperty, VocabString)
+     for name, _ in klass.typed_fields_with_attrnames()] +
+    ["precision"]
+)
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _to_number(value):
+    if _is_number(value):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    try:
+        return parse_datetime(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    elif isinstance(value, datetime.date):
+        return value
+    try:
+        return parse_date(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _to_text(value):
+    return six.text_type(value)
+
+
+def _to_lower_text(value):
+    return six.text_type(value).lower()
+
+
+def _normalizer(condition, values, case_sensitive):
+    """Return the function which converts instance values (and pattern
+    values) to the type they are compared as.
+    """
+    if condition in (BITWISE_AND, BITWISE_OR):
+        return _to_number
+    elif condition in _TEXT_CONDITIONS:
+        pass
+    elif all(_is_number(x) for x in values):
+        return _to_number
+    elif all(isinstance(x, datetime.datetime) for x in values):
+        return _to_datetime
+    elif all(isinstance(x, datetime.date) for x in values):
+        return _to_date
+
+    return _to_text if case_sensitive else _to_lower_text
+
+
+def _values_predicate(condition, apply_condition, operands):
+    """Return a predicate for a normalized instance value."""
+    if condition in _BETWEEN:
+        if len(operands) != 2:
+            raise ValueError("%s requires a low and a high value, not %r" %
+                             (condition, operands))
+        between = _BETWEEN[condition]
+        low, high = operands
+        return lambda v: between(v, low, high)
+
+    test = _TESTS[condition]
+
+    if len(operands) == 1:
+        operand = operands[0]
+        return lambda v: test(v, operand)
+
+    try:
+        members = frozenset(operands)
+    except TypeError:
+        members = None
+
+    if members is not None:
+        if condition == EQUALS and apply_condition == APPLY_ANY:
+            return members.__contains__
+        if condition == EQUALS and apply_condition == APPLY_NONE:
+            return lambda v: v not in members
+        if condition == DOES_NOT_EQUAL and apply_condition == APPLY_ALL:
+            return lambda v: v not in members
+
+    if apply_condition == APPLY_ANY:
+        return lambda v: any(test(v, p) for p in operands)
+    elif apply_condition == APPLY_ALL:
+        return lambda v: all(test(v, p) for p in operands)
+    return lambda v: not any(test(v, p) for p in operands)
+
+
+def _leaf_value(instance):
+    if isinstance(instance, PatternFieldGroup):
+        return instance.value
+    elif isinstance(instance, dict):
+        return instance.get("value")
+    return instance
+
+
+def _compile_property(prop):
+    """Return a predicate for the BaseProperty or VocabString `prop`, or
+    None if it has no value to match.
+    """
+    values = prop.value
+    if values is None:
+        return None
+    elif not isinstance(values, list):
+        values = [values]
+
+    condition = prop.condition or EQUALS
+    if condition not in _TESTS and condition not in _BETWEEN:
+        raise ValueError("Unknown condition: %r" % (condition,))
+
+    apply_condition = prop.apply_condition or APPLY_ANY
+    if apply_condition not in (APPLY_ANY, APPLY_ALL, APPLY_NONE):
+        raise ValueError("Unknown apply_condition: %r" % (apply_condition,))
+
+    case_sensitive = (prop.is_case_sensitive is not False and
+                      not isinstance(prop, HexBinary))
+    normalize = _normalizer(condition, values, case_sensitive)
+    operands = [normalize(x) for x in values]
+
+    if any(x is None for x in operands):
+        raise ValueError("Cannot compare %r with the %s condition" %
+                         (values, condition))
+
+    if condition == FITS_PATTERN:
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            operands = [re.compile(x, flags) for x in operands]
+        except re.error as ex:
+            raise ValueError("Invalid FitsPattern regular expression: %s" % ex)
+
+    predicate = _values_predicate(condition, apply_condition, operands)
+
+    def check(value):
+        value = normalize(value)
+        if value is None:
+            return False
+        try:
+            return predicate(value)
+        except TypeError:
+            # For example, a naive and an aware datetime.
+            return False
+
+    extras = _compile_property_extras(prop)
+
+    def match(instance):
+        if instance is None:
+            return False
+        if extras and not all(f(instance) for f in extras):
+            return False
+
+        value = _leaf_value(instance)
+        if value is None:
+            return False
+        elif isinstance(value, list):
+            return any(check(x) for x in value if x is not None)
+        return check(value)
+
+    return match
+
+
+def _compile_property_extras(prop):
+    """Return equality predicates for the fields of `prop` which are not
+    BaseProperty or VocabString fields, such as ``Property.name``.
+    """
+    extras = []
+
+    for attr, field in prop.typed_fields_with_attrnames():
+        if attr in _PROPERTY_ATTRS:
+            continue
+        expected = field.__get__(prop)
+        if expected is None:
+            continue
+        extras.append(_equals_predicate(attr, field, expected))
+
+    return extras
+
+
+def _equals_predicate(attr, field, expected):
+    dict_expected = field.dict_value(expected)
+    key = field.key_name
+
+    def match(instance):
+        if isinstance(instance, dict):
+            return instance.get(key) == dict_expected
+        return getattr(instance, attr, None) == expected
+
+    return match
+
+
+def _plain_predicate(field, expected):
+    # Dictionaries hold the serialized form of values such as dates.
+    dict_expected = field.dict_value(expected)
+    return lambda v: v == expected or v == dict_expected
+
+
+def _compile_value(value):
+    """Return a predicate for the pattern value of a field, or None if it
+    does not constrain the instance.
+    """
+    if value is None:
+        return None
+    elif isinstance(value, PatternFieldGroup):
+        return _compile_property(value)
+    elif isinstance(value, entities.EntityList) and value._dict_as_list():
+        return _compile_list(list(value))
+    elif isinstance(value, entities.Entity):
+        return _EntityMatcher(value).match
+    elif isinstance(value, list):
+        return _compile_list(value)
+    return None
+
+
+def _cost(value):
+    """Estimate the relative cost of matching the pattern value of a field
+    against an instance.
+    """
+    if value is None:
+        return 0
+    elif isinstance(value, PatternFieldGroup):
+        values = value.value
+        if values is None:
+            return 0
+
+        condition = value.condition or EQUALS
+        cost = _CONDITION_COSTS.get(condition, 1)
+        if isinstance(values, list) and condition not in (EQUALS, DOES_NOT_EQUAL):
+            # Equals and DoesNotEqual use a set of the values.
+            cost *= len(values)
+        return cost
+    elif isinstance(value, entities.EntityList) and value._dict_as_list():
+        return sum(_cost(x) for x in value)
+    elif isinstance(value, entities.Entity):
+        return sum(_cost(x) for x in value._fields.values())
+    elif isinstance(value, list):
+        return sum(_cost(x) for x in value)
+    return 1
+
+
+def _compile_list(items):
+    """Return a predicate which is true if every item of the pattern list
+    `items` matches an item of the instance list.
+    """
+    predicates = [p for p in (_compile_value(x) for x in items) if p]
+    if not predicates:
+        return None
+
+    def match(instance):
+        if instance is None:
+            return False
+        elif isinstance(instance, dict):
+            # A single item, or a dictionary form of an EntityList with
+            # more than one field.
+            instance = [instance]
+        instance = list(instance)
+        return all(any(p(x) for x in instance) for p in predicates)
+
+    return match
+
+
+class _EntityMatcher(object):
+    """Matches the fields of an instance entity, or its dictionary, against
+    those set on a pattern entity.
+    """
+
+    def __init__(self, pattern):
+        # (attribute name, dictionary key, predicate), cheapest first, so
+        # that an exact hash comparison fails before a regular expression
+        # is searched.
+        self.constraints = []
+        self.cost = 0
+        costs = []
+
+        for attr, field in pattern.typed_fields_with_attrnames():
+            if attr == "object_reference":
+                continue
+
+            value = pattern._fields.get(field)
+            if value is None or value == []:
+                continue
+
+            predicate = _compile_value(value)
+            if predicate is None:
+                predicate = _plain_predicate(field, value)
+
+            costs.append(_cost(value))
+            self.constraints.append((attr, field.key_name, predicate))
+
+        order = sorted(range(len(costs)), key=costs.__getitem__)
+        self.constraints = [self.constraints[i] for i in order]
+        self.cost = sum(costs)
+
+        # The fields of each instance class, in the order of the
+        # constraints. Subclasses can redefine fields of the same name.
+        self._fields_by_class = {}
+
+    def _fields(self, klass):
+        try:
+            return self._fields_by_class[klass]
+        except KeyError:
+            pass
+
+        fields = tuple(getattr(klass, attr, None)
+                       for attr, _, _ in self.constraints)
+        self._fields_by_class[klass] = fields
+        return fields
+
+    def match(self, instance):
+        if instance is None:
+            return False
+
+        if isinstance(instance, dict):
+            for _, key, predicate in self.constraints:
+                if not predicate(instance.get(key)):
+                    return False
+            return True
+
+        values = instance._fields
+        fields = self._fields(type(instance))
+        for field, (_, _, predicate) in zip(fields, self.constraints):
+            if not predicate(values.get(field)):
+                return False
+        return True
+
+
+def _unwrap(instance):
+    """Return the ObjectProperties, or ObjectProperties dictionary, of an
+    Observable, Object or their dictionaries.
+    """
+    from cybox.core import Object, Observable
+
+    if isinstance(instance, Observable):
+        instance = instance.object_
+    if isinstance(instance, Object):
+        instance = instance.properties
+
+    if isinstance(instance, dict):
+        if "object" in instance:
+            instance = instance["object"]
+        if isinstance(instance, dict) and "properties" in instance:
+            instance = instance["properties"]
+
+    return instance
+
+
+# The ObjectProperties class of each xsi:type of instance dictionaries.
+_DICT_CLASSES = {}
+
+
+def _instance_class(properties):
+    """Return the ObjectProperties class of an instance, or None if it is a
+    dictionary of an unknown type.
+    """
+    if not isinstance(properties, dict):
+        return type(properties)
+
+    xsi_type = properties.get("xsi:type")
+    try:
+        return _DICT_CLASSES[xsi_type]
+    except KeyError:
+        pass
+
+    try:
+        klass = cybox.objects.get_class_for_object_type(xsi_type)
+    except (cybox.objects.UnknownObjectType, ImportError, AttributeError):
+        klass = None
+
+    _DICT_CLASSES[xsi_type] = klass
+    return klass
+
+
+class PatternMatcher(object):
+    """A compiled pattern, which evaluates instance data.
+
+    Use :func:`compile_pattern` to create one.
+
+    Attributes:
+        properties_class: The ObjectProperties class of the pattern.
+        cost: An estimate of the relative cost of matching an instance.
+    """
+
+    def __init__(self, properties):
+        if not isinstance(properties, ObjectProperties):
+            raise ValueError("A pattern must be an ObjectProperties, Object "
+                             "or Observable, not %r" % (properties,))
+
+        self.properties_class = type(properties)
+        self._entity = _EntityMatcher(properties)
+        self.cost = self._entity.cost
+
+    def match(self, instance):
+        """Return True if the instance data matches the pattern.
+
+        Args:
+            instance: An Observable, Object or ObjectProperties, or the
+                ``to_dict()`` of one.
+        """
+        instance = _unwrap(instance)
+        if instance is None:
+            return False
+
+        klass = _instance_class(instance)
+        if klass is None or not issubclass(klass, self.properties_class):
+            return False
+
+        return self._entity.match(instance)
+
+    __call__ = match
+
+
+def compile_pattern(pattern):
+    """Compile a pattern into a :class:`PatternMatcher`.
+
+    Args:
+        pattern: The pattern, as an Observable, Object or ObjectProperties.
+
+    Raises:
+        ValueError: If the pattern has no properties, or a property has an
+            unknown ``condition`` or ``apply_condition``, or values which
+            cannot be compared with its condition.
+    """
+    return PatternMatcher(_unwrap(pattern))
+
+
+def _iter_instances(instances):
+    """Yield the ObjectProperties, or ObjectProperties dictionaries, of a
+    collection of instance data. The Observables of compositions are
+    included.
+    """
+    from cybox.core import Object, Observable, Observables
+
+    if isinstance(instances, Observables):
+        instances = instances.observables
+    elif isinstance(instances, (Observable, Object, ObjectProperties)):
+        instances = [instances]
+    elif isinstance(instances, dict):
+        instances = instances.get("observables", [instances])
+
+    for instance in instances:
+        if isinstance(instance, Observable):
+            composition = instance.observable_composition
+        elif isinstance(instance, dict):
+            composition = instance.get("observable_composition")
+        else:
+            composition = None
+
+        if composition:
+            if isinstance(composition, dict):
+                children = composition.get("observables", [])
+            else:
+                children = composition.observables
+            for properties in _iter_instances(children):
+                yield properties
+            continue
+
+        properties = _unwrap(instance)
+        if properties is not None:
+            yield properties
+
+
+class _Evaluation(object):
+    """The instance data, and the results so far, of one evaluation of an
+    :class:`ObservableMatcher`.
+    """
+
+    def __init__(self, instances):
+        self._by_class = {}
+        for properties in _iter_instances(instances):
+            klass = _instance_class(properties)
+            if klass is not None:
+                self._by_class.setdefault(klass, []).append(properties)
+
+        self._candidates = {}
+        self.costs = {}
+        self.results = {}
+
+    def candidates(self, klass):
+        """Return the instances of `klass` and its subclasses."""
+        try:
+            return self._candidates[klass]
+        except KeyError:
+            pass
+
+        candidates = []
+        for other, instances in six.iteritems(self._by_class):
+            if issubclass(other, klass):
+                candidates.extend(instances)
+
+        self._candidates[klass] = candidates
+        return candidates
+
+
+class _ObjectNode(object):
+    """A pattern Object, true if any instance matches it."""
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+
+    def cost(self, evaluation):
+        candidates = evaluation.candidates(self.matcher.properties_class)
+        return self.matcher.cost * len(candidates)
+
+    def evaluate(self, evaluation):
+        # The candidates are already of the pattern class.
+        match = self.matcher._entity.match
+        candidates = evaluation.candidates(self.matcher.properties_class)
+        return any(match(x) for x in candidates)
+
+
+class _CompositionNode(object):
+    """An ObservableComposition, which evaluates its cheapest children
+    first and stops as soon as its result is known.
+    """
+
+    def __init__(self, operator, children):
+        self.operator = operator
+        self.children = children
+
+    def cost(self, evaluation):
+        try:
+            return evaluation.costs[self]
+        except KeyError:
+            pass
+
+        cost = sum(child.cost(evaluation) for child in self.children)
+        evaluation.costs[self] = cost
+        return cost
+
+    def evaluate(self, evaluation):
+        children = sorted(self.children, key=lambda x: x.cost(evaluation))
+        results = (child.evaluate(evaluation) for child in children)
+
+        if self.operator == OPERATOR_OR:
+            return any(results)
+        return all(results)
+
+
+class _SharedNode(object):
+    """An Observable with an id, which may be referenced by idrefs. It is
+    evaluated at most once per evaluation.
+    """
+
+    def __init__(self, id_, node):
+        self.id_ = id_
+        self.node = node
+
+    def cost(self, evaluation):
+        if self.id_ in evaluation.results:
+            return 0
+        return self.node.cost(evaluation)
+
+    def evaluate(self, evaluation):
+        try:
+            return evaluation.results[self.id_]
+        except KeyError:
+            pass
+
+        result = self.node.evaluate(evaluation)
+        evaluation.results[self.id_] = result
+        return result
+
+
+class ObservableMatcher(object):
+    """A compiled pattern Observable, which may be an ObservableComposition
+    of other pattern Observables, evaluated against a collection of instance
+    data.
+
+    Use :func:`compile_observable` to create one.
+    """
+
+    def __init__(self, pattern, observables=None):
+        from cybox.core import Observables
+
+        if isinstance(observables, Observables):
+            observables = observables.observables
+
+        # The pattern Observables which idrefs can refer to, by id.
+        self._definitions = {}
+        for observable in observables or ():
+            self._define(observable)
+        self._define(pattern)
+
+        self._nodes = {}
+        self._compiling = set()
+        self._root = self._compile(pattern)
+
+    def _define(self, observable):
+        if observable.id_ and (observable.object_ or observable.observable_composition):
+            self._definitions.setdefault(observable.id_, observable)
+
+        composition = observable.observable_composition
+        if composition:
+            for child in composition.observables:
+                self._define(child)
+
+    def _compile(self, observable):
+        id_ = observable.id_
+        if not id_ and not observable.object_ and not observable.observable_composition:
+            id_ = observable.idref
+        if not id_:
+            return self._compile_body(observable)
+
+        try:
+            return self._nodes[id_]
+        except KeyError:
+            pass
+
+        if id_ in self._compiling:
+            raise ValueError("Observable %s refers to itself" % id_)
+
+        try:
+            definition = self._definitions[id_]
+        except KeyError:
+            raise ValueError("Observable %s is not defined" % id_)
+
+        self._compiling.add(id_)
+        try:
+            node = _SharedNode(id_, self._compile_body(definition))
+        finally:
+            self._compiling.discard(id_)
+
+        self._nodes[id_] = node
+        return node
+
+    def _compile_body(self, observable):
+        if observable.object_:
+            return _ObjectNode(compile_pattern(observable.object_))
+
+        composition = observable.observable_composition
+        if composition:
+            children = [self._compile(x) for x in composition.observables]
+            return _CompositionNode(composition.operator, children)
+
+        raise ValueError("A pattern Observable must have an Object or an "
+                         "Observable_Composition")
+
+    def match(self, instances):
+        """Return True if the instance data matches the pattern.
+
+        An Object pattern is true if any instance matches it. An ``AND``
+        composition is true if all of its Observables are, and an ``OR``
+        composition if any of them is.
+
+        Args:
+            instances: The instance data: a :class:`cybox.core.Observables`,
+                or an iterable of Observables, Objects or ObjectProperties,
+                or of their ``to_dict()``.
+        """
+        return self._root.evaluate(_Evaluation(instances))
+
+    __call__ = match
+
+
+def compile_observable(pattern, observables=None):
+    """Compile a pattern Observable into an :class:`ObservableMatcher`.
+
+    The children of an ObservableComposition are evaluated in order of
+    their estimated cost, so that an exact hash comparison, or an Object
+    which no instance has the class of, is evaluated before a regular
+    expression is searched for in every instance. The evaluation of a
+    composition stops as soon as its result is known, and an Observable
+    referred to by several idrefs is evaluated only once.
+
+    Args:
+        pattern: The pattern :class:`cybox.core.Observable`.
+        observables: Other pattern Observables, such as the rest of a
+            :class:`cybox.core.Observables`, that idrefs can refer to.
+
+    Raises:
+        ValueError: If an idref refers to an undefined Observable, or an
+            Observable refers to itself, or for an invalid pattern Object
+            (see :func:`compile_pattern`).
+    """
+    return ObservableMatcher(pattern, observables)
+
+
+# The conditions which BatchMatcher searches for with automata.
+_BATCH_CONDITIONS = (CONTAINS, STARTS_WITH, ENDS_WITH)
+
+
+def _batch_property(prop):
+    """Whether BatchMatcher can find the values of the pattern property
+    `prop` with an automaton.
+    """
+    values = prop.value
+    if not isinstance(values, list):
+        values = [values]
+
+    return (
+        prop.condition in _BATCH_CONDITIONS and
+        (len(values) == 1 or prop.apply_condition in (None, APPLY_ANY)) and
+        all(isinstance(x, six.string_types) for x in values)
+    )
+
+
+def _find_batch_property(entity, path=()):
+    """Find a property of the pattern `entity`, or of the entities it holds,
+    which BatchMatcher can search for.
+
+    Returns:
+        A tuple of the path to the property, as a tuple of (attribute name,
+        dictionary key) tuples, the property, and whether it is the only
+        constraint of the pattern. None if there is no such property.
+    """
+    constraints = []
+    for attr, field in entity.typed_fields_with_attrnames():
+        value = entity._fields.get(field)
+        if attr != "object_reference" and value is not None and value != []:
+            constraints.append(((attr, field.key_name), value))
+
+    sole = len(constraints) == 1
+
+    for step, value in constraints:
+        if isinstance(value, PatternFieldGroup):
+            if _batch_property(value):
+                only = sole and not _compile_property_extras(value)
+                return path + (step,), value, only
+        elif (isinstance(value, entities.Entity) and
+              not (isinstance(value, entities.EntityList) and value._dict_as_list())):
+            found = _find_batch_property(value, path + (step,))
+            if found:
+                return found[0], found[1], found[2] and sole
+
+    return None
+
+
+def _path_values(instance, path):
+    """Return the values of the property at `path` of an instance entity or
+    dictionary.
+    """
+    for attr, key in path:
+        if instance is None:
+            return []
+        elif isinstance(instance, dict):
+            instance = instance.get(key)
+        else:
+            instance = instance._fields.get(getattr(type(instance), attr, None))
+
+    value = _leaf_value(instance)
+    if value is None:
+        return []
+    elif isinstance(value, list):
+        return [x for x in value if x is not None]
+    return [value]
+
+
+class _BatchEntry(object):
+    """A pattern added to a BatchMatcher."""
+
+    __slots__ = ("id_", "matcher", "verify")
+
+    def __init__(self, id_, matcher, verify):
+        self.id_ = id_
+        self.matcher = matcher
+        # Whether the whole pattern has to be matched after its property is
+        # found by an automaton.
+        self.verify = verify
+
+
+class _BatchGroup(object):
+    """The automata for the Contains, StartsWith and EndsWith properties at
+    one path of one ObjectProperties class, with one case-sensitivity.
+    """
+
+    def __init__(self, path, case_sensitive):
+        self.path = path
+        self.case_sensitive = case_sensitive
+        self.contains = Automaton()
+        self.starts = Automaton()
+        # The reversed words, which the reversed value starts with.
+        self.ends = Automaton()
+
+    def add(self, prop, entry):
+        values = prop.value
+        if not isinstance(values, list):
+            values = [values]
+
+        for value in values:
+            if not self.case_sensitive:
+                value = value.lower()
+
+            if prop.condition == CONTAINS:
+                if value:
+                    self.contains.add(value, entry)
+                else:
+                    # Every value contains the empty string.
+                    self.starts.add(value, entry)
+            elif prop.condition == STARTS_WITH:
+                self.starts.add(value, entry)
+            else:
+                self.ends.add(value[::-1], entry)
+
+    def find(self, instance):
+        """Return the entries whose property is found in the instance."""
+        found = set()
+
+        for value in _path_values(instance, self.path):
+            value = six.text_type(value)
+            if not self.case_sensitive:
+                value = value.lower()
+
+            if len(self.contains):
+                found.update(self.contains.values(value))
+            if len(self.starts):
+                found.update(self.starts.prefixes(value))
+            if len(self.ends):
+                found.update(self.ends.prefixes(value[::-1]))
+
+        return found
+
+
+class BatchMatcher(object):
+    """Match instance data against many pattern Objects at once.
+
+    Patterns with a ``Contains``, ``StartsWith`` or ``EndsWith`` property,
+    such as ``URI.value`` or ``File.file_path``, are not evaluated one by one.
+    Instead, the values of all the patterns of the same property are held
+    in Aho-Corasick automata (see :mod:`cybox.utils.ahocorasick`), which find
+    all of them in a single pass over the instance value. Only the patterns
+    found this way, and which have other properties as well, are then
+    evaluated in full. Other patterns are evaluated one by one.
+
+    The properties found with automata must have text values, and a list
+    of values must use the default ``apply_condition`` of ``ANY``.
+
+    Args:
+        observables: Pattern Observables to :meth:`add`, if any.
+    """
+
+    def __init__(self, observables=None):
+        # ObjectProperties class -> (path, case-sensitive) -> _BatchGroup
+        self._groups = {}
+        # ObjectProperties class -> the entries which are not in a group.
+        self._others = {}
+        # Instance class -> the groups and other entries for it.
+        self._by_class = {}
+        self._count = 0
+
+        if observables is not None:
+            self.add(observables)
+
+    def __len__(self):
+        """The number of patterns."""
+        return self._count
+
+    def add(self, observables):
+        """Add pattern Observables.
+
+        Args:
+            observables: A :class:`cybox.core.Observables`, a single
+                :class:`cybox.core.Observable`, or any iterable of
+                Observables. Only Observables with an id and an Object are
+                added; see :func:`compile_observable` for compositions.
+
+        Raises:
+            ValueError: For an invalid pattern Object (see
+                :func:`compile_pattern`).
+        """
+        from cybox.core import Observable, Observables
+
+        if isinstance(observables, Observable):
+            observables = [observables]
+        elif isinstance(observables, Observables):
+            observables = observables.observables
+
+        for observable in observables:
+            if observable.id_ and observable.object_:
+                self.add_pattern(observable.id_, observable.object_.properties)
+
+    def add_pattern(self, id_, properties):
+        """Add the pattern ObjectProperties `properties`, which is reported
+        as `id_` when it matches.
+        """
+        matcher = PatternMatcher(properties)
+        klass = matcher.properties_class
+        found = _find_batch_property(properties)
+
+        if found is None:
+            entry = _BatchEntry(id_, matcher, True)
+            self._others.setdefault(klass, []).append(entry)
+        else:
+            path, prop, only = found
+            entry = _BatchEntry(id_, matcher, not only)
+            case_sensitive = (prop.is_case_sensitive is not False and
+                              not isinstance(prop, HexBinary))
+
+            groups = self._groups.setdefault(klass, {})
+            key = (path, case_sensitive)
+            if key not in groups:
+                groups[key] = _BatchGroup(path, case_sensitive)
+            groups[key].add(prop, entry)
+
+        self._by_class = {}
+        self._count += 1
+
+    def _for_class(self, klass):
+        try:
+            return self._by_class[klass]
+        except KeyError:
+            pass
+
+        groups = []
+        others = []
+        for base in klass.__mro__:
+            groups.extend(six.itervalues(self._groups.get(base, {})))
+            others.extend(self._others.get(base, ()))
+
+        self._by_class[klass] = (groups, others)
+        return groups, others
+
+    def match(self, instance):
+        """Return the set of the ids of the patterns which the instance data
+        matches.
+
+        Args:
+            instance: An Observable, Object or ObjectProperties, or the
+                ``to_dict()`` of one.
+        """
+        instance = _unwrap(instance)
+        if instance is None:
+            return set()
+
+        klass = _instance_class(instance)
+        if klass is None:
+            return set()
+
+        groups, others = self._for_class(klass)
+        ids = set()
+
+        for group in groups:
+            for entry in group.find(instance):
+                if entry.id_ in ids:
+                    continue
+                if not entry.verify or entry.matcher._entity.match(instance):
+                    ids.add(entry.id_)
+
+        for entry in others:
+            if entry.id_ not in ids and entry.matcher._entity.match(instance):
+                ids.add(entry.id_)
+
+        return ids
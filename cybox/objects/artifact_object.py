@@ -2,6 +2,8 @@
 # See LICENSE.txt for complete terms.
 import base64
 import bz2
+import functools
+import re
 import zlib
 
 from mixbox import entities
@@ -11,6 +13,12 @@ from mixbox.compat import xor
 
 import cybox.bindings.artifact_object as artifact_binding
 from cybox.common import ObjectProperties, String, HashList
+from cybox.utils import hashing
+
+
+#: The number of bytes read at a time by Artifact.pack_from() and
+#: Artifact.unpack_to().
+CHUNK_SIZE = 1024 * 1024
 
 
 def validate_artifact_type(instance, value):
@@ -33,6 +41,43 @@ def validate_byte_order_endianness(instance, value):
         raise ValueError(err)
 
 
+class PackagingStep(object):
+    """One packaging layer, applied to data a chunk at a time.
+
+    ``update(data)`` takes the next chunk of input and returns the output
+    that is ready, which may be empty. Once all of the input has been given,
+    ``finish()`` returns the rest of the output.
+    """
+
+    def __init__(self, update=None, finish=None):
+        if update is not None:
+            self.update = update
+        if finish is not None:
+            self.finish = finish
+
+    def update(self, data):
+        return data
+
+    def finish(self):
+        return b""
+
+
+class _BufferedStep(PackagingStep):
+    """A step for a layer that can only process all of its data at once."""
+
+    def __init__(self, func):
+        super(_BufferedStep, self).__init__()
+        self._func = func
+        self._chunks = []
+
+    def update(self, data):
+        self._chunks.append(data)
+        return b""
+
+    def finish(self):
+        return self._func(b"".join(self._chunks))
+
+
 class RawArtifact(String):
     _binding = artifact_binding
     _binding_class = _binding.RawArtifactType
@@ -72,6 +117,22 @@ class Compression(entities.Entity):
         """This should accept byte data and return byte data"""
         raise NotImplementedError()
 
+    def packer(self):
+        """Return a :class:`PackagingStep` that packs data a chunk at a time.
+
+        By default, the data is collected and given to ``pack()`` at the end.
+        """
+        return _BufferedStep(self.pack)
+
+    def unpacker(self):
+        """Return a :class:`PackagingStep` that unpacks data a chunk at a
+        time.
+
+        By default, the data is collected and given to ``unpack()`` at the
+        end.
+        """
+        return _BufferedStep(self.unpack)
+
     def to_dict(self):
         dict_ = super(Compression, self).to_dict()
         dict_['packaging_type'] = 'compression'
@@ -107,6 +168,22 @@ class Encryption(entities.Entity):
         """This should accept byte data and return byte data"""
         raise NotImplementedError()
 
+    def packer(self):
+        """Return a :class:`PackagingStep` that packs data a chunk at a time.
+
+        By default, the data is collected and given to ``pack()`` at the end.
+        """
+        return _BufferedStep(self.pack)
+
+    def unpacker(self):
+        """Return a :class:`PackagingStep` that unpacks data a chunk at a
+        time.
+
+        By default, the data is collected and given to ``unpack()`` at the
+        end.
+        """
+        return _BufferedStep(self.unpack)
+
     def to_dict(self):
         dict_ = super(Encryption, self).to_dict()
         dict_['packaging_type'] = 'encryption'
@@ -140,6 +217,22 @@ class Encoding(entities.Entity):
         """This should accept byte data and return byte data"""
         raise NotImplementedError()
 
+    def packer(self):
+        """Return a :class:`PackagingStep` that packs data a chunk at a time.
+
+        By default, the data is collected and given to ``pack()`` at the end.
+        """
+        return _BufferedStep(self.pack)
+
+    def unpacker(self):
+        """Return a :class:`PackagingStep` that unpacks data a chunk at a
+        time.
+
+        By default, the data is collected and given to ``unpack()`` at the
+        end.
+        """
+        return _BufferedStep(self.unpack)
+
     def to_dict(self):
         dict_ = super(Encoding, self).to_dict()
         dict_['packaging_type'] = 'encoding'
@@ -156,6 +249,14 @@ class ZlibCompression(Compression):
     def unpack(self, packed_data):
         return zlib.decompress(packed_data)
 
+    def packer(self):
+        compressor = zlib.compressobj()
+        return PackagingStep(compressor.compress, compressor.flush)
+
+    def unpacker(self):
+        decompressor = zlib.decompressobj()
+        return PackagingStep(decompressor.decompress, decompressor.flush)
+
 
 class Bz2Compression(Compression):
 
@@ -168,6 +269,13 @@ class Bz2Compression(Compression):
     def unpack(self, packed_data):
         return bz2.decompress(packed_data)
 
+    def packer(self):
+        compressor = bz2.BZ2Compressor()
+        return PackagingStep(compressor.compress, compressor.flush)
+
+    def unpacker(self):
+        return PackagingStep(bz2.BZ2Decompressor().decompress)
+
 
 class XOREncryption(Encryption):
 
@@ -183,6 +291,18 @@ class XOREncryption(Encryption):
     def unpack(self, packed_data):
         return xor(packed_data, self.encryption_key)
 
+    def _translate(self, data):
+        # Equivalent to xor(), without a Python loop over every byte.
+        key = int(self.encryption_key)
+        table = bytes(bytearray(i ^ key for i in range(256)))
+        return data.translate(table)
+
+    def packer(self):
+        return PackagingStep(self._translate)
+
+    def unpacker(self):
+        return PackagingStep(self._translate)
+
 
 class PasswordProtectedZipEncryption(Encryption):
     def __init__(self, key=None):
@@ -206,6 +326,47 @@ class PasswordProtectedZipEncryption(Encryption):
         return data
 
 
+class _Base64Encoder(PackagingStep):
+    """Base64-encode data whose length is a multiple of 3 bytes, keeping the
+    rest for the next chunk.
+    """
+
+    def __init__(self):
+        super(_Base64Encoder, self).__init__()
+        self._rest = b""
+
+    def update(self, data):
+        data = self._rest + data
+        end = len(data) - len(data) % 3
+        self._rest = data[end:]
+        return base64.b64encode(data[:end])
+
+    def finish(self):
+        return base64.b64encode(self._rest)
+
+
+class _Base64Decoder(PackagingStep):
+    """Base64-decode data whose length is a multiple of 4 characters, keeping
+    the rest for the next chunk.
+    """
+
+    # Like base64.b64decode(), ignore other characters, such as line breaks.
+    _IGNORED = re.compile(b"[^A-Za-z0-9+/=]")
+
+    def __init__(self):
+        super(_Base64Decoder, self).__init__()
+        self._rest = b""
+
+    def update(self, data):
+        data = self._rest + self._IGNORED.sub(b"", data)
+        end = len(data) - len(data) % 4
+        self._rest = data[end:]
+        return base64.b64decode(data[:end])
+
+    def finish(self):
+        return base64.b64decode(self._rest)
+
+
 class Base64Encoding(Encoding):
     def __init__(self):
         super(Base64Encoding, self).__init__(algorithm="Base64")
@@ -216,6 +377,12 @@ class Base64Encoding(Encoding):
     def unpack(self, packed_data):
         return base64.b64decode(packed_data)
 
+    def packer(self):
+        return _Base64Encoder()
+
+    def unpacker(self):
+        return _Base64Decoder()
+
 
 class EncryptionFactory(entities.EntityFactory):
     @classmethod
@@ -293,6 +460,96 @@ class Packaging(entities.Entity):
         self.encoding = encoding
 
 
+def _run_steps(steps, chunks):
+    """Pass each chunk through every step in turn, yielding the non-empty
+    output of the last step.
+    """
+    def feed(start, data):
+        for step in steps[start:]:
+            if not data:
+                break
+            data = step.update(data)
+        return data
+
+    for chunk in chunks:
+        chunk = feed(0, chunk)
+        if chunk:
+            yield chunk
+
+    # The output from finishing one step is input for the steps after it.
+    for i, step in enumerate(steps):
+        chunk = feed(i + 1, step.finish())
+        if chunk:
+            yield chunk
+
+
+def pack_chunks(packaging, chunks):
+    """Apply the layers of `packaging` to the data given as an iterable of
+    byte strings, a chunk at a time.
+
+    This is the streaming equivalent of ``Artifact.packed_data``: the data
+    is compressed, then encrypted, then encoded, without holding all of it
+    (or the result) in memory.
+
+    Args:
+        packaging: A :class:`Packaging`, or None.
+        chunks: An iterable of byte strings.
+
+    Yields:
+        The packed data, as byte strings.
+    """
+    steps = []
+    if packaging:
+        for layer in packaging.compression:
+            steps.append(layer.packer())
+        for layer in packaging.encryption:
+            steps.append(layer.packer())
+        for layer in packaging.encoding:
+            steps.append(layer.packer())
+
+    return _run_steps(steps, chunks)
+
+
+def unpack_chunks(packaging, chunks):
+    """Undo the layers of `packaging` on packed data given as an iterable of
+    byte strings, a chunk at a time.
+
+    This is the streaming equivalent of ``Artifact.data``.
+
+    Args:
+        packaging: A :class:`Packaging`, or None.
+        chunks: An iterable of byte strings.
+
+    Yields:
+        The unpacked data, as byte strings.
+    """
+    steps = []
+    if packaging:
+        for layer in reversed(packaging.encoding):
+            steps.append(layer.unpacker())
+        for layer in reversed(packaging.encryption):
+            steps.append(layer.unpacker())
+        for layer in reversed(packaging.compression):
+            steps.append(layer.unpacker())
+
+    return _run_steps(steps, chunks)
+
+
+def _packaging_key(packaging):
+    """Return a value that changes whenever the layers of `packaging`, or
+    their settings, change.
+    """
+    if not packaging:
+        return None
+
+    return tuple(
+        tuple((type(layer), tuple(sorted(six.iteritems(layer.to_dict()))))
+              for layer in layers)
+        for layers in (packaging.compression, packaging.encryption,
+                       packaging.encoding)
+    )
+
+
 class Artifact(ObjectProperties):
     # Warning: Do not attempt to get or set Raw_Artifact directly. Use `data`
     # or `packed_data` respectively. The Raw_Artifact value will be set on
@@ -320,6 +577,11 @@ class Artifact(ObjectProperties):
     raw_artifact = fields.TypedField("Raw_Artifact", RawArtifact)
     raw_artifact_reference = fields.TypedField("Raw_Artifact_Reference")
 
+    # The last result of packing `data` or unpacking `packed_data`, with the
+    # _packaging_key() it was computed with.
+    _packed_cache = None
+    _unpacked_cache = None
+
     def __init__(self, data=None, type_=None):
         super(Artifact, self).__init__()
         self.type_ = type_
@@ -345,10 +607,19 @@ class Artifact(ObjectProperties):
 
     @property
     def data(self):
-        """Should return a byte string"""
+        """Should return a byte string
+
+        When computed from ``packed_data``, the result is kept until
+        ``packed_data`` or the ``packaging`` changes.
+        """
         if self._data:
             return self._data
         elif self._packed_data:
+            key = _packaging_key(self.packaging)
+            cached = self._unpacked_cache
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
             tmp_data = self._packed_data.encode('ascii')
             if self.packaging:
                 for p in reversed(self.packaging.encoding):
@@ -357,6 +628,8 @@ class Artifact(ObjectProperties):
                     tmp_data = p.unpack(tmp_data)
                 for p in reversed(self.packaging.compression):
                     tmp_data = p.unpack(tmp_data)
+
+            self._unpacked_cache = (key, tmp_data)
             return tmp_data
         else:
             return None
@@ -370,13 +643,23 @@ class Artifact(ObjectProperties):
                    "Unicode string.")
             raise ValueError(msg)
         self._data = value
+        self._packed_cache = None
 
     @property
     def packed_data(self):
-        """Should return a Unicode string"""
+        """Should return a Unicode string
+
+        When computed from ``data``, the result is kept until ``data`` or the
+        ``packaging`` changes.
+        """
         if self._packed_data:
             return self._packed_data
         elif self._data:
+            key = _packaging_key(self.packaging)
+            cached = self._packed_cache
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
             tmp_data = self._data
             if self.packaging:
                 for p in self.packaging.compression:
@@ -385,7 +668,10 @@ class Artifact(ObjectProperties):
                     tmp_data = p.pack(tmp_data)
                 for p in self.packaging.encoding:
                     tmp_data = p.pack(tmp_data)
-            return tmp_data.decode('ascii')
+            tmp_data = tmp_data.decode('ascii')
+
+            self._packed_cache = (key, tmp_data)
+            return tmp_data
         else:
             return None
 
@@ -398,14 +684,65 @@ class Artifact(ObjectProperties):
                    "string, not byte data.")
             raise ValueError(msg)
         self._packed_data = value
+        self._unpacked_cache = None
+
+    def pack_from(self, infile, chunk_size=CHUNK_SIZE):
+        """Set ``packed_data`` by packing the data read from `infile`.
+
+        The data is read and packed a chunk at a time, so only the packed
+        result is held in memory. The ``packaging`` should be set first.
+
+        Args:
+            infile: A file-like object opened for reading bytes.
+            chunk_size: The number of bytes to read at a time.
+
+        Raises:
+            ValueError: If ``data`` is already set, or the packed data is not
+                ASCII.
+        """
+        if self._data:
+            raise ValueError("data already set, can't set packed_data")
+
+        chunks = iter(functools.partial(infile.read, chunk_size), b"")
+        packed = u"".join(x.decode('ascii') for x in pack_chunks(self.packaging, chunks))
+        self.packed_data = packed or None
+
+    def unpack_to(self, outfile, chunk_size=CHUNK_SIZE):
+        """Write the data of this Artifact to `outfile`.
+
+        The ``packed_data`` is unpacked a chunk at a time, so the data is
+        never held in memory all at once.
+
+        Args:
+            outfile: A file-like object opened for writing bytes.
+            chunk_size: The number of characters of ``packed_data`` to
+                unpack at a time.
+
+        Returns:
+            The number of bytes written.
+        """
+        if self._data:
+            outfile.write(self._data)
+            return len(self._data)
+
+        packed = self._packed_data or u""
+        chunks = (packed[i:i + chunk_size].encode('ascii')
+                  for i in range(0, len(packed), chunk_size))
+
+        size = 0
+        for chunk in unpack_chunks(self.packaging, chunks):
+            outfile.write(chunk)
+            size += len(chunk)
+        return size
 
     def to_obj(self, ns_info=None):
         artifact_obj = super(Artifact, self).to_obj(ns_info=ns_info)
 
-        if self.packed_data:
+        packed_data = self.packed_data
+        if packed_data:
             if not self.raw_artifact:
                 self.raw_artifact = RawArtifact()
-            self.raw_artifact.value = self.packed_data
+            self.raw_artifact.value = packed_data
             artifact_obj.Raw_Artifact = self.raw_artifact.to_obj(ns_info=ns_info)
 
         return artifact_obj
@@ -413,14 +750,43 @@ class Artifact(ObjectProperties):
     def to_dict(self):
         artifact_dict = super(Artifact, self).to_dict()
 
-        if self.packed_data:
+        packed_data = self.packed_data
+        if packed_data:
             if not self.raw_artifact:
                 self.raw_artifact = RawArtifact()
-            self.raw_artifact.value = self.packed_data
+            self.raw_artifact.value = packed_data
             artifact_dict['raw_artifact'] = self.raw_artifact.to_dict()
 
         return artifact_dict
 
+    @classmethod
+    def from_stream(cls, stream, type_=None, hashes=hashing.DEFAULT_HASHES,
+                    chunk_size=hashing.CHUNK_SIZE):
+        """Create an Artifact holding the data read from `stream`.
+
+        The data is hashed with every algorithm while it is read (see
+        :mod:`cybox.utils.hashing`), and the hashes are set.
+
+        Args:
+            stream: A file-like object opened for reading bytes.
+            type_: The type of the artifact, such as ``Artifact.TYPE_FILE``.
+            hashes: The names of the hash algorithms to use, such as
+                ``"md5"`` or ``"sha256"``.
+            chunk_size: The number of bytes read at a time.
+        """
+        # Collecting the chunks in a list and joining them would hold the data
+        # twice. On Python 3, BytesIO.getvalue() hands over its buffer
+        # instead of copying it.
+        data = six.BytesIO()
+        hasher = hashing.hash_stream(stream, hashes, chunk_size=chunk_size,
+                                     callback=data.write)
+
+        artifact = cls(data.getvalue(), type_)
+        if hashes:
+            artifact.hashes = HashList()
+            artifact.hashes.set_hashes(hasher.hexdigests)
+        return artifact
+
     @classmethod
     def from_obj(cls, cls_obj):
         if not cls_obj:
@@ -1,6 +1,9 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import functools
+import os
+
 from mixbox import entities
 from mixbox import fields
 
@@ -8,6 +11,7 @@ import cybox.bindings.file_object as file_binding
 from cybox.common import (ByteRuns, DateTime, DigitalSignatureList, Double,
         ExtractedFeatures, HashList, HexBinary, ObjectProperties, String,
         UnsignedLong, Integer)
+from cybox.utils import hashing
 
 
 class FilePath(String):
@@ -232,3 +236,78 @@ class File(ObjectProperties):
             if self.hashes is None:
                 self.hashes = HashList()
             self.hashes.append(hash_)
+
+    def set_hashes(self, hashes):
+        """Set several hash values at once.
+
+        See :meth:`cybox.common.hashes.HashList.set_hashes`.
+        """
+        if self.hashes is None:
+            self.hashes = HashList()
+        self.hashes.set_hashes(hashes)
+
+    @classmethod
+    def from_path(cls, path, hashes=hashing.DEFAULT_HASHES, peak_entropy=False,
+                  chunk_size=hashing.CHUNK_SIZE):
+        """Create a File describing the file at `path`.
+
+        The file is read once, and hashed with every algorithm in the same
+        pass (see :mod:`cybox.utils.hashing`). The ``file_name``,
+        ``file_path``, ``size_in_bytes`` and ``hashes`` are set.
+
+        Args:
+            path: The path of the file.
+            hashes: The names of the hash algorithms to use, such as
+                ``"md5"`` or ``"sha256"``.
+            peak_entropy: If True, also set ``peak_entropy``. This is much
+                slower than hashing.
+            chunk_size: The number of bytes hashed at a time.
+        """
+        hasher = hashing.hash_file(path, hashes, peak_entropy, chunk_size)
+
+        f = cls()
+        f.file_name = os.path.basename(path)
+        f.file_path = path
+        f.file_path.fully_qualified = os.path.isabs(path)
+        f.size_in_bytes = hasher.size
+        if hashes:
+            f.set_hashes(hasher.hexdigests)
+        if peak_entropy:
+            f.peak_entropy = hasher.peak_entropy
+        return f
+
+    @classmethod
+    def walk(cls, root, hashes=hashing.DEFAULT_HASHES, peak_entropy=False,
+             workers=None, onerror=None):
+        """Yield a File for each file in the directory tree `root`, as
+        created by :meth:`from_path`.
+
+        The files are read by a pool of `workers` threads (by default, one
+        per CPU), and yielded in the order ``os.walk()`` finds them.
+
+        As with ``os.walk()``, errors are ignored unless `onerror` is
+        given, in which case it is called with the ``OSError`` or
+        ``IOError`` for each directory or file that cannot be read.
+        """
+        from multiprocessing.pool import ThreadPool
+
+        from_path = functools.partial(cls.from_path, hashes=hashes,
+                                      peak_entropy=peak_entropy)
+
+        def read(path):
+            try:
+                return from_path(path)
+            except EnvironmentError as ex:
+                return ex
+
+        pool = ThreadPool(workers)
+        try:
+            paths = hashing.iter_paths(root, onerror)
+            for result in pool.imap(read, paths):
+                if not isinstance(result, EnvironmentError):
+                    yield result
+                elif onerror is not None:
+                    onerror(result)
+        finally:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,91 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import subprocess
+import sys
+import unittest
+
+import cybox.bindings.cybox_core as core_binding
+from cybox.bindings.file_object import FileObjectType
+
+
+def _loaded_bindings(code):
+    """Run `code` in a fresh interpreter and return the binding modules it
+    imported."""
+    code += ("\nimport sys\n"
+             "print(' '.join(m for m in sys.modules "
+             "if m.startswith('cybox.bindings.')))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.check_output([sys.executable, "-c", code], env=env)
+    return set(out.decode("ascii").split())
+
+
+class TestLazyObjectBindings(unittest.TestCase):
+
+    def test_import_core_loads_no_object_bindings(self):
+        loaded = _loaded_bindings("import cybox.core")
+        self.assertFalse(any(m.endswith("_object") for m in loaded))
+
+    def test_only_used_bindings_loaded(self):
+        loaded = _loaded_bindings("import cybox.objects.mutex_object")
+        self.assertTrue("cybox.bindings.mutex_object" in loaded)
+        self.assertFalse("cybox.bindings.network_packet_object" in loaded)
+
+    def test_lookup_class(self):
+        self.assertTrue(core_binding._lookup_class("FileObjectType") is FileObjectType)
+        self.assertTrue(core_binding._lookup_class("ObjectType") is core_binding.ObjectType)
+        self.assertRaises(KeyError, core_binding._lookup_class, "FooObjectType")
+
+    def test_parse_properties(self):
+        xml = (
+            '<cybox:Object xmlns:cybox="http://cybox.mitre.org/cybox-2" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xmlns:MutexObj="http://cybox.mitre.org/objects#MutexObject-2">'
+            '<cybox:Properties xsi:type="MutexObj:MutexObjectType">'
+            '<MutexObj:Name>foo</MutexObj:Name>'
+            '</cybox:Properties>'
+            '</cybox:Object>'
+        )
+        obj = core_binding.parseString(xml)
+        self.assertEqual("MutexObjectType", obj.Properties.__class__.__name__)
+
+
+class TestObjectBindingAttributes(unittest.TestCase):
+
+    def test_attribute_access(self):
+        self.assertTrue(core_binding.FileObjectType is FileObjectType)
+        self.assertRaises(AttributeError, getattr, core_binding, "FooObjectType")
+
+    def _check_old_python(self, version):
+        # Module __getattr__ does not exist before Python 3.7, so the module
+        # is given a class (or replaced by a proxy) that does the lookup.
+        loaded = _loaded_bindings(
+            "import sys\n"
+            "sys.version_info = %r\n"
+            "import cybox.bindings.cybox_core as c\n"
+            "from cybox.bindings.cybox_core import parseString\n"
+            "assert 'cybox.bindings.file_object' not in sys.modules\n"
+            "klass = c.FileObjectType\n"
+            "from cybox.bindings.file_object import FileObjectType\n"
+            "assert klass is FileObjectType\n"
+            "assert c._lookup_class('FileObjectType') is FileObjectType\n"
+            "try:\n"
+            "    c.FooObjectType\n"
+            "except AttributeError:\n"
+            "    pass\n"
+            "else:\n"
+            "    raise AssertionError()\n"
+            "import cybox.core\n" % (version,)
+        )
+        self.assertTrue("cybox.bindings.file_object" in loaded)
+        self.assertFalse("cybox.bindings.network_packet_object" in loaded)
+
+    def test_python_35(self):
+        self._check_old_python((3, 5, 0))
+
+    def test_python_34(self):
+        self._check_old_python((3, 4, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,15 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import collections
+import copy
 import logging
 import unittest
 
 from mixbox.vendor.six import u
 
 from cybox.common import Hash, HashList, HashName, HexBinary
+from cybox.objects.file_object import File
 import cybox.test
 
 logger = logging.getLogger(__name__)
@@ -192,6 +195,114 @@ class TestHashList(unittest.TestCase):
         self.assertEqual(h.sha512, sha512_hash)
         self.assertEqual(h.ssdeep, ssdeep_hash)
 
+    def test_lookup_after_changes(self):
+        h = HashList()
+        h.md5 = EMPTY_MD5
+        self.assertEqual(None, h.sha1)
+
+        h.append(Hash(EMPTY_SHA1))
+        self.assertEqual(EMPTY_SHA1, h.sha1)
+
+        del h[0]
+        self.assertEqual(None, h.md5)
+
+        h.hashes = [Hash(EMPTY_MD5)]
+        self.assertEqual(EMPTY_MD5, h.md5)
+        self.assertEqual(None, h.sha1)
+
+    def test_lookup_after_type_change(self):
+        h = HashList([Hash(EMPTY_MD5)])
+        self.assertEqual(EMPTY_MD5, h.md5)
+
+        h[0].type_ = Hash.TYPE_SHA1
+        self.assertEqual(None, h.md5)
+        self.assertEqual(EMPTY_MD5, h.sha1)
+
+        h[0].type_.value = Hash.TYPE_SHA256
+        self.assertEqual(None, h.sha1)
+        self.assertEqual(EMPTY_MD5, h.sha256)
+
+    def test_type_change_in_other_list(self):
+        first = HashList([Hash(EMPTY_MD5)])
+        second = HashList([Hash(EMPTY_SHA1)])
+        self.assertEqual(EMPTY_MD5, first.md5)
+        self.assertEqual(EMPTY_SHA1, second.sha1)
+
+        # Only the index of the list holding the hash is invalidated.
+        second[0].type_ = Hash.TYPE_SHA256
+        self.assertTrue(first.hashes._index is not None)
+        self.assertTrue(second.hashes._index is None)
+        self.assertEqual(EMPTY_SHA1, second.sha256)
+
+    def test_hash_in_several_lists(self):
+        h = Hash(EMPTY_MD5)
+        first, second = HashList([h]), HashList([h])
+        self.assertEqual(EMPTY_MD5, first.md5)
+        self.assertEqual(EMPTY_MD5, second.md5)
+
+        h.type_ = Hash.TYPE_SHA1
+        self.assertEqual(EMPTY_MD5, first.sha1)
+        self.assertEqual(EMPTY_MD5, second.sha1)
+
+    def test_copy_not_watched(self):
+        h = HashList([Hash(EMPTY_MD5)])
+        self.assertEqual(EMPTY_MD5, h.md5)
+
+        copied = copy.deepcopy(h[0])
+        copied.type_ = Hash.TYPE_SHA1
+        self.assertTrue(h.hashes._index is not None)
+        self.assertEqual(EMPTY_MD5, h.md5)
+
+    def test_first_of_type(self):
+        h = HashList([Hash(EMPTY_MD5), Hash("0" * 32)])
+        self.assertEqual(EMPTY_MD5, h.md5)
+
+    def test_set_hashes(self):
+        h = HashList()
+        h.md5 = "0" * 32
+        h.set_hashes({"md5": EMPTY_MD5, "SHA1": EMPTY_SHA1, "sha256": None})
+
+        self.assertEqual(2, len(h))
+        self.assertEqual(EMPTY_MD5, h.md5)
+        self.assertEqual(EMPTY_SHA1, h.sha1)
+        self.assertEqual(None, h.sha256)
+
+    def test_set_hashes_unknown(self):
+        self.assertRaises(ValueError, HashList().set_hashes, {"crc32": "0"})
+
+    def test_set_hashes_unknown_changes_nothing(self):
+        h = HashList()
+        h.md5 = "0" * 32
+        hashes = collections.OrderedDict([("md5", EMPTY_MD5),
+                                          ("sha1", EMPTY_SHA1),
+                                          ("crc32", "0")])
+        self.assertRaises(ValueError, h.set_hashes, hashes)
+        self.assertEqual(1, len(h))
+        self.assertEqual("0" * 32, h.md5)
+
+    def test_deepcopy(self):
+        h = HashList()
+        h.append(EMPTY_SHA1)
+        h.hashes[0].type_ = Hash.TYPE_MD5
+        self.assertEqual(EMPTY_SHA1, h.md5)
+
+        copied = copy.deepcopy(h)
+        copied.hashes[0].type_ = Hash.TYPE_SHA1
+        self.assertEqual(EMPTY_SHA1, copied.sha1)
+        self.assertEqual(None, copied.md5)
+        self.assertEqual(EMPTY_SHA1, h.md5)
+
+    def test_deepcopy_file(self):
+        f = File()
+        f.add_hash(EMPTY_MD5)
+        self.assertEqual(EMPTY_MD5, f.md5)
+
+        copied = copy.deepcopy(f)
+        copied.hashes[0].type_ = Hash.TYPE_SHA1
+        self.assertEqual(EMPTY_MD5, copied.sha1)
+        self.assertEqual(None, copied.md5)
+        self.assertEqual(EMPTY_MD5, f.md5)
+
 
 if __name__ == "__main__":
     unittest.main()
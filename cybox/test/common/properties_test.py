@@ -1,12 +1,14 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import copy
 import datetime
 import unittest
 
 from mixbox.vendor import six
 from mixbox.vendor.six import u
 
+import cybox.bindings.cybox_common as common_binding
 from cybox.common import (BaseProperty, DateTime, Integer, Long,
         NonNegativeInteger, PositiveInteger, String, UnsignedInteger,
         UnsignedLong, BINDING_CLASS_MAPPING, DEFAULT_DELIM)
@@ -204,6 +206,56 @@ class TestEmptyNumerics(unittest.TestCase):
             self.assertTrue(obj.value is None)
 
 
+class TestCompactFields(unittest.TestCase):
+
+    def test_plain(self):
+        s = String("foo")
+        self.assertFalse(s._fields.has_extra())
+        self.assertEqual("foo", s.value)
+        self.assertEqual("string", s.datatype)
+        self.assertEqual(True, s.is_case_sensitive)
+        self.assertEqual(DEFAULT_DELIM, s.delimiter)
+
+    def test_parsed(self):
+        # from_obj() sets every field, mostly to None.
+        s = String.from_obj(common_binding.StringObjectPropertyType(valueOf_="foo"))
+        self.assertFalse(s._fields.has_extra())
+        self.assertEqual("foo", s.to_dict())
+
+    def test_extra(self):
+        s = String("foo")
+        s.condition = "Equals"
+        s.is_case_sensitive = False
+        self.assertTrue(s._fields.has_extra())
+        self.assertFalse(s.is_plain())
+        self.assertEqual(
+            {"value": "foo", "condition": "Equals", "is_case_sensitive": False},
+            s.to_dict()
+        )
+
+        s.condition = None
+        s.is_case_sensitive = True
+        self.assertFalse(s._fields.has_extra())
+        self.assertTrue(s.is_plain())
+
+    def test_id_idref(self):
+        s = String("foo")
+        s.id_ = "example:a-1"
+        s.idref = "example:a-2"
+        self.assertEqual(None, s.id_)
+        self.assertEqual("example:a-2", s.idref)
+
+    def test_deepcopy(self):
+        s = String("foo")
+        s.condition = "Equals"
+        s2 = copy.deepcopy(s)
+        s2.condition = "Contains"
+
+        self.assertEqual("foo", s2.value)
+        self.assertEqual("Equals", s.condition)
+        self.assertEqual("Contains", s2.condition)
+
+
 class TestHexadecimal(unittest.TestCase):
 
     def test_parse_int(self):
@@ -7,7 +7,7 @@ from mixbox import entities
 from mixbox.vendor.six import u
 
 from cybox.bindings import cybox_common as common_binding
-from cybox.common import HashName, VocabString
+from cybox.common import Hash, HashName, VocabString, vocabs
 from cybox.common.vocabs import VocabField
 from cybox.common.vocabs import HashName as HashNameVocab  # Backwards compatibility
 
@@ -153,6 +153,105 @@ class TestVocabString(unittest.TestCase):
         self.assertTrue(vocab.is_plain())
 
 
+class TestEntityClass(unittest.TestCase):
+
+    def test_aliases(self):
+        for key in ("cyboxVocabs:HashNameVocab-1.0", "HashNameVocab-1.0",
+                    "cyboxVocabs:HashNameVocab", "HashNameVocab"):
+            self.assertEqual(HashName, vocabs.VocabFactory.entity_class(key))
+
+    def test_unknown(self):
+        for _ in range(2):
+            self.assertEqual(VocabString, vocabs.VocabFactory.entity_class("foo:BarVocab-1.0"))
+            self.assertEqual(VocabString, vocabs.VocabFactory.entity_class(None))
+
+    def test_partial_key(self):
+        # Keys that are part of a registered xsi:type still resolve to it.
+        self.assertEqual(HashName, vocabs.VocabFactory.entity_class("HashNameVoc"))
+
+    def test_register_after_lookup(self):
+        key = "cyboxVocabs:TestVocab-1.0"
+        self.assertEqual(VocabString, vocabs.VocabFactory.entity_class(key))
+
+        @vocabs.register_vocab
+        class TestVocab(VocabString):
+            _XSI_TYPE = key
+
+        try:
+            self.assertEqual(TestVocab, vocabs.VocabFactory.entity_class(key))
+            self.assertEqual(TestVocab, vocabs.VocabFactory.entity_class("TestVocab"))
+        finally:
+            del vocabs._VOCAB_MAP[key]
+            vocabs._INTERNABLE.discard(TestVocab)
+            vocabs._index_vocabs()
+
+
+class TestInterning(unittest.TestCase):
+
+    def setUp(self):
+        vocabs.enable_interning()
+
+    def tearDown(self):
+        vocabs.disable_interning()
+
+    def _parse(self, *hashes):
+        return [Hash.from_dict(Hash(h).to_dict()) for h in hashes]
+
+    def test_shared(self):
+        first, second = self._parse("a" * 32, "b" * 32)
+        self.assertTrue(first._fields[Hash.type_] is second._fields[Hash.type_])
+
+    def test_from_obj(self):
+        first, second = [Hash.from_obj(Hash(h).to_obj()) for h in ("a" * 32, "b" * 32)]
+        self.assertTrue(first._fields[Hash.type_] is second._fields[Hash.type_])
+        self.assertEqual(Hash("a" * 32).to_dict(), first.to_dict())
+
+    def test_not_plain(self):
+        h = Hash("a" * 32)
+        h.type_.condition = "Equals"
+        first, second = [Hash.from_dict(h.to_dict()) for _ in range(2)]
+        self.assertFalse(first._fields[Hash.type_] is second._fields[Hash.type_])
+        self.assertEqual("Equals", first.type_.condition)
+
+    def test_read_does_not_copy(self):
+        first, second = self._parse("a" * 32, "b" * 32)
+        self.assertTrue(first.type_ is second.type_)
+        self.assertTrue(first._fields[Hash.type_] is second._fields[Hash.type_])
+
+    def test_list_read_does_not_copy(self):
+        d = {"type": [{"value": "MD5", "xsi:type": HashName._XSI_TYPE}]}
+        first, second = MultipleHash.from_dict(d), MultipleHash.from_dict(d)
+        self.assertTrue(first.type_[0] is second.type_[0])
+        self.assertTrue(list(first.type_)[0] is list(second.type_)[0])
+        self.assertTrue(first.type_._inner[0] is second.type_._inner[0])
+
+    def test_assign_new_instance(self):
+        first, second = self._parse("a" * 32, "b" * 32)
+        self.assertRaises(TypeError, setattr, first.type_, "condition", "Equals")
+
+        first.type_ = HashName("MD5")
+        first.type_.condition = "Equals"
+        self.assertEqual("Equals", first.type_.condition)
+        self.assertEqual(None, second.type_.condition)
+        self.assertEqual(None, self._parse("c" * 32)[0].type_.condition)
+
+    def test_read_only(self):
+        vocab = vocabs.VocabFactory.from_dict("MD5", HashName._XSI_TYPE)
+        self.assertTrue(vocab is vocabs.VocabFactory.from_dict("MD5", HashName._XSI_TYPE))
+        self.assertRaises(TypeError, setattr, vocab, "condition", "Equals")
+
+    def test_invalid_value(self):
+        self.assertRaises(ValueError, vocabs.VocabFactory.from_dict,
+                          {"value": "Foo", "xsi:type": HashName._XSI_TYPE})
+
+    def test_disabled(self):
+        vocabs.disable_interning()
+        self.assertFalse(vocabs.is_interning())
+
+        first, second = self._parse("a" * 32, "b" * 32)
+        self.assertFalse(first._fields[Hash.type_] is second._fields[Hash.type_])
+
+
 class HashNameTests(unittest.TestCase):
 
     def test_hash_name_vocabulary(self):
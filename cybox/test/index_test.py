@@ -0,0 +1,238 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import random
+import unittest
+
+from cybox.core import Observable, ObservableComposition, Observables
+from cybox.index import NetworkIndex, ObservableIndex, parse_network
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.mutex_object import Mutex
+from cybox.objects.uri_object import URI
+from cybox.objects.win_file_object import WinFile
+from cybox.objects.win_registry_key_object import WinRegistryKey
+from cybox.test.common.hash_test import EMPTY_MD5, EMPTY_SHA1
+
+
+def observable(id_, properties):
+    o = Observable(properties)
+    o.id_ = id_
+    return o
+
+
+class TestObservableIndex(unittest.TestCase):
+
+    def setUp(self):
+        f = File()
+        f.file_name = "malware.exe"
+        f.md5 = EMPTY_MD5
+        f.sha1 = EMPTY_SHA1
+
+        domain = DomainName()
+        domain.value = "Example.COM."
+
+        mutex = Mutex()
+        mutex.name = "Global\\evil"
+
+        key = WinRegistryKey()
+        key.key = "Software\\Microsoft\\Windows\\CurrentVersion\\Run"
+
+        self.observables = Observables([
+            observable("test:1", Address("10.0.0.1", Address.CAT_IPV4)),
+            observable("test:2", Address("10.0.0.1", Address.CAT_IPV4)),
+            observable("test:3", f),
+            observable("test:4", URI("http://example.com/a")),
+            observable("test:5", domain),
+            observable("test:6", mutex),
+            observable("test:7", key),
+            observable("test:8", Address("2001:DB8:0:0::1", Address.CAT_IPV6)),
+        ])
+        self.index = ObservableIndex(self.observables)
+
+    def test_address(self):
+        self.assertEqual(set(["test:1", "test:2"]),
+                         self.index.lookup(ObservableIndex.ADDRESS, "10.0.0.1"))
+        self.assertEqual(set(), self.index.lookup(ObservableIndex.ADDRESS, "10.0.0.2"))
+
+    def test_ipv6(self):
+        self.assertEqual(set(["test:8"]),
+                         self.index.lookup(ObservableIndex.ADDRESS, "2001:db8::1"))
+
+    def test_file(self):
+        self.assertEqual(set(["test:3"]), self.index.lookup(ObservableIndex.FILE_NAME, "malware.exe"))
+        self.assertEqual(set(["test:3"]), self.index.lookup(ObservableIndex.HASH, EMPTY_MD5.upper()))
+        self.assertEqual(set(["test:3"]), self.index.lookup(ObservableIndex.HASH, EMPTY_SHA1))
+
+    def test_other_kinds(self):
+        self.assertTrue(self.index.contains(ObservableIndex.URI, "http://example.com/a"))
+        self.assertTrue(self.index.contains(ObservableIndex.DOMAIN, "example.com"))
+        self.assertTrue(self.index.contains(ObservableIndex.MUTEX, "Global\\evil"))
+        self.assertTrue(self.index.contains(ObservableIndex.REGISTRY_KEY,
+                                            "software\\microsoft\\windows\\currentversion\\run"))
+        self.assertFalse(self.index.contains(ObservableIndex.MUTEX, "Global\\EVIL"))
+
+    def test_unknown_kind(self):
+        self.assertRaises(ValueError, self.index.lookup, "color", "red")
+
+    def test_len(self):
+        # Two addresses, a file name, two hashes, and one of each other kind.
+        self.assertEqual(9, len(self.index))
+
+    def test_subclass(self):
+        f = WinFile()
+        f.file_name = "evil.dll"
+        index = ObservableIndex(observable("test:9", f))
+        self.assertEqual(set(["test:9"]), index.lookup(ObservableIndex.FILE_NAME, "evil.dll"))
+
+    def test_list_values(self):
+        a = Address(["10.0.0.1", "10.0.0.2"], Address.CAT_IPV4)
+        a.address_value.condition = "Equals"
+        index = ObservableIndex(observable("test:10", a))
+        self.assertTrue(index.contains(ObservableIndex.ADDRESS, "10.0.0.2"))
+
+    def test_pattern_not_indexed(self):
+        a = Address("10.0.0.", Address.CAT_IPV4)
+        a.address_value.condition = "StartsWith"
+        index = ObservableIndex(observable("test:11", a))
+        self.assertEqual(0, len(index))
+
+    def test_related_objects(self):
+        o = observable("test:12", Address("10.0.0.3", Address.CAT_IPV4))
+        o.object_.add_related(URI("http://example.org/"), "Connected_To")
+        index = ObservableIndex(o)
+        self.assertEqual(set(["test:12"]), index.lookup(ObservableIndex.URI, "http://example.org/"))
+
+    def test_composition(self):
+        inner = Observable(Address("10.0.0.4", Address.CAT_IPV4))
+        inner.id_ = None
+        named = observable("test:14", Address("10.0.0.5", Address.CAT_IPV4))
+
+        outer = Observable()
+        outer.id_ = "test:13"
+        outer.observable_composition = ObservableComposition(
+            ObservableComposition.OPERATOR_OR, [inner, named])
+
+        index = ObservableIndex(outer)
+        self.assertEqual(set(["test:13"]), index.lookup(ObservableIndex.ADDRESS, "10.0.0.4"))
+        self.assertEqual(set(["test:14"]), index.lookup(ObservableIndex.ADDRESS, "10.0.0.5"))
+
+    def test_no_id(self):
+        o = Observable(Address("10.0.0.6", Address.CAT_IPV4))
+        o.id_ = None
+        self.assertEqual(0, len(ObservableIndex([o])))
+
+
+def address_range(low, high, category=Address.CAT_IPV4):
+    a = Address([low, high], category)
+    a.address_value.condition = "InclusiveBetween"
+    return a
+
+
+class TestParseNetwork(unittest.TestCase):
+
+    def test_cidr(self):
+        self.assertEqual((4, 0x0A000000, 0x0AFFFFFF), parse_network("10.0.0.0/8"))
+        self.assertEqual((4, 0x0A000000, 0x0AFFFFFF), parse_network("10.1.2.3/8"))
+        self.assertEqual((4, 0x0A010203, 0x0A010203), parse_network("10.1.2.3"))
+        self.assertEqual((6, 0x20010DB8 << 96, (0x20010DB9 << 96) - 1),
+                         parse_network("2001:DB8::/32"))
+
+    def test_netmask(self):
+        self.assertEqual((4, 0x0A000000, 0x0A00FFFF), parse_network("10.0.0.0/255.255.0.0"))
+        self.assertEqual(None, parse_network("10.0.0.0/255.0.255.0"))
+
+    def test_invalid(self):
+        self.assertEqual(None, parse_network("10.0.0.0/33"))
+        self.assertEqual(None, parse_network("example.com"))
+        self.assertEqual(None, parse_network("10.0.0.0/"))
+
+
+class TestNetworkIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NetworkIndex([
+            observable("test:1", Address("10.0.0.0/8", Address.CAT_CIDR)),
+            observable("test:2", Address("10.1.0.0/16", Address.CAT_IPV4_NET)),
+            observable("test:3", address_range("10.1.2.0", "10.1.2.255")),
+            observable("test:4", address_range("10.1.2.128", "10.1.3.127")),
+            observable("test:5", Address("2001:db8::/32", Address.CAT_IPV6_NET)),
+            observable("test:6", Address("10.1.0.0/16", Address.CAT_CIDR)),
+            # Not networks.
+            observable("test:7", Address("10.0.0.1", Address.CAT_IPV4)),
+            observable("test:8", Address("10.0.0.0/8", Address.CAT_EMAIL)),
+        ])
+
+    def test_len(self):
+        self.assertEqual(6, len(self.index))
+
+    def test_lookup(self):
+        self.assertEqual(["test:3", "test:2", "test:6", "test:1"],
+                         self.index.lookup("10.1.2.3"))
+        self.assertEqual(["test:3", "test:4", "test:2", "test:6", "test:1"],
+                         self.index.lookup("10.1.2.200"))
+        self.assertEqual(["test:4", "test:2", "test:6", "test:1"],
+                         self.index.lookup("10.1.3.0"))
+        self.assertEqual(["test:1"], self.index.lookup("10.200.0.1"))
+        self.assertEqual([], self.index.lookup("11.0.0.0"))
+        self.assertEqual([], self.index.lookup("9.255.255.255"))
+
+    def test_boundaries(self):
+        self.assertEqual(["test:1"], self.index.lookup("10.0.0.0"))
+        self.assertEqual(["test:1"], self.index.lookup("10.255.255.255"))
+        self.assertEqual(["test:4", "test:2", "test:6", "test:1"],
+                         self.index.lookup("10.1.3.127"))
+        self.assertEqual(["test:2", "test:6", "test:1"],
+                         self.index.lookup("10.1.3.128"))
+
+    def test_longest_match(self):
+        self.assertEqual(set(["test:3"]), self.index.longest_match("10.1.2.3"))
+        self.assertEqual(set(["test:2", "test:6"]), self.index.longest_match("10.1.200.1"))
+        self.assertEqual(set(), self.index.longest_match("192.168.0.1"))
+
+    def test_ipv6(self):
+        self.assertEqual(["test:5"], self.index.lookup("2001:DB8:0::1"))
+        self.assertFalse(self.index.contains("2001:db9::1"))
+        # IPv4 networks do not contain IPv6 addresses.
+        self.assertFalse(self.index.contains("::a01:203"))
+
+    def test_ipv6_range(self):
+        index = NetworkIndex(observable("test:9", address_range(
+            "2001:db8::1", "2001:db8::ff", Address.CAT_IPV6)))
+        self.assertTrue(index.contains("2001:db8::80"))
+        self.assertFalse(index.contains("2001:db8::100"))
+
+    def test_invalid_address(self):
+        self.assertRaises(ValueError, self.index.lookup, "example.com")
+
+    def test_add_after_lookup(self):
+        self.assertFalse(self.index.contains("192.168.1.1"))
+        self.index.add(observable("test:10", Address("192.168.0.0/16", Address.CAT_CIDR)))
+        self.assertEqual(["test:10"], self.index.lookup("192.168.1.1"))
+
+    def test_overlapping_ranges(self):
+        # Many ranges overlapping each other, checked against a scan.
+        rng = random.Random(7)
+        ranges = []
+        for i in range(300):
+            low = rng.randint(0, 2000)
+            high = low + rng.randint(0, 500)
+            ranges.append(("test:%d" % i, low, high))
+
+        index = NetworkIndex()
+        for id_, low, high in ranges:
+            index.add_network(address_range("10.0.%d.%d" % divmod(low, 256),
+                                            "10.0.%d.%d" % divmod(high, 256)),
+                              id_)
+
+        for value in range(0, 2600, 7):
+            covering = sorted((high - low, i, id_)
+                              for i, (id_, low, high) in enumerate(ranges)
+                              if low <= value <= high)
+            address = "10.0.%d.%d" % divmod(value, 256)
+            self.assertEqual([x[2] for x in covering], index.lookup(address))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cybox.core import Observable, Observables
+from cybox.ingest import parse_many
+from cybox.objects.address_object import Address
+import cybox.utils
+
+
+class TestParseMany(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths = []
+        self.expected = []
+
+        for i in range(4):
+            addr = Address("10.0.0.%d" % i, Address.CAT_IPV4)
+            observables = Observables(Observable(addr))
+            path = os.path.join(self.tmpdir, "%d.xml" % i)
+            with open(path, "wb") as f:
+                f.write(observables.to_xml())
+            self.paths.append(path)
+            self.expected.append(observables.to_dict())
+
+        self.bad_path = os.path.join(self.tmpdir, "bad.xml")
+        with open(self.bad_path, "wb") as f:
+            f.write(b"<not xml")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_dict_output(self):
+        results = list(parse_many(self.paths, workers=2))
+        self.assertEqual(self.paths, [r.path for r in results])
+        self.assertEqual(self.expected, [r.observables for r in results])
+
+    def test_entity_output(self):
+        results = list(parse_many(self.paths, workers=2, output="entity"))
+        for result, expected in zip(results, self.expected):
+            self.assertTrue(isinstance(result.observables, Observables))
+            self.assertEqual(expected, result.observables.to_dict())
+
+    def test_unordered(self):
+        results = list(parse_many(self.paths, workers=2, ordered=False))
+        self.assertEqual(sorted(self.paths), sorted(r.path for r in results))
+
+    def test_errors_do_not_abort_batch(self):
+        paths = [self.paths[0], self.bad_path, self.paths[1]]
+        results = list(parse_many(paths, workers=2))
+
+        self.assertEqual(3, len(results))
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertTrue("XMLSyntaxError" in results[1].error)
+        self.assertEqual(None, results[1].observables)
+        self.assertTrue(results[2].ok)
+
+    def test_single_worker(self):
+        results = list(parse_many(self.paths + [self.bad_path], workers=1))
+        self.assertEqual(self.expected, [r.observables for r in results[:-1]])
+        self.assertFalse(results[-1].ok)
+
+    def test_single_worker_entity_output(self):
+        calls = []
+        original = vars(Observables).get("from_dict")
+        from_dict = Observables.from_dict
+
+        def counting_from_dict(cls_dict):
+            calls.append(cls_dict)
+            return from_dict(cls_dict)
+
+        Observables.from_dict = staticmethod(counting_from_dict)
+        try:
+            results = list(parse_many(self.paths, workers=1, output="entity"))
+        finally:
+            if original is None:
+                del Observables.from_dict
+            else:
+                Observables.from_dict = original
+
+        # Parsed in this process, so not rebuilt from dictionaries.
+        self.assertEqual([], calls)
+        for result, expected in zip(results, self.expected):
+            self.assertTrue(isinstance(result.observables, Observables))
+            self.assertEqual(expected, result.observables.to_dict())
+
+    def test_entity_output_not_cached(self):
+        before = cybox.utils.cache_count()
+        list(parse_many(self.paths, workers=1, output="entity"))
+        self.assertEqual(before, cybox.utils.cache_count())
+
+    def test_invalid_output(self):
+        # Raised when called, not when the first result is requested.
+        self.assertRaises(ValueError, parse_many, self.paths, output="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
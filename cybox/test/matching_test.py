@@ -0,0 +1,451 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import datetime
+import unittest
+
+from cybox.common.object_properties import CustomProperties, Property
+from cybox.core import Object, Observable, ObservableComposition, Observables
+from cybox.matching import BatchMatcher, compile_observable, compile_pattern
+from cybox.objects.address_object import Address
+from cybox.objects.email_message_object import EmailMessage
+from cybox.objects.file_object import File
+from cybox.objects.mutex_object import Mutex
+from cybox.objects.uri_object import URI
+from cybox.objects.win_file_object import WinFile
+from cybox.test.common.hash_test import EMPTY_MD5, EMPTY_SHA1
+
+
+def address(value, condition=None, apply_condition=None):
+    a = Address(value, Address.CAT_IPV4)
+    a.address_value.condition = condition
+    if apply_condition:
+        a.address_value.apply_condition = apply_condition
+    return a
+
+
+def file_name(value, condition, **kwargs):
+    f = File()
+    f.file_name = value
+    f.file_name.condition = condition
+    for name, x in kwargs.items():
+        setattr(f.file_name, name, x)
+    return f
+
+
+def size(value, condition, apply_condition=None):
+    f = File()
+    f.size_in_bytes = value
+    f.size_in_bytes.condition = condition
+    if apply_condition:
+        f.size_in_bytes.apply_condition = apply_condition
+    return f
+
+
+def instance(name="malware.exe", size_in_bytes=2048):
+    f = File()
+    f.file_name = name
+    f.size_in_bytes = size_in_bytes
+    f.md5 = EMPTY_MD5
+    f.sha1 = EMPTY_SHA1
+    return f
+
+
+class TestConditions(unittest.TestCase):
+
+    def assertMatches(self, pattern, data, expected=True):
+        matcher = compile_pattern(pattern)
+        self.assertEqual(expected, matcher.match(data))
+        # The dictionary form gives the same result.
+        self.assertEqual(expected, matcher.match(data.to_dict()))
+
+    def test_equals(self):
+        self.assertMatches(address("10.0.0.1", "Equals"), Address("10.0.0.1", Address.CAT_IPV4))
+        self.assertMatches(address("10.0.0.1", "Equals"), Address("10.0.0.2", Address.CAT_IPV4), False)
+
+    def test_no_condition(self):
+        self.assertMatches(address("10.0.0.1"), Address("10.0.0.1", Address.CAT_IPV4))
+        self.assertMatches(address("10.0.0.1"), Address("10.0.0.2", Address.CAT_IPV4), False)
+
+    def test_does_not_equal(self):
+        self.assertMatches(address("10.0.0.1", "DoesNotEqual"), Address("10.0.0.2", Address.CAT_IPV4))
+        self.assertMatches(address("10.0.0.1", "DoesNotEqual"), Address("10.0.0.1", Address.CAT_IPV4), False)
+
+    def test_plain_fields(self):
+        # The category is not a property, and is compared for equality.
+        self.assertMatches(address("10.0.0.1"), Address("10.0.0.1", Address.CAT_IPV6), False)
+
+    def test_string_conditions(self):
+        data = instance("malware.exe")
+        self.assertMatches(file_name("ware", "Contains"), data)
+        self.assertMatches(file_name("mal", "StartsWith"), data)
+        self.assertMatches(file_name(".exe", "EndsWith"), data)
+        self.assertMatches(file_name(".dll", "EndsWith"), data, False)
+        self.assertMatches(file_name("good", "DoesNotContain"), data)
+        self.assertMatches(file_name("mal", "DoesNotContain"), data, False)
+
+    def test_case_sensitive(self):
+        data = instance("MalWare.exe")
+        self.assertMatches(file_name("malware", "Contains"), data, False)
+        self.assertMatches(file_name("malware", "Contains", is_case_sensitive=False), data)
+
+    def test_fits_pattern(self):
+        data = instance("malware.exe")
+        self.assertMatches(file_name(r"^mal\w+\.exe$", "FitsPattern"), data)
+        self.assertMatches(file_name(r"^\d+$", "FitsPattern"), data, False)
+        self.assertMatches(file_name("^MAL", "FitsPattern", is_case_sensitive=False), data)
+
+    def test_numbers(self):
+        data = instance(size_in_bytes=2048)
+        self.assertMatches(size(1024, "GreaterThan"), data)
+        self.assertMatches(size(2048, "GreaterThan"), data, False)
+        self.assertMatches(size(2048, "GreaterThanOrEqual"), data)
+        self.assertMatches(size(4096, "LessThan"), data)
+        self.assertMatches(size(2048, "LessThanOrEqual"), data)
+        self.assertMatches(size(1000, "LessThanOrEqual"), data, False)
+
+    def test_between(self):
+        data = instance(size_in_bytes=2048)
+        self.assertMatches(size([1024, 2048], "InclusiveBetween"), data)
+        self.assertMatches(size([1024, 2048], "ExclusiveBetween"), data, False)
+        self.assertMatches(size([4096, 8192], "InclusiveBetween"), data, False)
+
+    def test_between_requires_two_values(self):
+        self.assertRaises(ValueError, compile_pattern, size(1024, "InclusiveBetween"))
+
+    def test_bitwise(self):
+        data = instance(size_in_bytes=0x6)
+        self.assertMatches(size(0x2, "BitwiseAnd"), data)
+        self.assertMatches(size(0x3, "BitwiseAnd"), data, False)
+        self.assertMatches(size(0x3, "BitwiseOr"), data)
+        self.assertMatches(size(0x9, "BitwiseOr"), data, False)
+
+    def test_apply_condition(self):
+        data = Address("10.0.0.2", Address.CAT_IPV4)
+        values = ["10.0.0.1", "10.0.0.2"]
+        self.assertMatches(address(values, "Equals", "ANY"), data)
+        self.assertMatches(address(values, "Equals", "ALL"), data, False)
+        self.assertMatches(address(values, "Equals", "NONE"), data, False)
+        self.assertMatches(address(["10.0.0.3", "10.0.0.4"], "Equals", "NONE"), data)
+        self.assertMatches(address(["10.0.", ".2"], "Contains", "ALL"), data)
+
+    def test_unknown_condition(self):
+        self.assertRaises(ValueError, compile_pattern, address("10.0.0.1", "Resembles"))
+        self.assertRaises(ValueError, compile_pattern, address(["10.0.0.1"], "Equals", "SOME"))
+
+    def test_hex_binary_is_not_case_sensitive(self):
+        pattern = File()
+        pattern.md5 = EMPTY_MD5.upper()
+        pattern.md5.condition = "Equals"
+        self.assertMatches(pattern, instance())
+
+    def test_dates(self):
+        pattern = File()
+        pattern.modified_time = datetime.datetime(2017, 1, 1)
+        pattern.modified_time.condition = "GreaterThan"
+
+        data = File()
+        data.modified_time = datetime.datetime(2017, 6, 1)
+        self.assertMatches(pattern, data)
+        data.modified_time = datetime.datetime(2016, 6, 1)
+        self.assertMatches(pattern, data, False)
+
+
+class TestPatternMatcher(unittest.TestCase):
+
+    def test_missing_property(self):
+        matcher = compile_pattern(file_name("malware", "DoesNotContain"))
+        self.assertFalse(matcher.match(File()))
+        self.assertFalse(matcher.match(None))
+
+    def test_all_properties_match(self):
+        pattern = file_name("malware", "StartsWith")
+        pattern.size_in_bytes = 1024
+        pattern.size_in_bytes.condition = "GreaterThan"
+        matcher = compile_pattern(pattern)
+
+        self.assertTrue(matcher.match(instance(size_in_bytes=2048)))
+        self.assertFalse(matcher.match(instance(size_in_bytes=512)))
+
+    def test_class(self):
+        matcher = compile_pattern(file_name("malware", "Contains"))
+        data = WinFile()
+        data.file_name = "malware.exe"
+
+        self.assertTrue(matcher.match(data))
+        self.assertTrue(matcher.match(data.to_dict()))
+
+        mutex = Mutex()
+        mutex.name = "malware.exe"
+        self.assertFalse(matcher.match(mutex))
+        self.assertFalse(matcher.match(mutex.to_dict()))
+
+    def test_wrappers(self):
+        pattern = Observable(file_name("malware", "Contains"))
+        matcher = compile_pattern(pattern)
+        data = Observable(instance())
+
+        self.assertTrue(matcher.match(data))
+        self.assertTrue(matcher.match(data.to_dict()))
+        self.assertTrue(matcher.match(data.object_))
+        self.assertTrue(matcher.match(data.object_.to_dict()))
+        self.assertTrue(matcher(data))
+
+    def test_hashes(self):
+        pattern = File()
+        pattern.sha1 = EMPTY_SHA1
+        pattern.sha1.condition = "Equals"
+        matcher = compile_pattern(pattern)
+
+        self.assertTrue(matcher.match(instance()))
+        self.assertTrue(matcher.match(instance().to_dict()))
+
+        data = File()
+        data.md5 = EMPTY_MD5
+        self.assertFalse(matcher.match(data))
+
+    def test_custom_properties(self):
+        prop = Property()
+        prop.name = "color"
+        prop.value = "re"
+        prop.condition = "StartsWith"
+
+        pattern = File()
+        pattern.custom_properties = CustomProperties()
+        pattern.custom_properties.append(prop)
+        matcher = compile_pattern(pattern)
+
+        data = File()
+        color = Property()
+        color.name = "color"
+        color.value = "red"
+        data.custom_properties = CustomProperties()
+        data.custom_properties.append(color)
+        self.assertTrue(matcher.match(data))
+        self.assertTrue(matcher.match(data.to_dict()))
+
+        data.custom_properties[0].name = "shade"
+        self.assertFalse(matcher.match(data))
+        self.assertFalse(matcher.match(data.to_dict()))
+
+    def test_xml_round_trip(self):
+        pattern = size([1024, 4096], "InclusiveBetween")
+        pattern = File.from_obj(pattern.to_obj())
+        matcher = compile_pattern(pattern)
+
+        self.assertTrue(matcher.match(instance(size_in_bytes=2048)))
+        self.assertFalse(matcher.match(instance(size_in_bytes=8192)))
+
+    def test_not_a_pattern(self):
+        self.assertRaises(ValueError, compile_pattern, Object())
+
+
+def composition(operator, *children):
+    return Observable(ObservableComposition(operator, list(children)))
+
+
+def count_evaluations(node):
+    """Replace the evaluate() of a compiled node with one which counts its
+    calls.
+    """
+    calls = []
+    evaluate = node.evaluate
+
+    def counting(evaluation):
+        calls.append(evaluation)
+        return evaluate(evaluation)
+
+    node.evaluate = counting
+    return calls
+
+
+class TestObservableMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.instances = Observables([
+            Observable(instance("malware.exe")),
+            Observable(Address("10.0.0.1", Address.CAT_IPV4)),
+        ])
+
+    def test_object(self):
+        matcher = compile_observable(Observable(address("10.0.0.1", "Equals")))
+        self.assertTrue(matcher.match(self.instances))
+        self.assertTrue(matcher.match(self.instances.to_dict()))
+        self.assertTrue(matcher.match(self.instances.observables))
+
+        matcher = compile_observable(Observable(address("10.0.0.2", "Equals")))
+        self.assertFalse(matcher.match(self.instances))
+        self.assertFalse(matcher.match(self.instances.to_dict()))
+
+    def test_operators(self):
+        found = Observable(address("10.0.0.1", "Equals"))
+        missing = Observable(file_name("good", "StartsWith"))
+
+        for operator, children, expected in [
+            ("AND", [found, found], True),
+            ("AND", [found, missing], False),
+            ("OR", [missing, found], True),
+            ("OR", [missing, missing], False),
+        ]:
+            matcher = compile_observable(composition(operator, *children))
+            self.assertEqual(expected, matcher.match(self.instances))
+            self.assertEqual(expected, matcher.match(self.instances.to_dict()))
+
+    def test_nested(self):
+        found = Observable(address("10.0.0.1", "Equals"))
+        missing = Observable(file_name("good", "StartsWith"))
+        pattern = composition("AND", found, composition("OR", missing, found))
+
+        self.assertTrue(compile_observable(pattern).match(self.instances))
+
+    def test_short_circuit(self):
+        regex = Observable(file_name(r"^mal.*\.exe$", "FitsPattern"))
+        pattern = File()
+        pattern.md5 = EMPTY_SHA1
+        pattern.md5.condition = "Equals"
+        missing_hash = Observable(pattern)
+
+        matcher = compile_observable(composition("AND", regex, missing_hash))
+        regex_node = matcher._root.node.children[0]
+        calls = count_evaluations(regex_node)
+
+        # The hash is cheaper, so it is evaluated first, and the regular
+        # expression is not needed.
+        self.assertFalse(matcher.match(self.instances))
+        self.assertEqual(0, len(calls))
+
+    def test_no_candidates_first(self):
+        regex = Observable(file_name(r"mal", "FitsPattern"))
+        mutex = Mutex()
+        mutex.name = "Global\\evil"
+        matcher = compile_observable(composition("AND", regex, Observable(mutex)))
+        calls = count_evaluations(matcher._root.node.children[0])
+
+        # No instance is a Mutex, so that Object costs nothing.
+        self.assertFalse(matcher.match(self.instances))
+        self.assertEqual(0, len(calls))
+
+    def test_idrefs(self):
+        shared = Observable(address("10.0.0.1", "Equals"))
+        shared.id_ = "test:shared"
+        ref1 = Observable(idref="test:shared")
+        ref2 = Observable(idref="test:shared")
+        pattern = composition("AND", ref1, composition("OR", ref2))
+
+        matcher = compile_observable(pattern, observables=Observables([shared]))
+        node = matcher._nodes["test:shared"]
+        calls = count_evaluations(node.node)
+
+        self.assertTrue(matcher.match(self.instances))
+        self.assertEqual(1, len(calls))
+
+        # Each evaluation starts again.
+        self.assertFalse(matcher.match(Observables()))
+        self.assertEqual(2, len(calls))
+
+    def test_idref_in_pattern(self):
+        shared = Observable(address("10.0.0.1", "Equals"))
+        shared.id_ = "test:shared"
+        pattern = composition("AND", shared, Observable(idref="test:shared"))
+
+        self.assertTrue(compile_observable(pattern).match(self.instances))
+
+    def test_undefined_idref(self):
+        pattern = composition("AND", Observable(idref="test:missing"))
+        self.assertRaises(ValueError, compile_observable, pattern)
+
+    def test_circular_idref(self):
+        pattern = composition("AND", Observable(idref="test:loop"))
+        pattern.id_ = "test:loop"
+        self.assertRaises(ValueError, compile_observable, pattern)
+
+    def test_instance_compositions(self):
+        instances = composition("OR", Observable(Address("10.0.0.1", Address.CAT_IPV4)))
+        matcher = compile_observable(Observable(address("10.0.0.1", "Equals")))
+
+        self.assertTrue(matcher.match(instances))
+        self.assertTrue(matcher.match([instances.to_dict()]))
+
+
+def uri(id_, value, condition, **kwargs):
+    u = URI(value)
+    u.value.condition = condition
+    for name, x in kwargs.items():
+        setattr(u.value, name, x)
+    return Observable(u, id_=id_)
+
+
+class TestBatchMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = BatchMatcher(Observables([
+            uri("test:1", "evil.com", "Contains"),
+            uri("test:2", "http://", "StartsWith"),
+            uri("test:3", ".exe", "EndsWith"),
+            uri("test:4", ["bad", "worse"], "Contains"),
+            uri("test:5", "EVIL", "Contains", is_case_sensitive=False),
+            uri("test:6", "http://evil.com/a.exe", "Equals"),
+            Observable(file_name("evil", "Contains"), id_="test:7"),
+        ]))
+
+    def assertMatches(self, ids, instance):
+        self.assertEqual(set(ids), self.batch.match(instance))
+        self.assertEqual(set(ids), self.batch.match(instance.to_dict()))
+
+    def test_match(self):
+        self.assertEqual(7, len(self.batch))
+        self.assertMatches(["test:1", "test:2", "test:3", "test:5", "test:6"],
+                           URI("http://evil.com/a.exe"))
+        self.assertMatches(["test:4"], URI("ftp://worse.org/"))
+        self.assertMatches([], URI("ftp://example.com/"))
+
+    def test_class(self):
+        f = File()
+        f.file_name = "evil.com"
+        self.assertMatches(["test:7"], f)
+
+    def test_same_as_pattern_matchers(self):
+        patterns = [
+            uri("test:1", "evil", "Contains"),
+            uri("test:2", ["a", "b"], "StartsWith"),
+            uri("test:3", "EXE", "EndsWith", is_case_sensitive=False),
+            uri("test:4", "", "Contains"),
+            uri("test:5", "evil", "DoesNotContain"),
+        ]
+        batch = BatchMatcher(patterns)
+        matchers = [(p.id_, compile_pattern(p)) for p in patterns]
+
+        for value in ["evil.exe", "b-evil.EXE", "good", "a", ""]:
+            expected = set(id_ for id_, m in matchers if m.match(URI(value)))
+            self.assertEqual(expected, batch.match(URI(value)), value)
+
+    def test_other_properties_are_verified(self):
+        pattern = file_name("evil", "Contains")
+        pattern.size_in_bytes = 1024
+        pattern.size_in_bytes.condition = "GreaterThan"
+        batch = BatchMatcher(Observable(pattern, id_="test:1"))
+
+        self.assertEqual(set(["test:1"]), batch.match(instance("evil.exe", 2048)))
+        self.assertEqual(set(), batch.match(instance("evil.exe", 512)))
+
+    def test_nested_property(self):
+        pattern = EmailMessage()
+        pattern.subject = "invoice"
+        pattern.subject.condition = "Contains"
+        batch = BatchMatcher(Observable(pattern, id_="test:1"))
+
+        email = EmailMessage()
+        email.subject = "Your invoice is attached"
+        self.assertEqual(set(["test:1"]), batch.match(email))
+        self.assertEqual(set(["test:1"]), batch.match(email.to_dict()))
+
+        email.subject = "Hello"
+        self.assertEqual(set(), batch.match(email))
+
+    def test_observables_without_objects(self):
+        batch = BatchMatcher([Observable(idref="test:1"), composition("OR")])
+        self.assertEqual(0, len(batch))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,14 +2,15 @@
 # See LICENSE.txt for complete terms.
 
 from base64 import b64encode
+import hashlib
 import unittest
 from zlib import compress
 
 from mixbox.vendor import six
-from mixbox.vendor.six import u
+from mixbox.vendor.six import BytesIO, u
 
 from cybox.objects.artifact_object import (Artifact, Base64Encoding,
-                                           Bz2Compression, Packaging, RawArtifact, XOREncryption, ZlibCompression)
+                                           Bz2Compression, Compression, Encryption, Packaging, RawArtifact, XOREncryption, ZlibCompression)
 from cybox.test import round_trip
 from cybox.test.objects import ObjectTestCase
 
@@ -149,6 +150,185 @@ class TestArtifact(ObjectTestCase, unittest.TestCase):
         self.assertEqual(self.binary_data, a2.data)
 
 
+class TestArtifactFromStream(unittest.TestCase):
+
+    def test_from_stream(self):
+        data = b"\x00\x01\x02" * 1000
+        a = Artifact.from_stream(BytesIO(data), Artifact.TYPE_FILE, chunk_size=100)
+
+        self.assertEqual(data, a.data)
+        self.assertEqual(Artifact.TYPE_FILE, a.type_)
+        self.assertEqual(hashlib.md5(data).hexdigest(), a.hashes.md5)
+        self.assertEqual(hashlib.sha256(data).hexdigest(), a.hashes.sha256)
+
+    def test_no_hashes(self):
+        a = Artifact.from_stream(BytesIO(b"abc"), hashes=())
+        self.assertEqual(b"abc", a.data)
+        self.assertEqual(None, a.hashes)
+
+
+class CountingEncoding(Base64Encoding):
+    """Base64Encoding that counts how often it is used."""
+
+    def __init__(self):
+        super(CountingEncoding, self).__init__()
+        self.calls = 0
+
+    def pack(self, data):
+        self.calls += 1
+        return super(CountingEncoding, self).pack(data)
+
+    def unpack(self, packed_data):
+        self.calls += 1
+        return super(CountingEncoding, self).unpack(packed_data)
+
+
+class TestArtifactCaching(unittest.TestCase):
+
+    binary_data = b"\xde\xad\xbe\xef Dead Beef"
+
+    def setUp(self):
+        self.encoding = CountingEncoding()
+        self.packaging = Packaging()
+        self.packaging.encoding.append(self.encoding)
+
+    def test_packed_data(self):
+        a = Artifact(self.binary_data)
+        a.packaging = self.packaging
+
+        packed = a.packed_data
+        a.to_dict()
+        a.to_obj()
+        self.assertEqual(packed, a.packed_data)
+        self.assertEqual(1, self.encoding.calls)
+
+    def test_data(self):
+        a = Artifact()
+        a.packaging = self.packaging
+        a.packed_data = b64encode(self.binary_data).decode('ascii')
+
+        self.assertEqual(self.binary_data, a.data)
+        self.assertEqual(self.binary_data, a.data)
+        self.assertEqual(1, self.encoding.calls)
+
+    def test_data_changed(self):
+        a = Artifact(self.binary_data)
+        a.packaging = self.packaging
+        a.packed_data
+
+        a.data = b"other"
+        self.assertEqual(b64encode(b"other").decode('ascii'), a.packed_data)
+        self.assertEqual(2, self.encoding.calls)
+
+    def test_packed_data_changed(self):
+        a = Artifact()
+        a.packaging = self.packaging
+        a.packed_data = b64encode(self.binary_data).decode('ascii')
+        a.data
+
+        a.packed_data = b64encode(b"other").decode('ascii')
+        self.assertEqual(b"other", a.data)
+        self.assertEqual(2, self.encoding.calls)
+
+    def test_packaging_changed(self):
+        a = Artifact(self.binary_data)
+        a.packaging = self.packaging
+        a.packed_data
+
+        # Adding a layer in place.
+        a.packaging.compression.append(ZlibCompression())
+        expected = b64encode(compress(self.binary_data)).decode('ascii')
+        self.assertEqual(expected, a.packed_data)
+        self.assertEqual(2, self.encoding.calls)
+
+        # Replacing the packaging.
+        a.packaging = Packaging()
+        a.packaging.encoding.append(self.encoding)
+        self.assertEqual(b64encode(self.binary_data).decode('ascii'), a.packed_data)
+        self.assertEqual(3, self.encoding.calls)
+
+    def test_layer_changed(self):
+        a = Artifact(self.binary_data)
+        a.packaging = self.packaging
+        a.packaging.encryption.append(XOREncryption(0x4a))
+        first = a.packed_data
+
+        a.packaging.encryption[0].encryption_key = 0x4b
+        self.assertNotEqual(first, a.packed_data)
+        self.assertEqual(2, self.encoding.calls)
+
+
+class TestArtifactStreaming(unittest.TestCase):
+
+    binary_data = b"\xde\xad\xbe\xef Dead Beef" * 1000
+
+    def _packaging(self, *layers):
+        p = Packaging()
+        for layer in layers:
+            if isinstance(layer, Compression):
+                p.compression.append(layer)
+            elif isinstance(layer, Encryption):
+                p.encryption.append(layer)
+            else:
+                p.encoding.append(layer)
+        return p
+
+    def _check(self, *layers):
+        a = Artifact(self.binary_data)
+        a.packaging = self._packaging(*layers)
+
+        streamed = Artifact()
+        streamed.packaging = a.packaging
+        streamed.pack_from(BytesIO(self.binary_data), chunk_size=100)
+        self.assertEqual(a.packed_data, streamed.packed_data)
+
+        out = BytesIO()
+        size = streamed.unpack_to(out, chunk_size=99)
+        self.assertEqual(self.binary_data, out.getvalue())
+        self.assertEqual(len(self.binary_data), size)
+
+    def test_base64(self):
+        self._check(Base64Encoding())
+
+    def test_zlib_base64(self):
+        self._check(ZlibCompression(), Base64Encoding())
+
+    def test_bz2_xor_base64(self):
+        self._check(Bz2Compression(), XOREncryption(0x4a), Base64Encoding())
+
+    def test_buffered_layer(self):
+        class ReverseEncryption(Encryption):
+            def pack(self, data):
+                return data[::-1]
+
+            def unpack(self, packed_data):
+                return packed_data[::-1]
+
+        self._check(ReverseEncryption(), Base64Encoding())
+
+    def test_line_breaks(self):
+        a = Artifact()
+        a.packaging = self._packaging(Base64Encoding())
+        packed = b64encode(self.binary_data).decode('ascii')
+        a.packed_data = u("\n").join(packed[i:i + 76] for i in range(0, len(packed), 76))
+
+        out = BytesIO()
+        a.unpack_to(out, chunk_size=50)
+        self.assertEqual(self.binary_data, out.getvalue())
+
+    def test_unpack_data(self):
+        out = BytesIO()
+        Artifact(self.binary_data).unpack_to(out)
+        self.assertEqual(self.binary_data, out.getvalue())
+
+    def test_data_already_set(self):
+        a = Artifact(self.binary_data)
+        self.assertRaises(ValueError, a.pack_from, BytesIO(b"abc"))
+
+    def test_non_ascii(self):
+        self.assertRaises(ValueError, Artifact().pack_from, BytesIO(self.binary_data))
+
+
 class TestArtifactInstance(ObjectTestCase, unittest.TestCase):
     object_type = "ArtifactObjectType"
     klass = Artifact
@@ -1,6 +1,9 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import os
+import shutil
+import tempfile
 import unittest
 
 from mixbox.vendor.six import u
@@ -122,6 +125,51 @@ class TestFile(ObjectTestCase, unittest.TestCase):
         self.assertEqual(EMPTY_SHA384, f.sha384)
         self.assertEqual(EMPTY_SHA512, f.sha512)
 
+    def test_set_hashes_dict(self):
+        f = File()
+        f.set_hashes({"md5": EMPTY_MD5, "sha256": EMPTY_SHA256})
+
+        self.assertEqual(2, len(f.hashes))
+        self.assertEqual(EMPTY_MD5, f.md5)
+        self.assertEqual(EMPTY_SHA256, f.sha256)
+
+    def test_from_path(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "empty.txt")
+            open(path, "wb").close()
+
+            f = File.from_path(path, hashes=["md5", "sha1"], peak_entropy=True)
+            self.assertEqual("empty.txt", f.file_name)
+            self.assertEqual(path, f.file_path.value)
+            self.assertEqual(0, f.size_in_bytes.value)
+            self.assertEqual(EMPTY_MD5, f.md5)
+            self.assertEqual(EMPTY_SHA1, f.sha1)
+            self.assertEqual(None, f.sha256)
+            self.assertEqual(0.0, f.peak_entropy.value)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_walk(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(tmpdir, "sub"))
+            for name in ("a", "b", os.path.join("sub", "c")):
+                with open(os.path.join(tmpdir, name), "wb") as f:
+                    f.write(name.encode("utf-8"))
+
+            files = list(File.walk(tmpdir, workers=2))
+            self.assertEqual(["a", "b", "c"], sorted(str(f.file_name) for f in files))
+            self.assertEqual(1, files[0].size_in_bytes.value)
+            self.assertTrue(all(f.sha256 for f in files))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_walk_errors(self):
+        errors = []
+        self.assertEqual([], list(File.walk("/does/not/exist", onerror=errors.append)))
+        self.assertEqual(1, len(errors))
+
     def test_add_hash_string(self):
         s = "ffffffffffffffffffff"
         f = File()
@@ -0,0 +1,82 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import random
+import unittest
+
+from cybox.utils.ahocorasick import Automaton
+
+
+def occurrences(words, text):
+    """The (end, word) tuples of every occurrence, found the slow way."""
+    return sorted(
+        (i + len(w) - 1, w)
+        for w in set(words) if w
+        for i in range(len(text)) if text.startswith(w, i)
+    )
+
+
+class TestAutomaton(unittest.TestCase):
+
+    def automaton(self, words):
+        automaton = Automaton()
+        for word in words:
+            automaton.add(word, word)
+        return automaton
+
+    def test_iter(self):
+        words = ["he", "she", "his", "hers"]
+        automaton = self.automaton(words)
+        self.assertEqual(occurrences(words, "ushers"), sorted(automaton.iter("ushers")))
+
+    def test_random(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            words = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4)))
+                     for _ in range(8)]
+            text = "".join(rng.choice("abc") for _ in range(30))
+            automaton = self.automaton(set(words))
+            self.assertEqual(occurrences(words, text), sorted(automaton.iter(text)))
+
+    def test_nested_suffixes(self):
+        words = ["a" * n for n in range(1, 6)] + ["ba", "bab"]
+        automaton = self.automaton(words)
+        text = "aaaaabaaab"
+        self.assertEqual(occurrences(words, text), sorted(automaton.iter(text)))
+
+        # Each node links to one other node rather than holding a copy of
+        # the values of its suffixes.
+        self.assertEqual(len(automaton._goto), len(automaton._output))
+        self.assertTrue(all(isinstance(x, int) for x in automaton._output))
+
+    def test_values(self):
+        automaton = self.automaton(["evil", "vil.exe", "good"])
+        self.assertEqual(set(["evil", "vil.exe"]), automaton.values("c:\\evil.exe"))
+        self.assertEqual(set(), automaton.values(""))
+
+    def test_several_values(self):
+        automaton = Automaton()
+        automaton.add("evil", 1)
+        automaton.add("evil", 2)
+        self.assertEqual(set([1, 2]), automaton.values("evil"))
+        self.assertEqual(2, len(automaton))
+
+    def test_add_after_search(self):
+        automaton = self.automaton(["abc"])
+        self.assertEqual(set(["abc"]), automaton.values("xabcd"))
+        automaton.add("bcd", "bcd")
+        self.assertEqual(set(["abc", "bcd"]), automaton.values("xabcd"))
+
+    def test_prefixes(self):
+        automaton = self.automaton(["", "http", "http://", "https://", "ftp"])
+        self.assertEqual(set(["", "http", "http://"]),
+                         automaton.prefixes("http://example.com"))
+        self.assertEqual(set([""]), automaton.prefixes("gopher://"))
+
+    def test_empty_word_not_iterated(self):
+        automaton = self.automaton(["", "a"])
+        self.assertEqual([(0, "a")], list(automaton.iter("a")))
+
+
+if __name__ == "__main__":
+    unittest.main()
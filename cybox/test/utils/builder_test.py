@@ -0,0 +1,196 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import re
+import unittest
+
+from lxml import etree
+from mixbox.vendor.six import BytesIO
+
+import cybox.bindings
+import cybox.utils
+from cybox.common import MeasureSource
+from cybox.common.object_properties import ObjectPropertiesFactory
+from cybox.core import Observable, Observables
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.test.common import measuresource_test
+from cybox.test.core import observable_test
+from cybox.test.objects import (artifact_test, file_test, network_packet_test,
+                                pdf_file_test)
+from cybox.utils import builder
+
+
+def _via_bindings(klass, xml):
+    cybox.utils.cache_clear()
+    return klass.from_obj(klass._binding.parseString(xml.decode("utf-8")))
+
+
+def _direct(klass, xml):
+    cybox.utils.cache_clear()
+    return builder.from_element(klass, etree.fromstring(xml))
+
+
+class TestFromElement(unittest.TestCase):
+
+    def assertSameResult(self, klass, d):
+        xml = klass.from_dict(d).to_xml(encoding="utf-8")
+        expected = _via_bindings(klass, xml).to_dict()
+        self.assertEqual(expected, _direct(klass, xml).to_dict())
+
+    def test_observables(self):
+        self.assertSameResult(Observables, observable_test.TestObservables._full_dict)
+
+    def test_file(self):
+        # Boolean and integer attributes, hashes, nested lists.
+        self.assertSameResult(File, file_test.TestFile._full_dict)
+
+    def test_artifact(self):
+        # Artifact.from_obj() reads Raw_Artifact itself, and Packaging
+        # layers are resolved with factories.
+        self.assertSameResult(artifact_test.TestArtifactInstance.klass,
+                              artifact_test.TestArtifactInstance._full_dict)
+
+    def test_pdf_file(self):
+        # "type" attributes are stored as "type_" by the bindings.
+        self.assertSameResult(pdf_file_test.TestPDFFileInstance.klass,
+                              pdf_file_test.TestPDFFileInstance._full_dict)
+
+    def test_measure_source(self):
+        # "class" attributes are stored as "classxx" by the bindings.
+        self.assertSameResult(MeasureSource, measuresource_test.TestMeasureSource._full_dict)
+
+    def test_boolean_children(self):
+        self.assertSameResult(network_packet_test.TestICMPv4.klass,
+                              network_packet_test.TestICMPv4._full_dict)
+
+    def test_factory(self):
+        f = File()
+        f.file_name = "foo.exe"
+        xml = f.to_xml(encoding="utf-8")
+
+        cybox.utils.cache_clear()
+        parsed = builder.from_element(ObjectPropertiesFactory, etree.fromstring(xml))
+
+        self.assertTrue(isinstance(parsed, File))
+        self.assertEqual("foo.exe", parsed.file_name.value)
+
+    def test_defaults(self):
+        # Missing attributes get the binding defaults, not None.
+        xml = Address("10.0.0.1").to_xml(encoding="utf-8")
+        parsed = _direct(Address, xml)
+        self.assertEqual("string", parsed.address_value.datatype)
+        self.assertEqual("##comma##", parsed.address_value.delimiter)
+
+    def test_none(self):
+        self.assertEqual(None, builder.from_element(File, None))
+
+
+class TestParse(unittest.TestCase):
+
+    def test_parse(self):
+        observables = Observables([
+            Observable(Address("10.0.0.1", Address.CAT_IPV4)),
+            Observable(Address("10.0.0.2", Address.CAT_IPV4)),
+        ])
+        expected = observables.to_dict()
+
+        parsed = builder.parse(BytesIO(observables.to_xml()))
+
+        self.assertTrue(isinstance(parsed, Observables))
+        self.assertEqual(expected, parsed.to_dict())
+
+    def test_parse_class(self):
+        xml = Address("10.0.0.1", Address.CAT_IPV4).to_xml()
+        parsed = builder.parse(BytesIO(xml), Address)
+        self.assertEqual("10.0.0.1", parsed.address_value.value)
+        self.assertEqual(Address.CAT_IPV4, parsed.category)
+
+
+def _binding_conversions():
+    """Return a dictionary of (kind, conversion) => set of (binding class
+    name, name), read from the build methods of every binding module.
+
+    `kind` is ``"attribute"`` or ``"child"``, and `conversion` is
+    ``"boolean"``, ``"integer"``, ``"float"`` or ``None`` for values which
+    are kept as strings.
+    """
+    patterns = [
+        (re.compile(r"^class (\w+)\("), None),
+        (re.compile(r"find_attr_value_\('(\w+)', node\)"), "attribute"),
+        (re.compile(r"nodeName_ == '(\w+)'"), "child"),
+    ]
+    conversions = [
+        (re.compile(r"if (?:value|sval_) in \('true', '1'\)"), "boolean"),
+        (re.compile(r"= int\((?:value|sval_)\)"), "integer"),
+        (re.compile(r"= float\((?:value|sval_)\)"), "float"),
+    ]
+
+    found = {}
+    directory = os.path.dirname(cybox.bindings.__file__)
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".py"):
+            continue
+
+        klass = kind = name = None
+        with open(os.path.join(directory, filename)) as f:
+            for line in f:
+                for pattern, match_kind in patterns:
+                    match = pattern.search(line)
+                    if not match:
+                        continue
+                    if match_kind is None:
+                        klass, kind = match.group(1), None
+                    else:
+                        kind, name = match_kind, match.group(1)
+                        found.setdefault((kind, None), set()).add((klass, name))
+                if kind is None:
+                    continue
+                for pattern, conversion in conversions:
+                    if pattern.search(line):
+                        found.setdefault((kind, conversion), set()).add((klass, name))
+
+    for (kind, conversion), names in list(found.items()):
+        if conversion is not None:
+            found[kind, None] -= names
+    return found
+
+
+class TestBindingConversions(unittest.TestCase):
+    """The builder's tables of converted values must match the bindings."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.found = _binding_conversions()
+
+    def names(self, kind, conversion):
+        return set(name for _, name in self.found.get((kind, conversion), ()))
+
+    def test_attributes(self):
+        self.assertEqual(self.names("attribute", "boolean"),
+                         builder._BOOLEAN_ATTRIBUTES)
+        self.assertEqual(self.names("attribute", "integer"),
+                         builder._INTEGER_ATTRIBUTES)
+        self.assertEqual(self.names("attribute", "float"),
+                         builder._FLOAT_ATTRIBUTES)
+
+    def test_string_attributes(self):
+        # Attributes which share a name with a converted attribute, but are
+        # kept as strings by their own class.
+        converted = (builder._BOOLEAN_ATTRIBUTES |
+                     builder._INTEGER_ATTRIBUTES | builder._FLOAT_ATTRIBUTES)
+        strings = set(x for x in self.found[("attribute", None)]
+                      if x[1] in converted)
+        self.assertEqual(strings, builder._STRING_ATTRIBUTES)
+
+    def test_children(self):
+        self.assertEqual(self.names("child", "boolean"),
+                         builder._BOOLEAN_CHILDREN)
+        self.assertEqual(self.names("child", "integer"),
+                         builder._INTEGER_CHILDREN)
+        self.assertEqual(self.names("child", "float"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import copy
+import importlib
+import pkgutil
+import unittest
+
+import cybox.test.objects
+from cybox.common import BaseProperty, ObjectProperties, String
+from cybox.core import Observable, Observables
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.objects.whois_object import WhoisStatus
+from cybox.utils import fastdict
+
+
+def _fixtures():
+    """Yield (name, class, dictionary) for every object test case."""
+    for _, modname, _ in pkgutil.iter_modules(cybox.test.objects.__path__):
+        module = importlib.import_module("cybox.test.objects." + modname)
+        for name, case in sorted(vars(module).items()):
+            klass = getattr(case, "klass", None)
+            if klass and hasattr(case, "_full_dict"):
+                yield "%s.%s" % (modname, name), klass, case._full_dict
+
+
+class TestFastDict(unittest.TestCase):
+
+    def tearDown(self):
+        fastdict.disable()
+
+    def _generic(self, klass, d):
+        fastdict.disable()
+        return klass.from_dict(copy.deepcopy(d))
+
+    def _compiled(self, klass, d):
+        fastdict.enable()
+        return klass.from_dict(copy.deepcopy(d))
+
+    def test_fixtures(self):
+        # Every object test fixture gives the same entities and dictionaries
+        # either way.
+        for name, klass, d in _fixtures():
+            generic = self._generic(klass, d)
+            expected = generic.to_dict()
+
+            compiled = self._compiled(klass, d)
+            self.assertEqual(expected, compiled.to_dict(), name)
+            self.assertEqual(expected, generic.to_dict(), name)
+            self.assertEqual(generic.to_xml(), compiled.to_xml(), name)
+
+    def test_observables(self):
+        f = File()
+        f.file_name = "malware.exe"
+        f.add_hash("d41d8cd98f00b204e9800998ecf8427e")
+        observables = Observables([Observable(f), Observable(Address("10.0.0.1"))])
+
+        expected = observables.to_dict()
+        fastdict.enable()
+        self.assertEqual(expected, observables.to_dict())
+        self.assertEqual(expected, Observables.from_dict(expected).to_dict())
+
+    def test_plain_property(self):
+        fastdict.enable()
+
+        s = String.from_dict("foo")
+        self.assertEqual("foo", s.value)
+        self.assertEqual("string", s.datatype)
+        self.assertTrue(s.is_plain())
+        self.assertEqual("foo", s.to_dict())
+
+        s.condition = "Equals"
+        self.assertEqual({"value": "foo", "condition": "Equals"}, s.to_dict())
+
+    def test_property_hooks(self):
+        # String's value field validates its input.
+        fastdict.enable()
+        self.assertRaises(ValueError, String.from_dict, 1)
+
+    def test_fallback(self):
+        # WhoisStatus replaces the datatype field with a class attribute.
+        fastdict.enable()
+        d = WhoisStatus.from_dict({"value": "CLIENT-HOLD", "condition": "Equals"}).to_dict()
+        self.assertEqual(fastdict._BASE_PROPERTY_FROM_DICT, fastdict._FROM_DICT[WhoisStatus])
+        self.assertEqual({"value": "CLIENT-HOLD", "condition": "Equals"}, d)
+
+    def test_disable(self):
+        fastdict.enable()
+        self.assertTrue(fastdict.is_enabled())
+
+        fastdict.disable()
+        self.assertFalse(fastdict.is_enabled())
+        self.assertFalse("from_dict" in ObjectProperties.__dict__)
+        self.assertEqual(fastdict._BASE_PROPERTY_TO_DICT, BaseProperty.__dict__["to_dict"])
+
+
+if __name__ == "__main__":
+    unittest.main()
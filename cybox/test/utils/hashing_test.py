@@ -0,0 +1,110 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from cybox.utils import hashing
+
+UNIFORM = bytearray(range(256)) * (hashing.ENTROPY_BLOCK_SIZE // 256)
+DATA = bytes(bytearray(hashing.ENTROPY_BLOCK_SIZE) + UNIFORM + b"abc")
+
+
+class TestMultiHasher(unittest.TestCase):
+
+    def _expected(self, data):
+        return dict((x, hashlib.new(x, data).hexdigest()) for x in hashing.DEFAULT_HASHES)
+
+    def test_hashes(self):
+        hasher = hashing.MultiHasher()
+        hasher.update(DATA)
+        self.assertEqual(self._expected(DATA), hasher.hexdigests)
+        self.assertEqual(len(DATA), hasher.size)
+        self.assertEqual(None, hasher.peak_entropy)
+
+    def test_unknown_algorithm(self):
+        self.assertRaises(ValueError, hashing.MultiHasher, ["crc32"])
+
+    def test_entropy(self):
+        hasher = hashing.MultiHasher([], entropy=True)
+        hasher.update(bytes(bytearray(100)))
+        hasher.finish()
+        self.assertEqual(0.0, hasher.peak_entropy)
+
+    def test_peak_entropy_read_only(self):
+        # Reading the property does not change the hasher, so data added
+        # afterwards is still counted in the same blocks.
+        hasher = hashing.MultiHasher([], entropy=True)
+        hasher.update(DATA[:100])
+        self.assertEqual(0.0, hasher.peak_entropy)
+        hasher.update(DATA[100:])
+        hasher.finish()
+
+        expected = hashing.hash_stream(BytesIO(DATA), [], entropy=True)
+        self.assertEqual(expected.peak_entropy, hasher.peak_entropy)
+        self.assertEqual(hasher.peak_entropy, hasher.peak_entropy)
+
+    def test_peak_entropy(self):
+        for chunk_size in (1000, 4096, len(DATA)):
+            hasher = hashing.hash_stream(BytesIO(DATA), entropy=True,
+                                         chunk_size=chunk_size)
+            self.assertEqual(8.0, hasher.peak_entropy)
+            self.assertEqual(self._expected(DATA), hasher.hexdigests)
+
+    def test_callback(self):
+        chunks = []
+        hashing.hash_stream(BytesIO(DATA), chunk_size=1000, callback=chunks.append)
+        self.assertEqual(DATA, b"".join(chunks))
+
+
+class TestHashFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_file(self):
+        path = self._write("data", DATA)
+        hasher = hashing.hash_file(path, ["sha512"], entropy=True, chunk_size=5000)
+        self.assertEqual(hashlib.sha512(DATA).hexdigest(), hasher.hexdigests["sha512"])
+        self.assertEqual(8.0, hasher.peak_entropy)
+
+    def test_file_without_views(self):
+        # As on Python 2, where hashlib does not accept memoryviews.
+        path = self._write("data", DATA)
+        hash_views = hashing._HASH_VIEWS
+        hashing._HASH_VIEWS = False
+        try:
+            hasher = hashing.hash_file(path, entropy=True, chunk_size=5000)
+        finally:
+            hashing._HASH_VIEWS = hash_views
+        self.assertEqual(hashlib.md5(DATA).hexdigest(), hasher.hexdigests["md5"])
+        self.assertEqual(8.0, hasher.peak_entropy)
+
+    def test_empty_file(self):
+        path = self._write("empty", b"")
+        hasher = hashing.hash_file(path)
+        self.assertEqual(0, hasher.size)
+        self.assertEqual(hashlib.md5().hexdigest(), hasher.hexdigests["md5"])
+
+    def test_iter_paths(self):
+        os.mkdir(os.path.join(self.tmpdir, "sub"))
+        expected = [self._write("a", b"a"), self._write(os.path.join("sub", "b"), b"b")]
+        self.assertEqual(sorted(expected), sorted(hashing.iter_paths(self.tmpdir)))
+
+
+if __name__ == "__main__":
+    unittest.main()
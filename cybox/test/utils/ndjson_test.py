@@ -0,0 +1,135 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mixbox.vendor.six import StringIO
+
+from cybox.common import MeasureSource
+from cybox.core import Object, Observable, Observables
+from cybox.core.pool import ObjectPool, Pools
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.utils import ndjson
+
+
+class TestNDJSON(unittest.TestCase):
+
+    def setUp(self):
+        f = File()
+        f.file_name = "malware.exe"
+        f.add_hash("d41d8cd98f00b204e9800998ecf8427e")
+
+        source = MeasureSource()
+        source.name = "scanner"
+
+        self.observables = Observables([
+            Observable(Address("192.168.1.1", Address.CAT_IPV4)),
+            Observable(f),
+        ])
+        self.observables.observable_package_source = source
+
+    def _write(self, observables, **kwargs):
+        out = StringIO()
+        ndjson.write_ndjson(observables, out, **kwargs)
+        return out.getvalue()
+
+    def test_lines(self):
+        lines = self._write(self.observables).splitlines()
+        self.assertEqual(3, len(lines))
+
+        header = json.loads(lines[0])
+        self.assertEqual(2, header["major_version"])
+        self.assertEqual("scanner", header["observable_package_source"]["name"])
+        self.assertFalse("observables" in header)
+
+        for observable, line in zip(self.observables, lines[1:]):
+            self.assertEqual(observable.to_dict(), json.loads(line))
+
+    def test_header(self):
+        pools = Pools()
+        pools.object_pool = ObjectPool()
+        address = Address("10.0.0.1", Address.CAT_IPV4)
+        pools.object_pool.objects.append(Object(address))
+        self.observables.pools = pools
+
+        expected = self.observables.to_dict()
+        del expected["observables"]
+        header = json.loads(self._write(self.observables).splitlines()[0])
+        self.assertEqual(expected, header)
+
+    def test_each_observable_converted_once(self):
+        observables = Observables([
+            Observable(Address("10.0.0.%d" % i, Address.CAT_IPV4))
+            for i in range(100)
+        ])
+        calls = []
+        to_dict = Observable.to_dict
+
+        def counting_to_dict(self):
+            calls.append(self)
+            return to_dict(self)
+
+        Observable.to_dict = counting_to_dict
+        try:
+            self._write(observables)
+        finally:
+            Observable.to_dict = to_dict
+
+        self.assertEqual(100, len(calls))
+
+    def test_read(self):
+        text = self._write(self.observables)
+        parsed = ndjson.read_ndjson(StringIO(text))
+        self.assertEqual(self.observables.to_dict(), parsed.to_dict())
+
+    def test_iter(self):
+        text = self._write(self.observables)
+        parsed = list(ndjson.iter_observables_ndjson(StringIO(text)))
+        self.assertEqual([x.to_dict() for x in self.observables],
+                         [x.to_dict() for x in parsed])
+
+    def test_iter_without_header(self):
+        # The lines after the header, as a worker would get them.
+        lines = self._write(self.observables).splitlines(True)[1:]
+
+        parsed = list(ndjson.iter_observables_ndjson(lines))
+        self.assertEqual(2, len(parsed))
+
+        parsed = list(ndjson.iter_observables_ndjson(lines, header=False))
+        self.assertEqual(2, len(parsed))
+
+        self.assertRaises(ValueError, list,
+                          ndjson.iter_observables_ndjson(lines, header=True))
+
+    def test_write_iterable(self):
+        source = self.observables.observable_package_source
+        text = self._write(iter(self.observables),
+                           observable_package_source=source)
+        self.assertEqual(self._write(self.observables), text)
+
+    def test_blank_lines(self):
+        text = self._write(self.observables).replace("\n", "\n\n")
+        parsed = ndjson.read_ndjson(StringIO(text))
+        self.assertEqual(self.observables.to_dict(), parsed.to_dict())
+
+    def test_missing_header(self):
+        self.assertRaises(ValueError, ndjson.read_ndjson, StringIO(""))
+
+    def test_filename(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "observables.ndjson")
+            ndjson.write_ndjson(self.observables, path)
+            parsed = ndjson.read_ndjson(path)
+            self.assertEqual(self.observables.to_dict(), parsed.to_dict())
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()
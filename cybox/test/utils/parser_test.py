@@ -0,0 +1,84 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from cybox.core import Observable, ObservableComposition, Observables
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.utils.parser import iter_observables
+
+
+class TruncatedStream(object):
+    """A file-like object which returns `data`, and then raises IOError
+    instead of reporting the end of the file.
+    """
+
+    def __init__(self, data):
+        self._data = data
+
+    def read(self, size=-1):
+        if not self._data:
+            raise IOError("Read past the available data")
+        data, self._data = self._data, b""
+        return data
+
+
+class TestIterObservables(unittest.TestCase):
+
+    def setUp(self):
+        f = File()
+        f.file_name = "malware.exe"
+
+        composition = ObservableComposition(
+            operator=ObservableComposition.OPERATOR_OR,
+            observables=[
+                Observable(Address("10.0.0.1", Address.CAT_IPV4)),
+                Observable(Address("10.0.0.2", Address.CAT_IPV4)),
+            ]
+        )
+
+        self.observables = Observables([
+            Observable(Address("192.168.1.1", Address.CAT_IPV4)),
+            Observable(f),
+            Observable(composition),
+        ])
+
+    def _iter(self):
+        xml = self.observables.to_xml()
+        return iter_observables(BytesIO(xml))
+
+    def test_yields_top_level_observables(self):
+        parsed = list(self._iter())
+        expected = [o.to_dict() for o in self.observables]
+
+        self.assertEqual(3, len(parsed))
+        self.assertEqual(expected, [o.to_dict() for o in parsed])
+
+    def test_composition_children_not_yielded(self):
+        parsed = list(self._iter())
+        composition = parsed[2].observable_composition
+        self.assertEqual(2, len(composition.observables))
+
+    def test_is_lazy(self):
+        # Only the first Observable can be read from the stream, so the
+        # first one must be returned before the rest is parsed.
+        xml = self.observables.to_xml()
+        end = xml.index(b"</cybox:Observable>") + len(b"</cybox:Observable>")
+        iterator = iter_observables(TruncatedStream(xml[:end]))
+
+        first = next(iterator)
+        self.assertEqual("192.168.1.1",
+                         first.object_.properties.address_value.value)
+        self.assertRaises(IOError, next, iterator)
+
+    def test_bad_root(self):
+        xml = Observable(Address("1.2.3.4")).to_xml()
+        iterator = iter_observables(BytesIO(xml))
+        self.assertRaises(ValueError, list, iterator)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from mixbox.vendor.six import BytesIO, StringIO
+
+import cybox.bindings.cybox_core as core_binding
+from cybox.common import MeasureSource
+from cybox.core import Object, Observable, Observables
+from cybox.core.pool import ObjectPool, Pools
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+from cybox.utils import builder, writer
+
+
+class TestWriteXML(unittest.TestCase):
+
+    def setUp(self):
+        f = File()
+        f.file_name = "malware.exe"
+        f.add_hash("d41d8cd98f00b204e9800998ecf8427e")
+
+        self.observables = Observables([
+            Observable(Address("192.168.1.1", Address.CAT_IPV4)),
+            Observable(f),
+        ])
+        self.observables.add(Observable(Address("10.0.0.1", Address.CAT_IPV4)))
+
+    def _write(self, entity, **kwargs):
+        out = BytesIO()
+        writer.write_xml(entity, out, **kwargs)
+        return out.getvalue()
+
+    def test_same_as_to_xml(self):
+        observable = Observable(Address("10.0.0.1", Address.CAT_IPV4))
+        self.assertEqual(observable.to_xml(), self._write(observable))
+
+    def test_observables(self):
+        xml = self._write(self.observables)
+        parsed = builder.parse(BytesIO(xml))
+        self.assertEqual(self.observables.to_dict(), parsed.to_dict())
+
+    def test_namespaces(self):
+        xml = self._write(self.observables)
+        for prefix in (b"xmlns:cybox=", b"xmlns:AddressObj=", b"xmlns:FileObj="):
+            self.assertTrue(prefix in xml)
+
+    def test_no_namespaces(self):
+        xml = self._write(self.observables, include_namespaces=False)
+        self.assertEqual(self.observables.to_xml(include_namespaces=False), xml)
+
+    def test_not_pretty(self):
+        xml = self._write(self.observables, pretty=False)
+        self.assertFalse(b"\n" in xml.strip())
+        parsed = builder.parse(BytesIO(xml))
+        self.assertEqual(self.observables.to_dict(), parsed.to_dict())
+
+    def test_entity_unchanged(self):
+        self._write(self.observables)
+        self.assertEqual(3, len(self.observables))
+
+    def test_gzip(self):
+        out = BytesIO()
+        writer.write_xml(self.observables, out, compress=True)
+
+        xml = gzip.GzipFile(fileobj=BytesIO(out.getvalue())).read()
+        self.assertEqual(self._write(self.observables), xml)
+
+    def test_gzip_requires_encoding(self):
+        self.assertRaises(ValueError, writer.write_xml, self.observables,
+                          BytesIO(), encoding=None, compress=True)
+
+    def test_text_file(self):
+        out = StringIO()
+        writer.write_xml(self.observables, out, encoding=None)
+        self.assertEqual(self._write(self.observables).decode("utf-8"), out.getvalue())
+
+    def test_filename(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "observables.xml.gz")
+            writer.write_xml(self.observables, path, compress=True)
+
+            with gzip.open(path, "rb") as f:
+                parsed = builder.parse(f)
+
+            self.assertEqual(self.observables.to_dict(), parsed.to_dict())
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestObservablesWriter(unittest.TestCase):
+
+    def setUp(self):
+        f = File()
+        f.file_name = "malware.exe"
+        f.add_hash("d41d8cd98f00b204e9800998ecf8427e")
+
+        self.items = [
+            Observable(Address("192.168.1.1", Address.CAT_IPV4)),
+            Observable(f),
+            Observable(Address("10.0.0.1", Address.CAT_IPV4)),
+        ]
+
+    def _write(self, items, **kwargs):
+        out = BytesIO()
+        with writer.ObservablesWriter(out, **kwargs) as w:
+            for item in items:
+                w.write(item)
+        return out.getvalue()
+
+    def test_roundtrip(self):
+        xml = self._write(self.items)
+        parsed = builder.parse(BytesIO(xml))
+        self.assertEqual(Observables(self.items).to_dict(), parsed.to_dict())
+
+    def test_binding_parser(self):
+        # The output must also be readable by the generateDS bindings, and
+        # give the same document as Observables.to_xml().
+        for pretty in (True, False):
+            xml = self._write(self.items, pretty=pretty)
+            parsed = Observables.from_obj(core_binding.parse(BytesIO(xml)))
+            self.assertEqual(Observables(self.items).to_xml(), parsed.to_xml())
+
+    def test_empty(self):
+        parsed = builder.parse(BytesIO(self._write([])))
+        self.assertEqual(Observables().to_dict(), parsed.to_dict())
+
+    def test_not_pretty(self):
+        xml = self._write(self.items, pretty=False)
+        self.assertFalse(b"\n" in xml.strip())
+        parsed = builder.parse(BytesIO(xml))
+        self.assertEqual(Observables(self.items).to_dict(), parsed.to_dict())
+
+    def test_wraps_objects(self):
+        address = Address("10.0.0.1", Address.CAT_IPV4)
+        parsed = builder.parse(BytesIO(self._write([address])))
+        self.assertEqual("10.0.0.1", parsed.observables[0].object_.properties.address_value.value)
+
+    def test_flushes_each_observable(self):
+        out = BytesIO()
+        w = writer.ObservablesWriter(out)
+
+        self.assertTrue(b"<cybox:Observables " in out.getvalue())
+        self.assertFalse(b"AddressObj" in out.getvalue())
+
+        w.write(self.items[0])
+        self.assertTrue(out.getvalue().endswith(b"</cybox:Observable>\n"))
+        self.assertTrue(b"192.168.1.1" in out.getvalue())
+
+        w.close()
+        self.assertTrue(out.getvalue().endswith(b"</cybox:Observables>\n"))
+
+    def test_local_namespaces(self):
+        # Namespaces not declared on the root are declared by the
+        # observables that use them.
+        xml = self._write(self.items)
+        self.assertEqual(1, xml.count(b'xmlns:cybox="'))
+        self.assertEqual(2, xml.count(b'xmlns:AddressObj="'))
+        self.assertEqual(1, xml.count(b'xmlns:FileObj="'))
+
+    def test_namespace_dict(self):
+        ns = {"http://cybox.mitre.org/objects#AddressObject-2": "AddressObj"}
+        xml = self._write(self.items, namespace_dict=ns)
+        self.assertEqual(1, xml.count(b'xmlns:AddressObj="'))
+        self.assertEqual(1, xml.count(b"AddressObject-2 http://"))
+
+    def test_pools_and_source(self):
+        source = MeasureSource()
+        source.name = "scanner"
+
+        pools = Pools()
+        pools.object_pool = ObjectPool()
+        pools.object_pool.objects.append(Object(Address("10.1.1.1", Address.CAT_IPV4)))
+
+        out = BytesIO()
+        w = writer.ObservablesWriter(out, observable_package_source=source)
+        for item in self.items:
+            w.write(item)
+        w.close(pools)
+
+        expected = Observables(self.items)
+        expected.observable_package_source = source
+        expected.pools = pools
+
+        parsed = builder.parse(BytesIO(out.getvalue()))
+        self.assertEqual(expected.to_dict(), parsed.to_dict())
+
+    def test_closed(self):
+        w = writer.ObservablesWriter(BytesIO())
+        w.close()
+        w.close()
+        self.assertRaises(ValueError, w.write, self.items[0])
+
+    def test_gzip(self):
+        out = BytesIO()
+        with writer.ObservablesWriter(out, compress=True) as w:
+            for item in self.items:
+                w.write(item)
+
+        xml = gzip.GzipFile(fileobj=BytesIO(out.getvalue())).read()
+        self.assertEqual(self._write(self.items), xml)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,17 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import threading
 import unittest
 
 from cybox.common import DEFAULT_DELIM as DELIM
+from cybox.core import Object, RelatedObject
+from cybox.objects.file_object import File
 import cybox.utils
 
 
@@ -60,5 +68,400 @@ class TestDictCache(unittest.TestCase):
         d.clear()
         self.assertEqual(0, d.count())
 
+
+class TestCacheThreadSafety(unittest.TestCase):
+    THREADS = 16
+    ITEMS = 500
+
+    def setUp(self):
+        # Switch threads as often as possible to make races likely.
+        if hasattr(sys, "setswitchinterval"):
+            self._interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        if hasattr(sys, "setswitchinterval"):
+            sys.setswitchinterval(self._interval)
+
+    def _hammer(self, cache, put=None, get=None, same=None):
+        put = put or cache.put
+        get = get or cache.get
+        same = same or (lambda x, y: x is y)
+        results = [[] for _ in range(self.THREADS)]
+        errors = []
+        start = threading.Event()
+
+        def worker(n):
+            start.wait()
+            try:
+                for i in range(self.ITEMS):
+                    value = File()
+                    id_ = put(value)
+                    if not same(get(id_), value):
+                        errors.append(id_)
+                    results[n].append((id_, value))
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=worker, args=(n,))
+                   for n in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        start.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual([], errors)
+        ids = [id_ for r in results for id_, _ in r]
+        self.assertEqual(self.THREADS * self.ITEMS, len(set(ids)))
+        return results
+
+    def test_dict_cache(self):
+        cache = cybox.utils.DictCache()
+        self._hammer(cache)
+        self.assertEqual(self.THREADS * self.ITEMS, cache.count())
+
+    def test_weak_value_cache(self):
+        cache = cybox.utils.WeakValueCache()
+        results = self._hammer(cache)  # keeps the values alive
+        self.assertEqual(self.THREADS * self.ITEMS, cache.count())
+        for id_, value in (x for r in results for x in r):
+            self.assertTrue(cache.get(id_) is value)
+
+    def test_lru_cache(self):
+        cache = cybox.utils.LRUCache(max_entries=self.THREADS * self.ITEMS)
+        self._hammer(cache)
+        self.assertEqual(self.THREADS * self.ITEMS, cache.count())
+        self.assertEqual(0, cache.evictions)
+
+    def test_sqlite_cache(self):
+        cache = cybox.utils.SQLiteCache(front_size=self.ITEMS, batch_size=100)
+        same = lambda x, y: x.to_dict() == y.to_dict()
+        self._hammer(cache, same=same)
+        self.assertEqual(self.THREADS * self.ITEMS, cache.count())
+
+    def test_global_cache(self):
+        cybox.utils.set_global_cache(None)
+        try:
+            cache = cybox.utils.caches._get_cache()
+            self._hammer(cache, cybox.utils.cache_put, cybox.utils.cache_get)
+            self.assertEqual(self.THREADS * self.ITEMS, cache.count())
+        finally:
+            cybox.utils.set_global_cache(None)
+
+
+class TestWeakValueCache(unittest.TestCase):
+
+    def test_live_objects_retrieved(self):
+        c = cybox.utils.WeakValueCache()
+        obj = Object(id_="example:Object-1")
+        c.put(obj)
+
+        self.assertEqual(1, c.count())
+        self.assertTrue(c.get("example:Object-1") is obj)
+
+    def test_unreferenced_objects_dropped(self):
+        c = cybox.utils.WeakValueCache()
+        c.put(File(), "example:File-1")
+        gc.collect()
+
+        self.assertEqual(0, c.count())
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "example:File-1")
+
+    def test_idref_resolution(self):
+        cybox.utils.set_global_cache(cybox.utils.WeakValueCache())
+        try:
+            f = File()
+            f.file_name = "foo.exe"
+            obj = Object(f, id_="example:File-1")
+
+            related = RelatedObject(idref="example:File-1")
+            self.assertTrue(related.get_properties() is f)
+
+            del f, obj, related
+            gc.collect()
+            self.assertEqual(0, cybox.utils.cache_count())
+        finally:
+            cybox.utils.set_global_cache(None)
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_max_entries(self):
+        c = cybox.utils.LRUCache(max_entries=2)
+        c.put("a", "1")
+        c.put("b", "2")
+        c.put("c", "3")
+
+        self.assertEqual(2, c.count())
+        self.assertEqual(1, c.evictions)
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "1")
+        self.assertEqual("c", c.get("3"))
+
+    def test_least_recently_used_evicted(self):
+        c = cybox.utils.LRUCache(max_entries=2)
+        c.put("a", "1")
+        c.put("b", "2")
+        c.get("1")
+        c.put("c", "3")
+
+        self.assertEqual("a", c.get("1"))
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "2")
+
+    def test_max_bytes(self):
+        c = cybox.utils.LRUCache(max_bytes=10, sizeof=len)
+        c.put("abcd", "1")
+        c.put("efgh", "2")
+        self.assertEqual(8, c.size)
+
+        c.put("ijkl", "3")
+        self.assertEqual(8, c.size)
+        self.assertEqual(2, c.count())
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "1")
+
+    def test_replace_existing(self):
+        c = cybox.utils.LRUCache(max_bytes=10, sizeof=len)
+        c.put("abcd", "1")
+        c.put("ef", "1")
+        self.assertEqual(2, c.size)
+        self.assertEqual("ef", c.get("1"))
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        c = cybox.utils.LRUCache(ttl=10, timer=timer)
+        c.put("a", "1")
+
+        timer.now = 5
+        self.assertEqual("a", c.get("1"))
+
+        timer.now = 10
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "1")
+        self.assertEqual(0, c.count())
+        self.assertEqual(1, c.evictions)
+
+    def test_counters(self):
+        c = cybox.utils.LRUCache()
+        c.put("a", "1")
+        c.get("1")
+        c.get("1")
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "2")
+
+        self.assertEqual(2, c.hits)
+        self.assertEqual(1, c.misses)
+        self.assertEqual(0, c.evictions)
+
+    def test_id_generation(self):
+        c = cybox.utils.LRUCache()
+        self.assertEqual(0, c.put("a"))
+        self.assertEqual(1, c.put("b"))
+
+    def test_invalid_limits(self):
+        self.assertRaises(ValueError, cybox.utils.LRUCache, max_entries=0)
+        self.assertRaises(ValueError, cybox.utils.LRUCache, max_bytes=0)
+
+
+class TestGlobalCache(unittest.TestCase):
+
+    def tearDown(self):
+        cybox.utils.set_global_cache(None)
+
+    def test_set_global_cache(self):
+        c = cybox.utils.LRUCache(max_entries=1)
+        cybox.utils.set_global_cache(c)
+
+        cybox.utils.cache_put("a", "1")
+        cybox.utils.cache_put("b", "2")
+        self.assertEqual(1, cybox.utils.cache_count())
+        self.assertEqual("b", cybox.utils.cache_get("2"))
+        self.assertEqual(1, c.hits)
+
+    def test_reset_global_cache(self):
+        cybox.utils.set_global_cache(cybox.utils.LRUCache())
+        cybox.utils.set_global_cache(None)
+        self.assertTrue(isinstance(cybox.utils.caches._get_cache(),
+                                   cybox.utils.DictCache))
+
+    def test_set_global_cache_type(self):
+        self.assertRaises(TypeError, cybox.utils.set_global_cache, {})
+
+
+class TestSQLiteCache(unittest.TestCase):
+
+    def _file(self, name):
+        f = File()
+        f.file_name = name
+        return Object(f, id_="example:File-%s" % name)
+
+    def test_evicted_items_rehydrated(self):
+        c = cybox.utils.SQLiteCache(front_size=2, batch_size=1)
+        objs = [self._file(str(i)) for i in range(5)]
+        for o in objs:
+            c.put(o)
+
+        first = c.get("example:File-0")
+        self.assertFalse(first is objs[0])
+        self.assertEqual(objs[0].to_dict(), first.to_dict())
+        self.assertEqual("0", first.properties.file_name.value)
+
+    def test_changes_before_eviction_kept(self):
+        c = cybox.utils.SQLiteCache(front_size=1, batch_size=1)
+        obj = self._file("a")
+        c.put(obj)
+        obj.properties.file_name = "b"
+        c.put(self._file("c"))
+
+        self.assertEqual("b", c.get("example:File-a").properties.file_name.value)
+
+    def test_pending_items_returned(self):
+        c = cybox.utils.SQLiteCache(front_size=1, batch_size=10)
+        obj = self._file("a")
+        c.put(obj)
+        c.put(self._file("b"))
+        self.assertTrue(c.get("example:File-a") is obj)
+
+    def test_plain_values(self):
+        c = cybox.utils.SQLiteCache(front_size=1, batch_size=1)
+        self.assertEqual(0, c.put({"a": 1}))
+        self.assertEqual(1, c.put("b"))
+        self.assertEqual(2, c.put("c"))
+        self.assertEqual({"a": 1}, c.get(0))
+        self.assertEqual("b", c.get(1))
+        self.assertEqual(3, c.count())
+
+    def test_compress(self):
+        c = cybox.utils.SQLiteCache(front_size=1, batch_size=1, compress=True)
+        c.put(self._file("a"))
+        c.put(self._file("b"))
+        self.assertEqual("a", c.get("example:File-a").properties.file_name.value)
+
+    def test_rehydration_does_not_write_back(self):
+        c = cybox.utils.SQLiteCache(front_size=1, batch_size=1)
+        with cybox.utils.cache_scope(c):
+            self._file("a")
+            self._file("b")
+            self.assertEqual(2, c.count())
+            cybox.utils.cache_get("example:File-a")
+            self.assertEqual(set(), c._dirty)
+
+    def test_idref_resolution(self):
+        c = cybox.utils.SQLiteCache(front_size=1, batch_size=1)
+        with cybox.utils.cache_scope(c):
+            self._file("a")
+            self._file("b")
+            related = RelatedObject(idref="example:File-a")
+            self.assertEqual("a", related.get_properties().file_name.value)
+
+    def test_miss_and_clear(self):
+        c = cybox.utils.SQLiteCache()
+        self.assertRaises(cybox.utils.CacheMiss, c.get, "foo")
+        c.put("a")
+        c.clear()
+        self.assertEqual(0, c.count())
+
+    def test_persistent_file(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "cache.db")
+            c = cybox.utils.SQLiteCache(path)
+            c.put(self._file("a"))
+            c.close()
+
+            c = cybox.utils.SQLiteCache(path)
+            self.assertEqual("a", c.get("example:File-a").properties.file_name.value)
+            c.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestCacheScope(unittest.TestCase):
+
+    def setUp(self):
+        cybox.utils.cache_clear()
+
+    def test_scope_isolates_objects(self):
+        with cybox.utils.cache_scope() as cache:
+            Object(id_="example:Object-1")
+            self.assertEqual(1, cache.count())
+            self.assertEqual(1, cybox.utils.cache_count())
+
+        self.assertEqual(0, cybox.utils.cache_count())
+        self.assertRaises(cybox.utils.CacheMiss, cybox.utils.cache_get,
+                          "example:Object-1")
+
+    def test_idref_resolution_in_scope(self):
+        f = File()
+        with cybox.utils.cache_scope():
+            Object(f, id_="example:File-1")
+            related = RelatedObject(idref="example:File-1")
+            self.assertTrue(related.get_properties() is f)
+
+    def test_explicit_cache(self):
+        cache = cybox.utils.LRUCache()
+        with cybox.utils.cache_scope(cache) as scoped:
+            self.assertTrue(scoped is cache)
+            cybox.utils.cache_put("a", "1")
+        self.assertEqual("a", cache.get("1"))
+
+    def test_nested_scopes(self):
+        with cybox.utils.cache_scope() as outer:
+            cybox.utils.cache_put("a", "1")
+            with cybox.utils.cache_scope() as inner:
+                cybox.utils.cache_put("b", "2")
+                self.assertRaises(cybox.utils.CacheMiss,
+                                  cybox.utils.cache_get, "1")
+            self.assertEqual("a", cybox.utils.cache_get("1"))
+            self.assertEqual(1, outer.count())
+            self.assertEqual(1, inner.count())
+
+    def test_restored_after_exception(self):
+        try:
+            with cybox.utils.cache_scope():
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+        cybox.utils.cache_put("a", "1")
+        self.assertEqual("a", cybox.utils.caches._get_cache().get("1"))
+
+    def test_scope_is_thread_local(self):
+        seen = []
+
+        def worker():
+            seen.append(cybox.utils.caches._get_cache())
+
+        with cybox.utils.cache_scope() as cache:
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join()
+
+        self.assertFalse(seen[0] is cache)
+
+    def test_invalid_cache(self):
+        def enter():
+            with cybox.utils.cache_scope({}):
+                pass
+        self.assertRaises(TypeError, enter)
+
+
+class TestCacheExports(unittest.TestCase):
+
+    def test_public_names(self):
+        for name in cybox.utils.caches.__all__:
+            self.assertTrue(getattr(cybox.utils, name) is
+                            getattr(cybox.utils.caches, name))
+
+    def test_modules_not_exported(self):
+        for name in ("json", "sys", "time", "zlib", "threading",
+                     "contextvars", "sqlite3", "weakref"):
+            self.assertFalse(hasattr(cybox.utils, name), name)
+
+
 if __name__ == "__main__":
     unittest.main()
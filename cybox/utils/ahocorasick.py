@@ -0,0 +1,129 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+An Aho-Corasick automaton, for finding many words in a text at once.
+
+Searching a text for each of `n` words separately takes time proportional to
+`n` times the length of the text. An :class:`Automaton` holding all the words
+finds every occurrence of every word in a single pass over the text::
+
+    automaton = Automaton()
+    automaton.add("evil", "pattern-1")
+    automaton.add("vil.exe", "pattern-2")
+
+    list(automaton.iter("c:\\\\evil.exe"))   # [(6, 'pattern-1'), (10, 'pattern-2')]
+
+Each word is added with a value, which is what the searches return. The
+automaton is built when it is first searched after words are added.
+"""
+
+
+class Automaton(object):
+    """An Aho-Corasick automaton over the words added to it."""
+
+    def __init__(self):
+        # The trie: the transitions of each node, and the values of the
+        # words which end at the node.
+        self._goto = [{}]
+        self._values = [[]]
+        self._count = 0
+
+        # The longest proper suffix of each node that is also in the trie,
+        # and the longest proper suffix that is a (non-empty) word, or 0 if
+        # there is none. Following the latter from a node visits every word
+        # that ends there. Set by _build().
+        self._fail = None
+        self._output = None
+
+    def __len__(self):
+        """The number of words in the automaton."""
+        return self._count
+
+    def add(self, word, value):
+        """Add `word`, which is reported by searches as `value`."""
+        goto = self._goto
+        node = 0
+
+        for ch in word:
+            next_node = goto[node].get(ch)
+            if next_node is None:
+                next_node = len(goto)
+                goto[node][ch] = next_node
+                goto.append({})
+                self._values.append([])
+            node = next_node
+
+        self._values[node].append(value)
+        self._count += 1
+        self._fail = self._output = None
+
+    def _build(self):
+        goto = self._goto
+        values = self._values
+        fail = [0] * len(goto)
+        # Empty words (the root) are found by prefixes(), but not by iter(),
+        # so no node links to the root.
+        output = [0] * len(goto)
+
+        # Breadth-first, so that the suffix of a node is done before it.
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, child in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                suffix = fail[child] = goto[state].get(ch, 0)
+                output[child] = suffix if values[suffix] else output[suffix]
+                queue.append(child)
+
+        self._fail = fail
+        self._output = output
+
+    def iter(self, text):
+        """Yield an ``(end, value)`` tuple for every occurrence of every
+        word in `text`, where `end` is the index of the last character of
+        the occurrence. Words which are empty are not reported.
+        """
+        if self._fail is None:
+            self._build()
+
+        goto = self._goto
+        values = self._values
+        fail = self._fail
+        output = self._output
+        node = 0
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            word = node if values[node] else output[node]
+            while word:
+                for value in values[word]:
+                    yield i, value
+                word = output[word]
+
+    def values(self, text):
+        """Return the set of the values of the words found in `text`."""
+        found = set()
+        for _, value in self.iter(text):
+            found.add(value)
+        return found
+
+    def prefixes(self, text):
+        """Return the set of the values of the words which `text` starts
+        with, including the empty word.
+        """
+        goto = self._goto
+        found = set(self._values[0])
+        node = 0
+
+        for ch in text:
+            node = goto[node].get(ch)
+            if node is None:
+                break
+            found.update(self._values[node])
+
+        return found
@@ -0,0 +1,350 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Build python-cybox entities directly from lxml elements.
+
+The usual parse path converts an lxml tree into generateDS binding objects
+(``build()``) and then converts those into entities (``from_obj()``), so every
+document is held in memory as two complete object graphs. The functions in
+this module skip the binding objects: each element is wrapped in a small view
+which answers the attribute lookups that ``from_obj()`` makes, using the
+``TypedField`` definitions of the entity being built to decide which children
+are entities, which are plain text and which are lists.
+
+Because the entities' own ``from_obj()`` methods do the work, the result is the
+same as parsing with the bindings.
+"""
+
+import inspect
+
+from mixbox import entities
+from mixbox import xml
+from mixbox.vendor import six
+
+_XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+
+# The bindings convert these attributes from their string form when building.
+# Everything else is kept as a string. These tables (and the ones for child
+# elements below) are checked against the bindings' build methods by
+# cybox/test/utils/builder_test.py, so regenerating the bindings cannot
+# silently leave them out of date.
+_BOOLEAN_ATTRIBUTES = frozenset([
+    "ACCESS_ALL", "ACCESS_ATRIB", "ACCESS_CREATE", "ACCESS_DELETE",
+    "ACCESS_EXEC", "ACCESS_PERM", "ACCESS_READ", "ACCESS_WRITE", "ack",
+    "addr_config_flag", "appears_random", "aslr_enabled", "cwr",
+    "delay_load", "dep_enabled", "disabled", "ece", "enabled", "encrypted",
+    "fin", "fully_qualified", "gexec", "gread", "gwrite", "has_changed",
+    "hooked", "image_is_compressed", "initially_visible",
+    "is_autoconfigure_address", "is_blocking", "is_case_sensitive",
+    "is_compressed", "is_defanged", "is_destination", "is_domain_name",
+    "is_encrypted", "is_hidden", "is_immortal", "is_injected", "is_ipv6",
+    "is_listening", "is_loopback", "is_mapped", "is_masqueraded",
+    "is_mounted", "is_obfuscated", "is_packed", "is_premium", "is_protected",
+    "is_publish", "is_source", "is_spoofed", "is_volatile", "link_flag",
+    "locked_out", "managed_address_config_flag", "named", "negate", "ns",
+    "oexec", "optimized", "oread", "other_config_flag", "override_flag",
+    "owrite", "password_required", "psh", "router_flag", "rst",
+    "service_dll_signature_exists", "service_dll_signature_verified", "sgid",
+    "signature_exists", "signature_verified", "solicited_flag", "successful",
+    "suid", "suspected_malicious", "syn", "tls_used", "trend", "uexec",
+    "uread", "urg", "uwrite",
+])
+_INTEGER_ATTRIBUTES = frozenset(["ordinal_position", "sighting_count"])
+_FLOAT_ATTRIBUTES = frozenset(["rate"])
+
+# (binding class name, attribute) pairs which are exceptions to the above.
+_STRING_ATTRIBUTES = frozenset([("FrequencyType", "trend")])
+
+# Simple-content child elements which the bindings convert. Children of other
+# names (and all children with an entity type) are handled by the entity's
+# TypedField.
+_BOOLEAN_CHILDREN = frozenset([
+    "Address_Mask_Reply", "Address_Mask_Request", "Address_Unreachable",
+    "Beyond_Scope", "Comm_Prohibited",
+    "Communication_Administratively_Prohibited", "Destination_Host_Unknown",
+    "Destination_Host_Unreachable", "Destination_Network_Unknown",
+    "Destination_Network_Unreachable", "Destination_Port_Unreachable",
+    "Destination_Protocol_Unreachable", "Echo_Reply", "Echo_Request",
+    "Enterprise_Bit", "Erroneous_Header_Field", "Frag_Reassembly_Time_Exceeded",
+    "Fragment_Reassem_Time_Exceeded", "Fragmentation_Required",
+    "Full_Control", "Hop_Limit_Exceeded", "Host_Administratively_Prohibited",
+    "Host_Precedence_Violation", "Host_Redirect", "Host_Unreachable_For_TOS",
+    "IP_MULTICAST_LOOP", "Modify", "Network_Administratively_Prohibited",
+    "Network_Redirect", "Network_Unreachable_For_TOS", "No_Route",
+    "Option_Enterprise_Bit", "Outbound_Packet_Forward_Success",
+    "Outbound_Packet_no_Route", "Packet_Too_Big", "Port_Unreachable",
+    "Precedence_Cutoff_In_Effect", "Read", "Read_And_Execute",
+    "Reject_Route", "SO_BROADCAST", "SO_CONDITIONAL_ACCEPT", "SO_DEBUG",
+    "SO_DONTLINGER", "SO_DONTROUTE", "SO_KEEPALIVE", "SO_OOBINLINE",
+    "SO_REUSEADDR", "Scope_Enterprise_Bit", "Source_Host_Isolated",
+    "Source_Quench", "Source_Route_Failed", "Src_Addr_Failed_Policy",
+    "TCP_NODELAY", "TTL_Exceeded_In_Transit", "Timestamp", "Timestamp_Reply",
+    "ToS_Host_Redirect", "ToS_Network_Redirect", "Unrecognized_IPv6_Option",
+    "Unrecognized_Next_Header_Type", "Write",
+])
+_INTEGER_CHILDREN = frozenset(["Error_Count"])
+
+# XML attributes which the bindings store under a different name.
+_ATTRIBUTE_NAMES = {
+    _XSI_TYPE: ("xsi_type", "extensiontype_"),
+    "class": ("classxx",),
+    "type": ("type_",),
+}
+
+# Elements which the bindings store under the name of another element.
+_SUBSTITUTES = {"VersionInfoResource": "Resource"}
+
+# Per-class lookup tables, built on first use.
+_FIELDS = {}
+_MISSING = {}
+
+
+def _parse_boolean(value):
+    if value in ("true", "1"):
+        return True
+    elif value in ("false", "0"):
+        return False
+    raise ValueError("Invalid boolean value: %s" % value)
+
+
+def _localname(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _all_text(element):
+    """Return the text content of `element` the same way the bindings'
+    ``get_all_text_()`` does.
+    """
+    text = element.text
+    if text is None:
+        return None
+
+    for child in element:
+        if child.tail is not None:
+            text += child.tail
+
+    return text
+
+
+def _fields(klass):
+    """Return a dictionary of binding attribute name => TypedField for
+    `klass`.
+    """
+    try:
+        return _FIELDS[klass]
+    except KeyError:
+        pass
+
+    if klass is None or not hasattr(klass, "typed_fields"):
+        fields = {}
+    else:
+        fields = dict((f.name, f) for f in klass.typed_fields())
+
+    _FIELDS[klass] = fields
+    return fields
+
+
+def _missing(klass):
+    """Return the values a binding object for `klass` has for attributes and
+    children which are not in the document.
+
+    These are the defaults from the binding class constructor (for example, a
+    ``StringObjectPropertyType`` has a ``datatype`` of ``"string"``), an empty
+    sequence for ``multiple`` fields and ``None`` for everything else.
+    """
+    try:
+        return _MISSING[klass]
+    except KeyError:
+        pass
+
+    missing = {}
+
+    for name, field in six.iteritems(_fields(klass)):
+        missing[name] = () if field.multiple else None
+
+    binding_class = getattr(klass, "_binding_class", None)
+
+    if binding_class is not None:
+        if six.PY2:
+            spec = inspect.getargspec(binding_class.__init__)
+        else:
+            spec = inspect.getfullargspec(binding_class.__init__)
+
+        if spec.defaults:
+            names = spec.args[-len(spec.defaults):]
+            for name, value in zip(names, spec.defaults):
+                if value is not None:
+                    missing[name] = value
+
+    # The text content is always read from the element.
+    missing.pop("valueOf_", None)
+
+    _MISSING[klass] = missing
+    return missing
+
+
+def _is_element_type(field):
+    """Return True if values for `field` are built from elements rather than
+    from text.
+    """
+    if field.factory:
+        return True
+
+    type_ = field.type_
+    return getattr(type_, "_binding_class", None) is not None
+
+
+class _ElementView(object):
+    """Presents an lxml element with the attributes of the generateDS binding
+    object which would have been built from it.
+
+    XML attributes (and the values of anything missing from the element) are
+    stored on the instance up front, so they are read as quickly as binding
+    attributes. Child elements and text are only converted when they are
+    accessed, and are not kept: ``from_obj()`` reads each value once, and
+    holding on to child views would keep the whole view tree alive until the
+    build finishes.
+
+    Attributes can be assigned, since some ``from_obj()`` implementations
+    modify the object they are given.
+
+    Args:
+        element: The lxml element.
+        klass: The Entity class being built from `element`. It is used to
+            decide how to present child elements and to find the default
+            values of attributes which are missing. May be ``None``.
+        factory: An optional EntityFactory used to find the concrete class
+            for `element`.
+    """
+
+    def __init__(self, element, klass=None, factory=None):
+        self._element = element
+        self._klass = klass
+
+        self._children = children = {}
+        for child in element:
+            if isinstance(child.tag, six.string_types):
+                tag = _localname(child.tag)
+                tag = _SUBSTITUTES.get(tag, tag)
+                children.setdefault(tag, []).append(child)
+
+        attributes = {}
+        for key, value in element.attrib.items():
+            for name in _ATTRIBUTE_NAMES.get(key, (key,)):
+                attributes[name] = self._convert_attribute(key, value)
+
+        self.__dict__.update(attributes)
+
+        # Resolve the concrete class (e.g., from the xsi:type) so that its
+        # defaults are used.
+        if factory is not None:
+            try:
+                self._klass = factory.entity_class(factory.objkey(self))
+            except Exception:
+                pass
+
+        values = dict(_missing(self._klass))
+        for name in children:
+            values.pop(name, None)
+        values.update(attributes)
+
+        self.__dict__.update(values)
+
+    def _convert_attribute(self, name, value):
+        if name in _BOOLEAN_ATTRIBUTES:
+            binding_class = getattr(self._klass, "_binding_class", None)
+            key = (getattr(binding_class, "__name__", None), name)
+            if key in _STRING_ATTRIBUTES:
+                return value
+            return _parse_boolean(value)
+        elif name in _INTEGER_ATTRIBUTES:
+            return int(value)
+        elif name in _FLOAT_ATTRIBUTES:
+            return float(value)
+        return value
+
+    def _convert_text(self, name, child):
+        text = child.text
+        if text is None:
+            return None
+        elif name in _BOOLEAN_CHILDREN:
+            return _parse_boolean(text)
+        elif name in _INTEGER_CHILDREN:
+            return int(text)
+        return text
+
+    def _child_view(self, field, child):
+        return _ElementView(child, field.type_, field.factory)
+
+    def __getattr__(self, name):
+        # Only called for child elements, text, and names unknown to klass.
+        if name.startswith("__"):
+            raise AttributeError(name)
+        elif name == "valueOf_":
+            return _all_text(self._element)
+
+        children = self._children.get(name)
+        if not children:
+            return None
+
+        field = _fields(self._klass).get(name)
+
+        if field is None:
+            # Only read by a custom from_obj(), which will turn it into an
+            # entity itself.
+            return _ElementView(children[-1])
+        elif _is_element_type(field):
+            if field.multiple:
+                return [self._child_view(field, x) for x in children]
+            return self._child_view(field, children[-1])
+        elif field.multiple:
+            return [self._convert_text(name, x) for x in children]
+        else:
+            return self._convert_text(name, children[-1])
+
+    def __repr__(self):
+        return "<_ElementView %s>" % self._element.tag
+
+
+def from_element(klass, element):
+    """Build an Entity from an lxml element without creating binding objects.
+
+    Args:
+        klass: The :class:`mixbox.entities.Entity` subclass (or
+            :class:`mixbox.entities.EntityFactory` subclass) to build.
+        element: An ``lxml.etree._Element`` for `klass`.
+
+    Returns:
+        An instance of `klass`, or ``None`` if `element` is ``None``.
+    """
+    if element is None:
+        return None
+
+    if isinstance(klass, type) and issubclass(klass, entities.EntityFactory):
+        view = _ElementView(element, factory=klass)
+    else:
+        view = _ElementView(element, klass)
+
+    return klass.from_obj(view)
+
+
+def parse(doc, klass=None):
+    """Parse a CybOX XML document directly into entities.
+
+    This is equivalent to ``klass.from_obj(klass._binding.parse(doc))`` but
+    does not build the intermediate generateDS binding objects.
+
+    Args:
+        doc: A filename, file-like object, or lxml element or tree.
+        klass: The Entity class of the document root. Defaults to
+            :class:`cybox.core.Observables`.
+
+    Returns:
+        An instance of `klass`.
+    """
+    if klass is None:
+        from cybox.core import Observables
+        klass = Observables
+
+    return from_element(klass, xml.get_etree_root(doc))
@@ -1,6 +1,50 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+"""Caches used to resolve references between Objects.
+
+Concurrency
+-----------
+The :class:`Cache` implementations in this module are safe to share between
+threads:
+
+- :meth:`Cache.put` is atomic. In particular, two threads saving values
+  without an ``id_`` never receive the same generated id.
+- :meth:`Cache.get` and :meth:`Cache.count` on :class:`DictCache` and
+  :class:`WeakValueCache` do not take a lock. :class:`LRUCache` and
+  :class:`SQLiteCache` update their recency order on every lookup, so all of
+  their methods are serialized.
+- :meth:`Cache.clear` may run concurrently with other calls. Lookups which
+  overlap a ``clear()`` may or may not see the old items.
+
+Caches are not shared between processes: every process has its own global
+cache, and generated integer ids are only unique within a single cache.
+Values passed between processes (for example, with ``multiprocessing``)
+should carry their own ``id_``. Use :func:`cache_scope` to give each
+document (or each thread) its own cache.
+"""
+
+import collections
+import contextlib
+import importlib
+import json
+import sys
+import threading
+import time
+import weakref
+import zlib
+
+try:
+    import contextvars
+except ImportError:  # Python < 3.7
+    contextvars = None
+
+__all__ = [
+    "CacheMiss", "Cache", "DictCache", "WeakValueCache", "LRUCache",
+    "SQLiteCache", "cache_scope", "set_global_cache", "cache_put",
+    "cache_get", "cache_count", "cache_clear",
+]
+
 
 class CacheMiss(Exception):
     """Item was not found in a cache."""
@@ -56,6 +100,12 @@ class DictCache(Cache):
     def __init__(self):
         self.__inner = {}
         self._next_id = 0
+        self._lock = threading.Lock()
+
+    def put(self, value, id_=None):
+        # Generating an id and saving under it must happen atomically.
+        with self._lock:
+            return super(DictCache, self).put(value, id_)
 
     def _generate_id(self):
         # Find and unused integer ID. Note that this might not
@@ -82,13 +132,396 @@ class DictCache(Cache):
         # No need to reset _next_id
 
 
+class WeakValueCache(Cache):
+    """A cache which only holds weak references to its values.
+
+    Items stay in the cache only as long as something else in the
+    application holds a reference to them, so Objects from documents which
+    are no longer in use are garbage collected without needing to call
+    :meth:`clear`. Values must support weak references (e.g., Entity
+    instances); built-in types such as ``str`` and ``int`` do not.
+    """
+
+    def __init__(self):
+        self.__inner = weakref.WeakValueDictionary()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def put(self, value, id_=None):
+        with self._lock:
+            return super(WeakValueCache, self).put(value, id_)
+
+    def _generate_id(self):
+        while self._next_id in self.__inner:
+            self._next_id += 1
+        return self._next_id
+
+    def _save(self, value, id_):
+        self.__inner[id_] = value
+        return id_
+
+    def get(self, id_):
+        try:
+            return self.__inner[id_]
+        except KeyError:
+            raise CacheMiss
+
+    def count(self):
+        return len(self.__inner)
+
+    def clear(self):
+        self.__inner = weakref.WeakValueDictionary()
+
+
+class LRUCache(Cache):
+    """A size-bounded cache which discards the least recently used items.
+
+    Arguments:
+    - max_entries: the maximum number of items to keep. ``None`` means no
+      limit.
+    - max_bytes: the approximate maximum total size of the items, as measured
+      by `sizeof`. ``None`` means no limit.
+    - ttl: the number of seconds an item stays valid after it is saved.
+      ``None`` means items never expire.
+    - sizeof: a function returning the size of a value in bytes. Defaults to
+      ``sys.getsizeof``, which does not follow references, so the byte limit
+      should be treated as a rough guide.
+    - timer: a function returning the current time in seconds. Defaults to
+      ``time.time``.
+
+    The `hits`, `misses` and `evictions` attributes count cache lookups that
+    succeeded, lookups that failed, and items that were dropped (because a
+    limit was reached or because they expired).
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None,
+                 sizeof=sys.getsizeof, timer=time.time):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._timer = timer
+
+        # Maps id_ -> (value, size, expiry), least recently used first.
+        self.__inner = collections.OrderedDict()
+        self._next_id = 0
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Lookups reorder the items, so every operation needs the lock.
+        self._lock = threading.RLock()
+
+    @property
+    def size(self):
+        """The approximate total size in bytes of the items in the cache."""
+        return self._bytes
+
+    def _generate_id(self):
+        while self._next_id in self.__inner:
+            self._next_id += 1
+        return self._next_id
+
+    def _remove(self, id_):
+        _, size, _ = self.__inner.pop(id_)
+        self._bytes -= size
+
+    def _evict(self):
+        """Drop least recently used items until all limits are satisfied."""
+        while self.__inner and (
+                (self.max_entries is not None and
+                 len(self.__inner) > self.max_entries) or
+                (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, size, _) = self.__inner.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def _is_expired(self, expiry):
+        return expiry is not None and expiry <= self._timer()
+
+    def _save(self, value, id_):
+        if id_ in self.__inner:
+            self._remove(id_)
+
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        expiry = self._timer() + self.ttl if self.ttl is not None else None
+
+        self.__inner[id_] = (value, size, expiry)
+        self._bytes += size
+        self._evict()
+        return id_
+
+    def put(self, value, id_=None):
+        with self._lock:
+            return super(LRUCache, self).put(value, id_)
+
+    def get(self, id_):
+        with self._lock:
+            return self._get(id_)
+
+    def _get(self, id_):
+        try:
+            value, size, expiry = self.__inner.pop(id_)
+        except KeyError:
+            self.misses += 1
+            raise CacheMiss
+
+        if self._is_expired(expiry):
+            self._bytes -= size
+            self.evictions += 1
+            self.misses += 1
+            raise CacheMiss
+
+        # Re-insert to mark this item as the most recently used.
+        self.__inner[id_] = (value, size, expiry)
+        self.hits += 1
+        return value
+
+    def count(self):
+        with self._lock:
+            expired = [k for k, (_, _, expiry) in self.__inner.items()
+                       if self._is_expired(expiry)]
+            for id_ in expired:
+                self._remove(id_)
+                self.evictions += 1
+            return len(self.__inner)
+
+    def clear(self):
+        with self._lock:
+            self.__inner = collections.OrderedDict()
+            self._bytes = 0
+
+
+class SQLiteCache(Cache):
+    """A cache which keeps its items in a SQLite database.
+
+    Items are held in memory in a small least-recently-used "front" cache and
+    written to the database in batches once they fall out of it, so a cache
+    can hold far more Objects than fit in RAM. Items read back from the
+    database are rebuilt on demand by :meth:`get`.
+
+    Entities are stored as their ``to_dict()`` representation and rebuilt
+    with ``from_dict()`` on the same class; other values must be JSON
+    serializable. Since an item is serialized when it is written (not when it
+    is saved), changes made to it while it is still in memory are kept. Call
+    :meth:`flush` to write every pending item, for example before another
+    process reads the database.
+
+    Arguments:
+    - path: the database filename. Defaults to an in-memory database.
+    - front_size: the number of items to keep in memory.
+    - batch_size: the number of evicted items to collect before writing
+      them to the database in one transaction.
+    - compress: if ``True``, store items as zlib-compressed JSON.
+    """
+
+    def __init__(self, path=":memory:", front_size=1000, batch_size=500,
+                 compress=False):
+        import sqlite3
+
+        if front_size < 1:
+            raise ValueError("front_size must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.front_size = front_size
+        self.batch_size = batch_size
+        self.compress = compress
+
+        # The id column has no declared type so that integer and string ids
+        # are stored (and looked up) as they are given.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cybox_cache "
+            "(id PRIMARY KEY, type TEXT, data BLOB)"
+        )
+        self._conn.commit()
+
+        self._front = collections.OrderedDict()  # id_ -> value, LRU first
+        self._dirty = set()      # ids in _front not yet written
+        self._pending = {}       # ids evicted from _front not yet written
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def _serialize(self, value):
+        if hasattr(value, "to_dict") and hasattr(value, "from_dict"):
+            klass = value.__class__
+            type_ = "%s.%s" % (klass.__module__, klass.__name__)
+            data = value.to_dict()
+        else:
+            type_ = None
+            data = value
+
+        data = json.dumps(data).encode("utf-8")
+        if self.compress:
+            data = zlib.compress(data)
+        return type_, data
+
+    def _deserialize(self, type_, data):
+        data = bytes(data)
+        if self.compress:
+            data = zlib.decompress(data)
+        data = json.loads(data.decode("utf-8"))
+
+        if type_ is None:
+            return data
+
+        module, class_name = type_.rsplit(".", 1)
+        klass = getattr(importlib.import_module(module), class_name)
+
+        # Objects put themselves in the current cache when their id is set.
+        # They are already stored here, so don't let rebuilding them write
+        # them (or any nested Objects) back.
+        with cache_scope():
+            return klass.from_dict(data)
+
+    def _write(self, items):
+        rows = [(id_,) + self._serialize(value) for id_, value in items]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cybox_cache (id, type, data) "
+                "VALUES (?, ?, ?)", rows
+            )
+
+    def _write_pending(self):
+        if self._pending:
+            self._write(self._pending.items())
+            self._pending = {}
+
+    def _add_to_front(self, id_, value, dirty):
+        self._front[id_] = value
+        if dirty:
+            self._dirty.add(id_)
+
+        while len(self._front) > self.front_size:
+            old_id, old_value = self._front.popitem(last=False)
+            if old_id in self._dirty:
+                self._dirty.discard(old_id)
+                self._pending[old_id] = old_value
+
+        if len(self._pending) >= self.batch_size:
+            self._write_pending()
+
+    def _in_database(self, id_):
+        cursor = self._conn.execute(
+            "SELECT 1 FROM cybox_cache WHERE id = ?", (id_,))
+        return cursor.fetchone() is not None
+
+    def _generate_id(self):
+        while (self._next_id in self._front or
+               self._next_id in self._pending or
+               self._in_database(self._next_id)):
+            self._next_id += 1
+        return self._next_id
+
+    def _save(self, value, id_):
+        self._front.pop(id_, None)
+        self._pending.pop(id_, None)
+        self._add_to_front(id_, value, dirty=True)
+        return id_
+
+    def put(self, value, id_=None):
+        with self._lock:
+            return super(SQLiteCache, self).put(value, id_)
+
+    def get(self, id_):
+        with self._lock:
+            if id_ in self._front:
+                value = self._front.pop(id_)
+                self._front[id_] = value
+                return value
+
+            if id_ in self._pending:
+                value = self._pending.pop(id_)
+                self._add_to_front(id_, value, dirty=True)
+                return value
+
+            row = self._conn.execute(
+                "SELECT type, data FROM cybox_cache WHERE id = ?", (id_,)
+            ).fetchone()
+            if row is None:
+                raise CacheMiss
+
+            value = self._deserialize(*row)
+            self._add_to_front(id_, value, dirty=False)
+            return value
+
+    def flush(self):
+        """Write all items which have not been saved to the database yet."""
+        with self._lock:
+            self._write_pending()
+            if self._dirty:
+                self._write((id_, self._front[id_]) for id_ in self._dirty)
+                self._dirty = set()
+
+    def count(self):
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute("SELECT COUNT(*) FROM cybox_cache")
+            return cursor.fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._front = collections.OrderedDict()
+            self._dirty = set()
+            self._pending = {}
+            with self._conn:
+                self._conn.execute("DELETE FROM cybox_cache")
+
+    def close(self):
+        """Write any pending items and close the database connection."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
 # Singleton instance within this module. It is lazily instantiated, so simply
 # importing the utils module will not create the object.
 __cache = None
+__cache_lock = threading.Lock()
+
+
+# The cache installed by the innermost active cache_scope(), if any. This is
+# tracked per execution context where contextvars is available (so asyncio
+# tasks get their own scope), and per thread otherwise.
+if contextvars:
+    _scoped_cache = contextvars.ContextVar("cybox_scoped_cache", default=None)
+
+    def _get_scoped_cache():
+        return _scoped_cache.get()
+
+    def _push_scoped_cache(cache):
+        return _scoped_cache.set(cache)
+
+    def _pop_scoped_cache(token):
+        _scoped_cache.reset(token)
+else:
+    _scoped_local = threading.local()
+
+    def _get_scoped_cache():
+        return getattr(_scoped_local, "cache", None)
+
+    def _push_scoped_cache(cache):
+        previous = _get_scoped_cache()
+        _scoped_local.cache = cache
+        return previous
+
+    def _pop_scoped_cache(token):
+        _scoped_local.cache = token
 
 
 def _get_cache():
-    """Return the `cybox.utils` module's global cache object.
+    """Return the cache object currently used by the `cybox.utils` module.
+
+    This is the cache of the innermost active :func:`cache_scope`, or the
+    module's global cache outside of any scope.
 
     Only under rare circumstances should this function be called by external
     code. More likely, external code should initialize its own Cache object.
@@ -96,28 +529,85 @@ def _get_cache():
     The implicit, built-in global cache is used when parsing XML or JSON
     representations and dealing with internal references within a document.
     """
+    scoped = _get_scoped_cache()
+    if scoped is not None:
+        return scoped
+
     global __cache
     if not __cache:
-        __cache = DictCache()
+        with __cache_lock:
+            if not __cache:
+                __cache = DictCache()
     return __cache
 
 
+@contextlib.contextmanager
+def cache_scope(cache=None):
+    """Route the cache functions in this module to `cache` within a block.
+
+    Objects created (for example, while parsing a document) inside the
+    ``with`` block are saved to `cache` instead of the global cache, and
+    idrefs are resolved against it. When the block exits, the previous cache
+    is restored and `cache` is no longer referenced by this module, so a
+    per-document cache is freed along with the document.
+
+    Scopes can be nested, and are local to the current thread (and to the
+    current ``contextvars`` context, where available), so concurrent parses
+    in different threads do not see each other's objects.
+
+    Args:
+        cache: A :class:`Cache` instance. If not provided, a new
+            :class:`DictCache` is used.
+
+    Yields:
+        The cache in use for the scope.
+
+    Example::
+
+        with cache_scope():
+            observables = Observables.from_obj(binding_obj)
+    """
+    if cache is None:
+        cache = DictCache()
+    elif not isinstance(cache, Cache):
+        raise TypeError("cache must be a Cache instance")
+
+    token = _push_scoped_cache(cache)
+    try:
+        yield cache
+    finally:
+        _pop_scoped_cache(token)
+
+
+def set_global_cache(cache):
+    """Replace the `cybox.utils` module's global cache object.
+
+    This can be used to switch the cache used during parsing to a bounded
+    implementation such as :class:`LRUCache`. Passing ``None`` restores the
+    default :class:`DictCache` on next use.
+    """
+    global __cache
+    if cache is not None and not isinstance(cache, Cache):
+        raise TypeError("cache must be a Cache instance")
+    __cache = cache
+
+
 def cache_put(value, id_=None):
-    """Save a value in the global cache"""
+    """Save a value in the current cache"""
     new_id = _get_cache().put(value, id_)
     return new_id
 
 
 def cache_get(id_):
-    """Retrieve a value from the global cache"""
+    """Retrieve a value from the current cache"""
     return _get_cache().get(id_)
 
 
 def cache_count():
-    """Get the number of items in the global cache"""
+    """Get the number of items in the current cache"""
     return _get_cache().count()
 
 
 def cache_clear():
-    """Clear the global cache"""
+    """Clear the current cache"""
     _get_cache().clear()
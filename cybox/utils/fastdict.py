@@ -0,0 +1,474 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compiled ``to_dict()``/``from_dict()`` for ObjectProperties and properties.
+
+The generic ``Entity.to_dict()`` and ``Entity.from_dict()`` loop over the
+class's TypedFields and go through the field descriptors for every value, and
+``BaseProperty.to_dict()`` calls ``is_plain()``, which reads about twenty
+fields one descriptor at a time, just to find that a property holds a plain
+value. For documents made mostly of objects and their properties, this
+dominates the time spent converting to and from dictionaries.
+
+When :func:`enable` has been called, ``to_dict()`` and ``from_dict()`` on
+:class:`cybox.common.ObjectProperties` and
+:class:`cybox.common.BaseProperty` subclasses (``File``, ``Address``,
+``String``, ...) are replaced by functions generated for each class the first
+time it is converted, with the class's fields unrolled and the field-level
+conversions resolved in advance. The generated functions give the same
+results as the generic ones. Classes the compiler cannot handle exactly (for
+example, a property with its own ``is_plain()`` or ``__init__()``, or one that
+replaces a field with a plain class attribute) keep using the generic
+methods.
+
+This is opt-in::
+
+    from cybox.utils import fastdict
+
+    fastdict.enable()
+    d = observables.to_dict()
+"""
+
+import threading
+
+from mixbox import entities, fields
+from mixbox.vendor import six
+
+from cybox.common.attribute_groups import (DEFAULT_APPLY_CONDITION,
+                                           DEFAULT_DELIM, PatternFieldGroup)
+from cybox.common.object_properties import ObjectProperties, Property
+from cybox.common.properties import BaseProperty
+from cybox.common.vocabs import VocabFactory
+
+# The generic implementations replaced by enable(), and the implementations
+# that are next in line after them.
+_OBJECT_PROPERTIES_TO_DICT = ObjectProperties.__dict__["to_dict"]
+_BASE_PROPERTY_TO_DICT = BaseProperty.__dict__["to_dict"]
+_BASE_PROPERTY_FROM_DICT = BaseProperty.__dict__["from_dict"].__func__
+_ENTITY_TO_DICT = entities.Entity.__dict__["to_dict"]
+_ENTITY_FROM_DICT = entities.Entity.__dict__["from_dict"].__func__
+_ENTITY_FINALIZE_DICT = entities.Entity.__dict__["_finalize_dict"]
+_PATTERN_FROM_DICT = PatternFieldGroup.__dict__["from_dict"].__func__
+
+# is_plain() implementations which check exactly that every field of the
+# class defining them, other than value and datatype, is unset or has its
+# default value.
+_PLAIN_CHECKS = (BaseProperty, Property)
+_DEFAULTS = {
+    "apply_condition": DEFAULT_APPLY_CONDITION,
+    "is_case_sensitive": True,
+    "delimiter": DEFAULT_DELIM,
+}
+
+_lock = threading.Lock()
+_enabled = False
+
+
+def _impl(klass, name, after=None):
+    """Return the function `klass` uses for attribute `name`, looking only
+    at the classes after `after` in its MRO if `after` is given.
+    """
+    mro = klass.__mro__
+    if after is not None:
+        mro = mro[mro.index(after) + 1:]
+
+    for base in mro:
+        if name in base.__dict__:
+            value = base.__dict__[name]
+            return getattr(value, "__func__", value)
+
+    return None
+
+
+def _is_default(field, name):
+    """Whether `field` uses the TypedField implementation of `name`."""
+    return _impl(type(field), name) is _impl(fields.TypedField, name)
+
+
+def _none_safe(transformer):
+    """Whether ``transformer.from_dict(None)`` is known to return None, so
+    that the call can be skipped.
+    """
+    func = _impl(transformer, "from_dict")
+    return func in (_ENTITY_FROM_DICT, _BASE_PROPERTY_FROM_DICT,
+                    _PATTERN_FROM_DICT, _dispatch_from_dict,
+                    _impl(entities.EntityList, "from_dict"),
+                    _impl(entities.EntityFactory, "from_dict"),
+                    _impl(VocabFactory, "from_dict"))
+
+
+class _Source(object):
+    """The source of a generated function and the names it refers to."""
+
+    def __init__(self, header):
+        self.lines = [header]
+        self.names = {}
+
+    def name(self, value, prefix):
+        name = "%s%d" % (prefix, len(self.names))
+        self.names[name] = value
+        return name
+
+    def add(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def build(self, klass, funcname):
+        filename = "<fastdict %s.%s>" % (klass.__name__, funcname)
+        code = compile("\n".join(self.lines), filename, "exec")
+        six.exec_(code, self.names)
+        return self.names[funcname]
+
+
+def _emit_to_dict_fields(src, klass):
+    """Emit the body of ``Entity.to_dict()`` for `klass`, leaving the
+    result in ``d``.
+    """
+    src.add(1, "fs = entity._fields")
+    src.add(1, "d = {}")
+
+    for field in klass.typed_fields():
+        f = src.name(field, "F")
+        key = repr(field.key_name)
+
+        if _is_default(field, "dict_value"):
+            convert = None
+        else:
+            convert = src.name(field.dict_value, "D")
+
+        src.add(1, "v = fs.get(%s)" % f)
+
+        if field.multiple:
+            if field.type_:
+                item = "x.to_dict()"
+            elif convert:
+                item = "%s(x)" % convert
+            else:
+                item = "x"
+            src.add(1, "if v:")
+            src.add(2, "d[%s] = [None if x is None else %s for x in v]" % (key, item))
+            continue
+
+        if field.type_:
+            src.add(1, "if v is not None:")
+            src.add(2, "v = v.to_dict()")
+            src.add(2, "if v is not None and v != []:")
+            src.add(3, "d[%s] = v" % key)
+        elif convert:
+            src.add(1, "if v is not None:")
+            src.add(2, "v = %s(v)" % convert)
+            src.add(2, "if v is not None and v != []:")
+            src.add(3, "d[%s] = v" % key)
+        else:
+            src.add(1, "if v is not None and v != []:")
+            src.add(2, "d[%s] = v" % key)
+
+    if _impl(klass, "_finalize_dict") is not _ENTITY_FINALIZE_DICT:
+        src.add(1, "entity._finalize_dict(d)")
+
+
+def _emit_set(src, indent, field, value):
+    """Emit code equivalent to ``field.__set__(entity, value)``."""
+    f = src.name(field, "F")
+
+    if (field.multiple or field.preset_hook or field.postset_hook or
+            not _is_default(field, "__set__")):
+        src.add(indent, "%s.__set__(entity, %s)" % (f, value))
+    elif not _is_default(field, "_clean"):
+        src.add(indent, "fs[%s] = %s._clean(%s)" % (f, f, value))
+    elif field.type_ is None:
+        src.add(indent, "fs[%s] = %s" % (f, value))
+    elif _is_default(field, "check_type") and not hasattr(field.type_, "istypeof"):
+        t = src.name(field.type_, "T")
+        src.add(indent, "v = %s" % value)
+        src.add(indent, "fs[%s] = v if v is None or isinstance(v, %s) else %s._clean(v)" % (f, t, f))
+    else:
+        src.add(indent, "fs[%s] = %s._clean(%s)" % (f, f, value))
+
+
+def _emit_from_dict_fields(src, klass):
+    """Emit the body of ``Entity.from_dict()`` for `klass` after the
+    entity has been created, for a dictionary ``d``.
+    """
+    src.add(1, "fs = entity._fields")
+
+    for field in klass.typed_fields():
+        transformer = field.transformer
+        src.add(1, "v = d.get(%r)" % field.key_name)
+
+        if transformer:
+            t = src.name(transformer, "T")
+            if field.multiple:
+                src.add(1, "v = [%s.from_dict(x) for x in v] if v is not None else []" % t)
+            elif _none_safe(transformer):
+                src.add(1, "if v is not None:")
+                src.add(2, "v = %s.from_dict(v)" % t)
+            else:
+                src.add(1, "v = %s.from_dict(v)" % t)
+        elif field.multiple:
+            src.add(1, "if not v:")
+            src.add(2, "v = []")
+
+        _emit_set(src, 1, field, "v")
+
+
+def _compile_object_to_dict(klass):
+    """``ObjectProperties.to_dict()`` for `klass`."""
+    if _impl(klass, "to_dict", after=ObjectProperties) is not _ENTITY_TO_DICT:
+        return None
+
+    src = _Source("def to_dict(entity):")
+    _emit_to_dict_fields(src, klass)
+    if klass._XSI_TYPE:
+        src.add(1, "d['xsi:type'] = %r" % klass._XSI_TYPE)
+    src.add(1, "return d")
+
+    return src.build(klass, "to_dict")
+
+
+def _compile_object_from_dict(klass):
+    """``ObjectProperties.from_dict()`` (that is, ``Entity.from_dict()``)
+    for `klass`.
+    """
+    if _impl(klass, "from_dict", after=ObjectProperties) is not _ENTITY_FROM_DICT:
+        return None
+
+    src = _Source("def from_dict(cls, d):")
+    src.names["generic"] = _ENTITY_FROM_DICT
+    src.add(1, "if d is None:")
+    src.add(2, "return None")
+    src.add(1, "if not isinstance(d, dict):")
+    src.add(2, "return generic(cls, d)")
+    src.add(1, "entity = cls()")
+    _emit_from_dict_fields(src, klass)
+    src.add(1, "return entity")
+
+    return src.build(klass, "from_dict")
+
+
+def _has_fields(klass, names):
+    """Whether each of `names` is still a TypedField on `klass`, rather
+    than being replaced by a plain class attribute.
+    """
+    return all(isinstance(getattr(klass, x, None), fields.TypedField) for x in names)
+
+
+def _plain_fields(klass):
+    """Return the fields checked by the ``is_plain()`` of `klass`, or None
+    if it is not one the compiler knows.
+    """
+    for owner in _PLAIN_CHECKS:
+        if _impl(klass, "is_plain") is not _impl(owner, "is_plain"):
+            continue
+
+        names = [x for x, _ in owner.typed_fields_with_attrnames()]
+        if not _has_fields(klass, names):
+            return None
+
+        return [
+            getattr(klass, x) for x in names if x not in ("value", "datatype")
+        ]
+
+    return None
+
+
+def _compile_property_to_dict(klass):
+    """``BaseProperty.to_dict()`` for `klass`, with ``is_plain()``
+    inlined. Properties which are not plain use the generic method.
+    """
+    plain = _plain_fields(klass)
+    if plain is None or klass.value.multiple:
+        return None
+
+    src = _Source("def to_dict(entity):")
+    src.names["generic"] = _BASE_PROPERTY_TO_DICT
+    src.add(1, "fs = entity._fields")
+
+    checks = []
+    for field in plain:
+        f = src.name(field, "F")
+        default = _DEFAULTS.get(field.key_name)
+        if default is None:
+            checks.append("fs.get(%s) is None" % f)
+        else:
+            checks.append("fs.get(%s) in (None, %r)" % (f, default))
+
+    if _impl(klass, "serialized_value") is _impl(BaseProperty, "serialized_value"):
+        serialized = "fs.get(%s)" % src.name(klass.value, "F")
+    else:
+        serialized = "entity.serialized_value"
+
+    src.add(1, "if not fs.has_extra() or (%s):" % " and\n            ".join(checks))
+    src.add(2, "return %s" % serialized)
+    src.add(1, "return generic(entity)")
+
+    return src.build(klass, "to_dict")
+
+
+def _instance_state(obj):
+    """Return the instance attributes of `obj`, whether they are kept in
+    its ``__dict__`` or in slots.
+    """
+    state = dict(getattr(obj, "__dict__", ()))
+
+    for klass in type(obj).__mro__:
+        for name in klass.__dict__.get("__slots__", ()):
+            if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                state[name] = getattr(obj, name)
+
+    return state
+
+
+def _prototype(klass):
+    """Return the instance attributes and ``_fields`` of ``klass()``, if
+    copying them is the same as calling ``klass(value)`` and setting the
+    value afterwards.
+    """
+    if _impl(klass, "__init__") is not _impl(BaseProperty, "__init__"):
+        return None
+    if klass.value.postset_hook:
+        return None
+
+    proto = klass()
+    attrs = _instance_state(proto)
+    template = attrs.pop("_fields")
+
+    immutable = (type(None), bool, float) + six.integer_types + six.string_types
+    values = list(attrs.values()) + list(template.values())
+    if not all(isinstance(x, immutable) for x in values):
+        return None
+
+    return attrs, template
+
+
+def _compile_property_from_dict(klass):
+    """``BaseProperty.from_dict()`` for `klass`."""
+    if not _has_fields(klass, ["value", "datatype"] + list(_DEFAULTS)):
+        return None
+    if (_impl(klass, "from_dict", after=BaseProperty) is not _PATTERN_FROM_DICT or
+            _impl(klass, "from_dict", after=PatternFieldGroup) is not _ENTITY_FROM_DICT):
+        return None
+
+    src = _Source("def from_dict(cls, d):")
+    src.add(1, "if d is None:")
+    src.add(2, "return None")
+    src.add(1, "if not isinstance(d, dict):")
+
+    prototype = _prototype(klass)
+    if prototype:
+        attrs, src.names["TEMPLATE"] = prototype
+        src.add(2, "entity = cls.__new__(cls)")
+        for name, value in sorted(attrs.items()):
+            src.add(2, "entity.%s = %s" % (name, src.name(value, "A")))
+        src.add(2, "fs = entity._fields = TEMPLATE.copy()")
+        _emit_set(src, 2, klass.value, "d")
+        src.add(2, "return entity")
+    else:
+        src.add(2, "return cls(d)")
+
+    # Entity.from_dict()
+    src.add(1, "entity = cls()")
+    _emit_from_dict_fields(src, klass)
+
+    # PatternFieldGroup.from_dict()
+    for name, default in sorted(_DEFAULTS.items(), key=_pattern_order):
+        _emit_set(src, 1, getattr(klass, name), "d.get(%r, %r)" % (name, default))
+
+    # BaseProperty.from_dict()
+    _emit_set(src, 1, klass.datatype, "d.get('datatype', %r)" % klass.default_datatype)
+    src.add(1, "return entity")
+
+    return src.build(klass, "from_dict")
+
+
+def _pattern_order(item):
+    # The order PatternFieldGroup.from_dict() sets these in.
+    return ("is_case_sensitive", "delimiter", "apply_condition").index(item[0])
+
+
+class _Compiled(dict):
+    """Maps classes to their compiled function, compiling on first use.
+
+    `compilers` is a sequence of (base class, compiler, generic function)
+    tuples. The compiler for the first base class of the requested class is
+    used. If it returns None, the generic function is used instead.
+    """
+
+    def __init__(self, compilers):
+        super(_Compiled, self).__init__()
+        self._compilers = compilers
+
+    def __missing__(self, klass):
+        for base, compiler, generic in self._compilers:
+            if issubclass(klass, base):
+                func = compiler(klass) or generic
+                break
+
+        # Two threads may both compile a class; the results are the same.
+        self[klass] = func
+        return func
+
+
+_TO_DICT = _Compiled((
+    (BaseProperty, _compile_property_to_dict, _BASE_PROPERTY_TO_DICT),
+    (ObjectProperties, _compile_object_to_dict, _OBJECT_PROPERTIES_TO_DICT),
+))
+
+_FROM_DICT = _Compiled((
+    (BaseProperty, _compile_property_from_dict, _BASE_PROPERTY_FROM_DICT),
+    (ObjectProperties, _compile_object_from_dict, _ENTITY_FROM_DICT),
+))
+
+
+def _dispatch_to_dict(self):
+    return _TO_DICT[self.__class__](self)
+
+
+def _dispatch_from_dict(cls, cls_dict):
+    return _FROM_DICT[cls](cls, cls_dict)
+
+
+def enable():
+    """Use compiled ``to_dict()`` and ``from_dict()`` methods for
+    ObjectProperties and BaseProperty subclasses.
+    """
+    global _enabled
+
+    with _lock:
+        if _enabled:
+            return
+
+        for klass in (ObjectProperties, BaseProperty):
+            klass.to_dict = _dispatch_to_dict
+            klass.from_dict = classmethod(_dispatch_from_dict)
+
+        _enabled = True
+
+
+def disable():
+    """Go back to the generic ``to_dict()`` and ``from_dict()`` methods."""
+    global _enabled
+
+    with _lock:
+        if not _enabled:
+            return
+
+        ObjectProperties.to_dict = _OBJECT_PROPERTIES_TO_DICT
+        del ObjectProperties.from_dict
+        BaseProperty.to_dict = _BASE_PROPERTY_TO_DICT
+        BaseProperty.from_dict = classmethod(_BASE_PROPERTY_FROM_DICT)
+
+        _enabled = False
+
+
+def is_enabled():
+    """Return True if the compiled methods are in use."""
+    return _enabled
+
+
+def clear():
+    """Discard the compiled functions, e.g. after the fields of a class have
+    been changed. They are compiled again on next use.
+    """
+    _TO_DICT.clear()
+    _FROM_DICT.clear()
@@ -0,0 +1,229 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Hash data with several algorithms in a single pass.
+
+The data is read once, in large chunks, and each chunk is given to every
+hash algorithm before the next one is read. Files are memory-mapped when
+possible, so their data is not copied into Python at all. ``hashlib``
+releases the GIL while hashing large chunks, so several files can be hashed
+in parallel by threads (see :meth:`cybox.objects.file_object.File.walk`).
+
+The algorithm names are those of the hash properties of
+:class:`cybox.common.hashes.HashList`: ``md5``, ``sha1``, ``sha224``,
+``sha256``, ``sha384``, ``sha512`` and ``ssdeep``. ``ssdeep`` requires the
+`ssdeep <https://pypi.org/project/ssdeep/>`_ package.
+"""
+
+import collections
+import hashlib
+import math
+import mmap
+import os
+
+from mixbox.vendor import six
+
+#: The algorithms used when none are given.
+DEFAULT_HASHES = ("md5", "sha1", "sha256")
+
+#: The supported algorithms.
+ALGORITHMS = ("md5", "sha1", "sha224", "sha256", "sha384", "sha512", "ssdeep")
+
+#: The number of bytes hashed at a time.
+CHUNK_SIZE = 1024 * 1024
+
+#: The number of bytes in each block whose entropy is calculated to find the
+#: peak entropy.
+ENTROPY_BLOCK_SIZE = 64 * 1024
+
+# Whether hashlib accepts memoryviews, so that memory-mapped files can be
+# hashed without copying them. Python 2 hashes a copy of each chunk instead.
+_HASH_VIEWS = not six.PY2
+
+
+class _SsdeepHash(object):
+    """A hashlib-like wrapper for ``ssdeep.Hash``."""
+
+    def __init__(self):
+        import ssdeep
+        self._hash = ssdeep.Hash()
+
+    def update(self, data):
+        self._hash.update(_to_bytes(data))
+
+    def hexdigest(self):
+        return self._hash.digest()
+
+
+def _to_bytes(data):
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    return bytes(data)
+
+
+def _new_hash(name):
+    if name not in ALGORITHMS:
+        raise ValueError("Unknown hash algorithm: %r" % (name,))
+    if name == "ssdeep":
+        return _SsdeepHash()
+    return hashlib.new(name)
+
+
+def _entropy(block):
+    """Return the Shannon entropy of `block` in bits per byte."""
+    size = float(len(block))
+    entropy = 0.0
+
+    for count in six.itervalues(collections.Counter(block)):
+        p = count / size
+        entropy -= p * math.log(p, 2)
+
+    return entropy
+
+
+class MultiHasher(object):
+    """Compute several hashes, and optionally the peak entropy, of data
+    given a chunk at a time. Call :meth:`finish` after the last chunk.
+
+    Args:
+        hashes: The names of the algorithms to use.
+        entropy: If True, also calculate the peak entropy: the highest
+            entropy of any ``ENTROPY_BLOCK_SIZE`` block of the data.
+            This is much slower than hashing.
+
+    Raises:
+        ValueError: If an algorithm is not supported.
+    """
+
+    def __init__(self, hashes=DEFAULT_HASHES, entropy=False):
+        self.size = 0
+        self._hashes = [(name.lower(), _new_hash(name.lower())) for name in hashes]
+        self._entropy = entropy
+        self._peak_entropy = None
+        self._block = b""
+
+    def update(self, data):
+        """Add the bytes (or any buffer) `data`."""
+        self.size += len(data)
+
+        for _, h in self._hashes:
+            h.update(data)
+
+        if self._entropy:
+            self._update_entropy(data)
+
+    def _update_entropy(self, data):
+        start = 0
+
+        if self._block:
+            start = ENTROPY_BLOCK_SIZE - len(self._block)
+            self._block += _to_bytes(data[:start])
+            if len(self._block) < ENTROPY_BLOCK_SIZE:
+                return
+            self._add_block(self._block)
+
+        end = len(data) - (len(data) - start) % ENTROPY_BLOCK_SIZE
+        for i in range(start, end, ENTROPY_BLOCK_SIZE):
+            self._add_block(data[i:i + ENTROPY_BLOCK_SIZE])
+
+        self._block = _to_bytes(data[end:])
+
+    def _add_block(self, block):
+        entropy = _entropy(block)
+        if self._peak_entropy is None or entropy > self._peak_entropy:
+            self._peak_entropy = entropy
+
+    def finish(self):
+        """Finish the peak entropy calculation with the last, partial block
+        of the data, if there is one. :func:`hash_stream` and
+        :func:`hash_file` call this after the last chunk.
+        """
+        if self._block:
+            self._add_block(self._block)
+            self._block = b""
+
+    @property
+    def hexdigests(self):
+        """A dictionary of the hexadecimal digests by algorithm name."""
+        return dict((name, h.hexdigest()) for name, h in self._hashes)
+
+    @property
+    def peak_entropy(self):
+        """The peak entropy in bits per byte, or None if it was not
+        calculated. Until :meth:`finish` is called, the last partial block
+        of the data is not included.
+        """
+        if not self._entropy:
+            return None
+        return self._peak_entropy or 0.0
+
+
+def hash_stream(stream, hashes=DEFAULT_HASHES, entropy=False,
+                chunk_size=CHUNK_SIZE, callback=None):
+    """Hash the data read from the binary file-like object `stream`.
+
+    Args:
+        stream: A file-like object opened for reading bytes.
+        hashes: The names of the algorithms to use.
+        entropy: If True, also calculate the peak entropy.
+        chunk_size: The number of bytes to read at a time.
+        callback: A function called with each chunk, after it is hashed.
+
+    Returns:
+        A :class:`MultiHasher` holding the results.
+    """
+    hasher = MultiHasher(hashes, entropy)
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        if callback:
+            callback(chunk)
+
+    hasher.finish()
+    return hasher
+
+
+def hash_file(path, hashes=DEFAULT_HASHES, entropy=False,
+              chunk_size=CHUNK_SIZE):
+    """Hash the file at `path`, memory-mapping it when possible.
+
+    Returns:
+        A :class:`MultiHasher` holding the results.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OverflowError, EnvironmentError):
+            # Empty files and special files cannot be mapped.
+            return hash_stream(f, hashes, entropy, chunk_size)
+
+        try:
+            hasher = MultiHasher(hashes, entropy)
+            if not _HASH_VIEWS:
+                for i in range(0, len(mapped), chunk_size):
+                    hasher.update(mapped[i:i + chunk_size])
+            else:
+                view = memoryview(mapped)
+                try:
+                    for i in range(0, len(view), chunk_size):
+                        hasher.update(view[i:i + chunk_size])
+                finally:
+                    # The map cannot be closed while a view of it exists.
+                    del view
+            hasher.finish()
+            return hasher
+        finally:
+            mapped.close()
+
+
+def iter_paths(root, onerror=None):
+    """Yield the path of every regular file in the directory tree `root`."""
+    for dirpath, _, filenames in os.walk(root, onerror=onerror):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if os.path.isfile(path):
+                yield path
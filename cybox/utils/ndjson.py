@@ -0,0 +1,174 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Newline-delimited JSON (NDJSON) import and export of Observables.
+
+``Observables.to_json()`` produces a single JSON document, which has to be
+built completely before it is written and loaded completely before it is
+read. In the NDJSON form, each ``Observable`` is written as its own JSON
+document on its own line, so a feed can be written, read, split and processed
+in parallel one line at a time.
+
+The first line is a header holding the rest of the ``Observables`` dictionary
+(the CybOX version, and the ``observable_package_source`` and ``pools`` if
+there are any). Every other line is the ``to_dict()`` of one ``Observable``::
+
+    {"major_version": 2, "minor_version": 1, "update_version": 0}
+    {"id": "example:Observable-1", "object": {...}}
+    {"id": "example:Observable-2", "object": {...}}
+
+Since each line is a complete JSON document, the lines after the header can
+be handed to ``Observable.from_json()`` independently.
+"""
+
+import json
+
+from mixbox.vendor import six
+
+
+def _open(f, mode):
+    """Return a file object for `f` and whether it should be closed when
+    done.
+    """
+    if isinstance(f, six.string_types):
+        return open(f, mode), True
+    return f, False
+
+
+def _header(observable_package_source=None, pools=None):
+    """Return the header dictionary: the ``Observables`` dictionary without
+    its ``observables``.
+
+    This is built from its parts rather than from ``Observables.to_dict()``,
+    which would convert every observable only for them to be dropped.
+    """
+    from cybox.core import Observables
+
+    root = Observables()
+    header = {
+        "major_version": root._major_version,
+        "minor_version": root._minor_version,
+        "update_version": root._update_version,
+    }
+    if observable_package_source:
+        source = observable_package_source.to_dict()
+        header["observable_package_source"] = source
+    if pools:
+        header["pools"] = pools.to_dict()
+    return header
+
+
+def write_ndjson(observables, outfile, observable_package_source=None,
+                 pools=None):
+    """Write observables to `outfile` as NDJSON.
+
+    Args:
+        observables: A :class:`cybox.core.Observables`, or any iterable of
+            :class:`cybox.core.Observable` instances, such as a generator.
+            The observables are written as they are produced.
+        outfile: A filename, or a file-like object opened for writing text.
+        observable_package_source: A :class:`cybox.common.MeasureSource` for
+            the header. Only used if `observables` is not an ``Observables``.
+        pools: A :class:`cybox.core.pool.Pools` for the header. Only used if
+            `observables` is not an ``Observables``.
+    """
+    from cybox.core import Observables
+
+    if isinstance(observables, Observables):
+        header = _header(observables.observable_package_source,
+                         observables.pools)
+        items = observables.observables
+    else:
+        header = _header(observable_package_source, pools)
+        items = observables
+
+    outfile, close = _open(outfile, "w")
+
+    try:
+        outfile.write(json.dumps(header))
+        outfile.write("\n")
+
+        for observable in items:
+            outfile.write(json.dumps(observable.to_dict()))
+            outfile.write("\n")
+    finally:
+        if close:
+            outfile.close()
+
+
+def _iter_lines(infile):
+    """Yield the decoded JSON documents of the non-blank lines of
+    `infile`.
+    """
+    infile, close = _open(infile, "r")
+
+    try:
+        for line in infile:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if close:
+            infile.close()
+
+
+def _check_header(header):
+    if not isinstance(header, dict) or "major_version" not in header:
+        raise ValueError("The first line is not an Observables NDJSON header.")
+    return header
+
+
+def iter_observables_ndjson(infile, header=None):
+    """Yield the observables of an NDJSON file one line at a time.
+
+    Only one observable is held in memory at a time by the generator, but
+    like any parsed entity each one is also put in the id cache. Read inside
+    ``cybox.utils.cache_scope(WeakValueCache())`` to let observables that are
+    no longer used be freed.
+
+    Args:
+        infile: A filename, or a file-like object (or any iterable of lines)
+            to read from.
+        header: If ``True``, the lines are assumed to start with the header
+            line, which is skipped. If ``False``, every line is an
+            ``Observable``, as when the lines of a file have been split
+            between workers. By default the first line is skipped if it is a
+            header.
+
+    Yields:
+        :class:`cybox.core.Observable` instances.
+
+    Raises:
+        ValueError: If `header` is ``True`` and the first line is not a
+            header.
+    """
+    from cybox.core import Observable
+
+    lines = _iter_lines(infile)
+
+    for i, d in enumerate(lines):
+        if i == 0 and header is not False:
+            if header:
+                _check_header(d)
+                continue
+            elif isinstance(d, dict) and "major_version" in d:
+                continue
+
+        yield Observable.from_dict(d)
+
+
+def read_ndjson(infile):
+    """Read a complete NDJSON file into a :class:`cybox.core.Observables`.
+
+    Raises:
+        ValueError: If the first line is not a header.
+    """
+    from cybox.core import Observable, Observables
+
+    lines = _iter_lines(infile)
+    observables = Observables.from_dict(_check_header(next(lines, None)))
+
+    for d in lines:
+        observables.add(Observable.from_dict(d))
+
+    return observables
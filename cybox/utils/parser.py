@@ -0,0 +1,81 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""Incremental parsing of CybOX XML documents."""
+
+from lxml import etree
+
+import cybox.bindings.cybox_core as core_binding
+from cybox.core import Observable
+
+TAG_OBSERVABLES = "{http://cybox.mitre.org/cybox-2}Observables"
+TAG_OBSERVABLE = "{http://cybox.mitre.org/cybox-2}Observable"
+
+
+def _iterparse(source):
+    """Return an lxml iterparse context using the same parser options as
+    :func:`mixbox.xml.get_xml_parser`.
+    """
+    return etree.iterparse(
+        source,
+        events=("start", "end"),
+        huge_tree=True,
+        remove_comments=True,
+        strip_cdata=False,
+        remove_blank_text=True,
+        resolve_entities=False,
+    )
+
+
+def _release(elem, root):
+    """Free the memory held by `elem` and any preceding siblings."""
+    elem.clear()
+    while elem.getprevious() is not None:
+        del root[0]
+
+
+def iter_observables(path_or_file):
+    """Iterate over the Observables in a CybOX XML document.
+
+    Unlike ``cybox.bindings.cybox_core.parse()``, the document is parsed
+    incrementally: each top-level ``<cybox:Observable>`` element is built into
+    a :class:`cybox.core.Observable` as soon as its end tag is read, and the
+    element is then discarded. Memory usage therefore depends on the size of
+    the largest single Observable rather than on the size of the document.
+
+    Observables nested inside an ``Observable_Composition`` are returned as
+    part of their parent, not on their own. The ``Observable_Package_Source``
+    and ``Pools`` elements are skipped.
+
+    Args:
+        path_or_file: A filename or a file-like object containing a
+            ``<cybox:Observables>`` document.
+
+    Yields:
+        :class:`cybox.core.Observable` instances, in document order.
+
+    Raises:
+        ValueError: If the document root is not ``<cybox:Observables>``.
+    """
+    root = None
+
+    for event, elem in _iterparse(path_or_file):
+        if root is None:
+            if elem.tag != TAG_OBSERVABLES:
+                raise ValueError(
+                    "Document root must be %s, not %s" %
+                    (TAG_OBSERVABLES, elem.tag)
+                )
+            root = elem
+            continue
+
+        if event != "end" or elem.getparent() is not root:
+            continue
+
+        if elem.tag == TAG_OBSERVABLE:
+            obj = core_binding.ObservableType.factory()
+            obj.build(elem)
+            _release(elem, root)
+            yield Observable.from_obj(obj)
+        else:
+            _release(elem, root)
@@ -0,0 +1,447 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Streaming serialization of python-cybox entities to XML.
+
+``Entity.to_xml()`` converts the whole entity into generateDS binding objects
+and exports them into a string, so serializing a large
+:class:`cybox.core.Observables` needs memory for the entities, the complete
+binding graph and the complete document. :func:`write_xml` writes straight to
+a file instead, converting the items of the root's lists (e.g. each
+``Observable``) one at a time, so only one of them exists as binding objects
+at any point.
+
+:func:`write_xml` still needs the whole entity up front. When observables are
+produced one by one, :class:`ObservablesWriter` writes each of them to the
+file as it arrives, without keeping any of them around.
+"""
+
+import copy
+import gzip
+
+from mixbox import entities, namespaces
+from mixbox.binding_utils import save_encoding
+from mixbox.vendor import six
+
+
+def _iter_entities(entity):
+    """Yield every entity reachable from `entity`, including itself."""
+    stack = [entity]
+
+    while stack:
+        entity = stack.pop()
+        yield entity
+
+        for field, value in six.iteritems(entity._fields):
+            # Only typed fields hold entities.
+            if value is None or not field.type_:
+                continue
+            elif field.multiple:
+                stack.extend(x for x in value if x is not None)
+            else:
+                stack.append(value)
+
+
+def _collect_namespaces(entity, ns_info):
+    """Pass every entity reachable from `entity` to the NamespaceCollector
+    `ns_info`, without creating any binding objects.
+
+    This finds the same namespaces that ``to_obj(ns_info=...)`` would.
+    """
+    for x in _iter_entities(entity):
+        ns_info.collect(x)
+
+
+def _namespace_key(entity):
+    """Return a hashable key which is equal for entities that use the same
+    namespaces: the classes of the entities reachable from `entity` and the
+    namespaces they were parsed with, if any.
+    """
+    classes = set()
+    parsed = set()
+
+    for x in _iter_entities(entity):
+        classes.add(x.__class__)
+
+        for attr in ("__input_namespaces__", "__input_schemalocations__"):
+            mapping = getattr(x, attr, None)
+            if mapping:
+                parsed.update((attr, k, v) for k, v in six.iteritems(mapping))
+
+    return frozenset(classes), frozenset(parsed)
+
+
+def _finalize_namespaces(entity, namespace_dict=None, schemaloc_dict=None):
+    """Return a finalized NamespaceCollector for `entity`."""
+    ns_info = entities.NamespaceCollector()
+    _collect_namespaces(entity, ns_info)
+    ns_info.finalize(namespace_dict, schemaloc_dict)
+    return ns_info
+
+
+def _get_namespace_def(entity, namespace_dict, pretty):
+    """Return the xmlns and xsi:schemaLocation attributes for the root
+    element, in the same form as ``Entity.to_xml()``.
+    """
+    ns_info = _finalize_namespaces(entity, namespace_dict)
+
+    delim = "\n\t" if pretty else " "
+    return (ns_info.get_xmlns_string(delim) + delim +
+            ns_info.get_schema_location_string(delim))
+
+
+class _LazyBindings(object):
+    """A stand-in for the list of binding objects of a ``multiple`` field,
+    which converts each entity as the binding class exports it.
+
+    `flush` is called after each item has been exported.
+    """
+
+    def __init__(self, items, flush):
+        self._items = items
+        self._flush = flush
+
+    def __iter__(self):
+        for item in self._items:
+            yield item.to_obj()
+            self._flush()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return len(self._items) > 0
+
+    __nonzero__ = __bool__
+
+
+def _to_streaming_obj(entity, flush):
+    """Return a binding object for `entity` whose lists of entities are
+    converted lazily during export.
+    """
+    lazy = {}
+
+    for field, value in six.iteritems(entity._fields):
+        if field.multiple and field.type_ and value:
+            lazy[field] = value
+
+    if not lazy:
+        return entity.to_obj()
+
+    # Convert a shallow copy with the lists removed, so that the entity
+    # itself is left alone.
+    shallow = copy.copy(entity)
+    shallow._fields = dict(
+        (field, value) for field, value in six.iteritems(entity._fields)
+        if field not in lazy
+    )
+
+    obj = shallow.to_obj()
+
+    for field, value in six.iteritems(lazy):
+        setattr(obj, field.name, _LazyBindings(value, flush))
+
+    return obj
+
+
+class _Output(object):
+    """Collects the many small strings written by the bindings' ``export()``
+    and writes them to the underlying stream in encoded chunks when
+    :meth:`flush` is called.
+    """
+
+    def __init__(self, stream, encoding, close):
+        self._stream = stream
+        self._encoding = encoding
+        self._close = close
+        self._buffer = []
+        self.write = self._buffer.append
+
+    def flush(self, sync=False):
+        """Write the buffered output to the stream. If `sync` is ``True``,
+        the stream itself is flushed as well.
+        """
+        if self._buffer:
+            data = u"".join(self._buffer)
+            if self._encoding:
+                data = data.encode(self._encoding)
+
+            self._stream.write(data)
+            del self._buffer[:]
+
+        if sync:
+            self._stream.flush()
+
+    def close(self):
+        self.flush()
+        self._close()
+
+
+def _open(outfile, encoding, compress):
+    """Return an :class:`_Output` which writes to `outfile`."""
+    if isinstance(outfile, six.string_types):
+        if compress:
+            stream = gzip.open(outfile, "wb")
+        else:
+            stream = open(outfile, "wb" if encoding else "w")
+        close = stream.close
+    elif compress:
+        stream = gzip.GzipFile(fileobj=outfile, mode="wb")
+        close = stream.close
+    else:
+        stream = outfile
+        close = stream.flush
+
+    return _Output(stream, encoding, close)
+
+
+def write_xml(entity, outfile, include_namespaces=True, namespace_dict=None,
+              pretty=True, encoding="utf-8", compress=False):
+    """Serialize `entity` as XML to a file.
+
+    The output is the same as ``entity.to_xml()``, but it is written to
+    `outfile` as it is produced rather than built up as a string. The items
+    of the root's ``multiple`` fields (such as the ``Observable`` children of
+    a :class:`cybox.core.Observables`) are converted to binding objects one at
+    a time, so memory use does not grow with the number of items.
+
+    Args:
+        entity: The :class:`mixbox.entities.Entity` to serialize, typically
+            a :class:`cybox.core.Observables` or :class:`cybox.core.Observable`.
+        outfile: A filename, or a file-like object opened for writing bytes.
+            If `encoding` is ``None``, a file-like object opened for writing
+            text.
+        include_namespaces: Whether to include xmlns and xsi:schemaLocation
+            attributes on the root element.
+        namespace_dict: A mapping of additional XML namespaces to prefixes.
+        pretty: Whether to produce readable (``True``) or compact
+            (``False``) output.
+        encoding: The output character encoding.
+        compress: If ``True``, the output is gzip-compressed.
+
+    Raises:
+        ValueError: If `compress` is ``True`` and `encoding` is ``None``.
+    """
+    if compress and not encoding:
+        raise ValueError("An encoding is required for compressed output.")
+
+    namespace_def = ""
+    if include_namespaces:
+        namespace_def = _get_namespace_def(entity, namespace_dict, pretty)
+
+    output = _open(outfile, encoding, compress)
+
+    try:
+        with save_encoding(encoding):
+            _to_streaming_obj(entity, output.flush).export(
+                output.write,
+                0,
+                namespacedef_=namespace_def,
+                pretty_print=pretty
+            )
+    finally:
+        output.close()
+
+
+# Namespaces used by nearly every Observable, which ObservablesWriter
+# declares on the root element.
+_ROOT_NAMESPACES = (
+    "http://cybox.mitre.org/common-2",
+    "http://cybox.mitre.org/default_vocabularies-2",
+)
+
+
+class ObservablesWriter(object):
+    """Writes a ``<cybox:Observables>`` document one ``Observable`` at a
+    time.
+
+    The root element is opened when the writer is created, each call to
+    :meth:`write` converts and writes one observable and flushes it to
+    `outfile`, and :meth:`close` writes the optional ``Pools`` and closes the
+    root element. Nothing written is kept in memory, so the document can be
+    arbitrarily large.
+
+    Because the root element has to be written before the observables are
+    known, it only declares the CybOX core, common and vocabulary namespaces,
+    the ID namespace and those in `namespace_dict`. Each observable declares
+    any other namespaces it uses (e.g. those of its object types) on its own
+    ``<cybox:Observable>`` element. Pass the namespaces of the expected object
+    types in `namespace_dict` to have them declared once on the root instead.
+
+    The writer can be used as a context manager, which calls :meth:`close`
+    on exit.
+
+    Args:
+        outfile: A filename, or a file-like object opened for writing bytes.
+            If `encoding` is ``None``, a file-like object opened for writing
+            text.
+        namespace_dict: A mapping of additional XML namespaces to prefixes,
+            declared on the root element.
+        pretty: Whether to produce readable (``True``) or compact
+            (``False``) output.
+        encoding: The output character encoding.
+        compress: If ``True``, the output is gzip-compressed.
+        observable_package_source: An optional
+            :class:`cybox.common.MeasureSource` for the package.
+
+    Raises:
+        ValueError: If `compress` is ``True`` and `encoding` is ``None``.
+    """
+
+    def __init__(self, outfile, namespace_dict=None, pretty=True,
+                 encoding="utf-8", compress=False,
+                 observable_package_source=None):
+        from cybox.core import Observables
+
+        if compress and not encoding:
+            raise ValueError("An encoding is required for compressed output.")
+
+        self._pretty = pretty
+        self._encoding = encoding
+        self._delim = "\n\t" if pretty else " "
+
+        root = Observables()
+        root.observable_package_source = observable_package_source
+
+        prefixes = namespaces.get_full_ns_map()
+        ns_dict = dict((ns, prefixes[ns]) for ns in _ROOT_NAMESPACES)
+        ns_dict.update(namespace_dict or {})
+
+        # Nothing on the root uses the namespaces in ns_dict, so their schema
+        # locations have to be looked up here, or the observables using them
+        # would have none.
+        known = namespaces.get_full_schemaloc_map()
+        schemaloc_dict = dict((ns, known[ns]) for ns in ns_dict if known.get(ns))
+
+        ns_info = _finalize_namespaces(root, ns_dict, schemaloc_dict)
+        self._declared = frozenset(ns_info.binding_namespaces)
+
+        # Maps _namespace_key() values to namespace declarations.
+        self._namespace_defs = {}
+
+        self._output = _open(outfile, encoding, compress)
+        self._closed = False
+
+        namespace_def = (ns_info.get_xmlns_string(self._delim) + self._delim +
+                         ns_info.get_schema_location_string(self._delim))
+
+        try:
+            self._write_start(root.to_obj(), namespace_def)
+        except Exception:
+            self._output.close()
+            raise
+
+    def _write_start(self, obj, namespace_def):
+        write = self._output.write
+        eol = "\n" if self._pretty else ""
+
+        with save_encoding(self._encoding):
+            write("<cybox:Observables %s" % namespace_def)
+            obj.exportAttributes(write, 0, set())
+            write(">%s" % eol)
+
+            if obj.Observable_Package_Source is not None:
+                obj.Observable_Package_Source.export(
+                    write, 1, "cybox:", name_="Observable_Package_Source",
+                    pretty_print=self._pretty
+                )
+
+        self._output.flush(sync=True)
+
+    def _get_namespace_def(self, entity):
+        """Return the xmlns and xsi:schemaLocation attributes for the
+        namespaces used by `entity` that the root element does not declare.
+        """
+        key = _namespace_key(entity)
+
+        try:
+            return self._namespace_defs[key]
+        except KeyError:
+            pass
+
+        namespace_def = self._namespace_defs[key] = self._make_namespace_def(entity)
+        return namespace_def
+
+    def _make_namespace_def(self, entity):
+        ns_info = _finalize_namespaces(entity)
+        prefixes = ns_info.binding_namespaces
+        schemalocs = ns_info.finalized_schemalocs
+
+        uris = sorted(x for x in prefixes if x not in self._declared)
+        if not uris:
+            return ""
+
+        attrs = ['xmlns:%s="%s"' % (prefixes[x], x) for x in uris]
+
+        locations = ["%s %s" % (x, schemalocs[x]) for x in uris if schemalocs.get(x)]
+        if locations:
+            attrs.append('xsi:schemaLocation="%s"' % self._delim.join(locations))
+
+        return self._delim.join(attrs)
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError("I/O operation on a closed ObservablesWriter.")
+
+    def write(self, observable):
+        """Write `observable` to the output and flush it.
+
+        As with :meth:`cybox.core.Observables.add`, anything that is not an
+        :class:`cybox.core.Observable` is wrapped in one first.
+        """
+        from cybox.core import Observable
+
+        self._check_open()
+
+        if not isinstance(observable, Observable):
+            observable = Observable(observable)
+
+        with save_encoding(self._encoding):
+            observable.to_obj().export(
+                self._output.write,
+                1,
+                "cybox:",
+                name_="Observable",
+                namespacedef_=self._get_namespace_def(observable),
+                pretty_print=self._pretty
+            )
+
+        self._output.flush(sync=True)
+
+    def close(self, pools=None):
+        """Finish the document and close the output.
+
+        Args:
+            pools: An optional :class:`cybox.core.pool.Pools`, written after
+                the observables. Its namespaces are declared on the
+                ``<cybox:Pools>`` element.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        try:
+            with save_encoding(self._encoding):
+                if pools is not None:
+                    pools.to_obj().export(
+                        self._output.write,
+                        1,
+                        "cybox:",
+                        name_="Pools",
+                        namespacedef_=self._get_namespace_def(pools),
+                        pretty_print=self._pretty
+                    )
+
+                self._output.write("</cybox:Observables>")
+                if self._pretty:
+                    self._output.write("\n")
+        finally:
+            self._output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()